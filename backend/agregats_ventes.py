@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - AGRÉGATS DE VENTES JOURNALIERS
+Table vente_journaliere (jour x type_facture) maintenue à chaque écriture
+sur une facture, lue par le dashboard et les rapports au lieu de re-scanner
+toute la table facture.
+
+Reconstruction complète : python agregats_ventes.py
+"""
+
+from datetime import date, datetime
+
+from sqlalchemy import case, func, update
+from sqlalchemy.exc import IntegrityError
+
+from database_mysql import SessionLocal, Facture, VenteJournaliere
+
+CHAMPS_AGREGAT = ('nb_factures', 'nb_annulees', 'total_ttc', 'montant_avance', 'montant_reste')
+
+
+def _en_date(valeur):
+    """date_facture peut encore être une chaîne 'YYYY-MM-DD' avant le refresh"""
+    if isinstance(valeur, datetime):
+        return valeur.date()
+    if isinstance(valeur, str):
+        return date.fromisoformat(valeur[:10])
+    return valeur
+
+
+def instantane_facture(facture):
+    """
+    Contribution d'une facture à la table d'agrégats : ((jour, type), valeurs)
+    À prendre AVANT de modifier une facture, puis à nouveau APRÈS.
+    """
+    cle = (_en_date(facture.date_facture), facture.type_facture or '')
+    montant_avance = float(facture.montant_avance or 0)
+    montant_reste = float(facture.montant_reste or 0)
+
+    if facture.statut == 'Annulée' or facture.statut is None:
+        valeurs = {'nb_factures': 0, 'nb_annulees': 1, 'total_ttc': 0.0, 'montant_avance': 0.0, 'montant_reste': 0.0}
+    else:
+        valeurs = {
+            'nb_factures': 1,
+            'nb_annulees': 0,
+            'total_ttc': float(facture.total_ttc or 0),
+            'montant_avance': montant_avance if montant_avance > 0 else 0.0,
+            'montant_reste': montant_reste if montant_reste > 0 else 0.0
+        }
+    return cle, valeurs
+
+
+def _ajouter(db, cle, delta):
+    """Ajouter un delta à une ligne d'agrégat (UPDATE atomique, INSERT si la ligne n'existe pas)"""
+    if not any(delta.values()):
+        return
+
+    date_vente, type_facture = cle
+    filtre = (VenteJournaliere.date_vente == date_vente) & (VenteJournaliere.type_facture == type_facture)
+    maj = update(VenteJournaliere).where(filtre).values(
+        **{champ: getattr(VenteJournaliere, champ) + delta[champ] for champ in CHAMPS_AGREGAT}
+    )
+
+    if db.execute(maj).rowcount:
+        return
+
+    try:
+        # Savepoint : une autre transaction peut créer la même ligne en parallèle
+        with db.begin_nested():
+            db.add(VenteJournaliere(date_vente=date_vente, type_facture=type_facture, **delta))
+    except IntegrityError:
+        db.execute(maj)
+
+
+def maj_agregats(db, avant=None, apres=None):
+    """
+    Répercuter la modification d'une facture sur les agrégats
+    - création : maj_agregats(db, apres=instantane_facture(f))
+    - modification : maj_agregats(db, avant, instantane_facture(f))
+    - suppression : maj_agregats(db, avant=avant)
+    """
+    deltas = {}
+    if avant:
+        cle, valeurs = avant
+        deltas[cle] = {champ: -valeurs[champ] for champ in CHAMPS_AGREGAT}
+    if apres:
+        cle, valeurs = apres
+        courant = deltas.setdefault(cle, {champ: 0 for champ in CHAMPS_AGREGAT})
+        for champ in CHAMPS_AGREGAT:
+            courant[champ] += valeurs[champ]
+
+    for cle, delta in deltas.items():
+        _ajouter(db, cle, delta)
+
+
+def reconstruire_agregats(db):
+    """Recalculer toute la table vente_journaliere depuis la table facture"""
+    non_annulee = Facture.statut != 'Annulée'
+    type_facture = func.coalesce(Facture.type_facture, '')
+
+    lignes = db.query(
+        Facture.date_facture,
+        type_facture.label('type_facture'),
+        func.count(Facture.id_facture).label('nb_total'),
+        func.count(case((non_annulee, 1))).label('nb_factures'),
+        func.coalesce(func.sum(case((non_annulee, Facture.total_ttc), else_=0)), 0).label('total_ttc'),
+        func.coalesce(func.sum(case((non_annulee & (Facture.montant_avance > 0), Facture.montant_avance), else_=0)), 0).label('montant_avance'),
+        func.coalesce(func.sum(case((non_annulee & (Facture.montant_reste > 0), Facture.montant_reste), else_=0)), 0).label('montant_reste')
+    ).group_by(Facture.date_facture, type_facture).all()
+
+    db.query(VenteJournaliere).delete()
+    for ligne in lignes:
+        db.add(VenteJournaliere(
+            date_vente=ligne.date_facture,
+            type_facture=ligne.type_facture,
+            nb_factures=int(ligne.nb_factures),
+            nb_annulees=int(ligne.nb_total) - int(ligne.nb_factures),
+            total_ttc=float(ligne.total_ttc),
+            montant_avance=float(ligne.montant_avance),
+            montant_reste=float(ligne.montant_reste)
+        ))
+    db.commit()
+    return len(lignes)
+
+
+def initialiser_agregats_si_vides(db):
+    """Au démarrage : construire les agrégats s'ils n'ont jamais été calculés (base existante)"""
+    if db.query(VenteJournaliere.date_vente).first() is not None:
+        return False
+    if db.query(Facture.id_facture).first() is None:
+        return False
+    reconstruire_agregats(db)
+    return True
+
+
+# ==================== LECTURE ====================
+
+def expression_ca():
+    """CA net : COMPTOIR +total_ttc, RETOUR -total_ttc, NORMALE montant déjà payé"""
+    return case(
+        (VenteJournaliere.type_facture == 'RETOUR', -VenteJournaliere.total_ttc),
+        (VenteJournaliere.type_facture == 'COMPTOIR', VenteJournaliere.total_ttc),
+        (VenteJournaliere.type_facture == 'NORMALE', VenteJournaliere.montant_avance),
+        else_=0
+    )
+
+
+if __name__ == "__main__":
+    print("🔄 Reconstruction des agrégats de ventes...")
+    session = SessionLocal()
+    try:
+        nb = reconstruire_agregats(session)
+        print(f"✅ {nb} ligne(s) d'agrégat recalculée(s)")
+    finally:
+        session.close()
@@ -6,7 +6,7 @@ Routes API pour le comptoir (vente rapide)
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, case
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import date, datetime
@@ -16,9 +16,19 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from database_mysql import get_db, Article, MouvementStock, Facture, LigneFacture, Utilisateur, Client
+from agregats_ventes import instantane_facture, maj_agregats
+from cache_stats import invalider_cache
+from sequences import prochain_numero
+from stock_articles import retirer_stock, remettre_stock
+from ecriture_masse import inserer_en_masse
+from journal import obtenir_journal, champs, debug_echantillonne
+from reponses_json import ReponseJSON
 
 router = APIRouter(prefix="/api/comptoir", tags=["Comptoir"])
 
+journal_auth = obtenir_journal("auth")
+journal_comptoir = obtenir_journal("comptoir")
+
 
 def get_current_user_id(request: Request) -> int:
     """Extraire l'ID utilisateur du token JWT"""
@@ -30,13 +40,13 @@ def get_current_user_id(request: Request) -> int:
             parts = token.split('_')
             if len(parts) >= 2:
                 id_utilisateur = int(parts[1])
-                print(f"  🔑 ID utilisateur extrait du token: {id_utilisateur}")
+                debug_echantillonne(journal_auth, "ID utilisateur extrait du token", id_utilisateur=id_utilisateur)
                 return id_utilisateur
     except (ValueError, IndexError) as e:
-        print(f"   ⚠️ Erreur extraction ID utilisateur: {e}")
+        journal_auth.warning("Token illisible", extra=champs(erreur=str(e)))
     
     # Retourner 1 (admin) par défaut si le token est invalide
-    print(f"  ⚠️ Utilisation de l'utilisateur par défaut (ID: 1)")
+    debug_echantillonne(journal_auth, "Utilisateur par défaut", id_utilisateur=1)
     return 1
 
 
@@ -67,7 +77,7 @@ class VenteComptoirRequest(BaseModel):
 
 
 @router.get("/articles/search")
-async def search_articles_comptoir(
+def search_articles_comptoir(
     q: str,
     limit: int = 20,
     db: Session = Depends(get_db)
@@ -89,7 +99,7 @@ async def search_articles_comptoir(
 
 
 @router.get("/articles/populaires")
-async def get_articles_populaires(
+def get_articles_populaires(
     limit: int = 20,
     db: Session = Depends(get_db)
 ):
@@ -109,7 +119,7 @@ async def get_articles_populaires(
 
 
 @router.get("/verifier-ventes-aujourd-hui")
-async def verifier_ventes_aujourdhui(db: Session = Depends(get_db)):
+def verifier_ventes_aujourdhui(db: Session = Depends(get_db)):
     """
     Vérifie s'il y a eu des ventes aujourd'hui et retourne la liste des articles vendus (comme Python ligne 184-204)
     """
@@ -149,7 +159,7 @@ async def verifier_ventes_aujourdhui(db: Session = Depends(get_db)):
 
 
 @router.get("/ventes/aujourdhui")
-async def get_ventes_aujourdhui(db: Session = Depends(get_db)):
+def get_ventes_aujourdhui(db: Session = Depends(get_db)):
     """
     Récupère les ventes du jour pour le comptoir (depuis FACTURE comme Python ligne 909-920)
     """
@@ -213,7 +223,7 @@ async def get_ventes_aujourdhui(db: Session = Depends(get_db)):
 
 
 @router.post("/vente")
-async def creer_vente_comptoir(
+def creer_vente_comptoir(
     vente: VenteComptoirRequest,
     request: Request,
     db: Session = Depends(get_db)
@@ -224,56 +234,58 @@ async def creer_vente_comptoir(
     try:
         # Récupérer l'ID utilisateur connecté
         id_utilisateur = get_current_user_id(request)
-        print(f"  🔑 Vente créée par l'utilisateur ID: {id_utilisateur}")
+        debug_echantillonne(journal_comptoir, "Vente comptoir", id_utilisateur=id_utilisateur,
+                            type_vente=vente.type_vente, nb_articles=len(vente.articles))
+        
+        # Tous les articles du panier en une seule requête IN (...)
+        ids_articles = {item.id_article for item in vente.articles}
+        articles = {
+            article.id_article: article
+            for article in db.query(Article).filter(Article.id_article.in_(ids_articles)).all()
+        }
+        
         # 🔥 VÉRIFICATION RETOUR : Autoriser SEULEMENT les articles vendus aujourd'hui
         if vente.type_vente == "RETOUR":
             aujourd_hui = date.today()
             
+            # Vendu / déjà retourné aujourd'hui pour chaque article du panier (un seul GROUP BY)
+            quantites_du_jour = db.query(
+                LigneFacture.id_article,
+                func.count(case((Facture.type_facture == 'COMPTOIR', 1))).label('nb_lignes_vendues'),
+                func.coalesce(func.sum(case((Facture.type_facture == 'COMPTOIR', LigneFacture.quantite), else_=0)), 0).label('vendu'),
+                func.coalesce(func.sum(case((Facture.type_facture == 'RETOUR', LigneFacture.quantite), else_=0)), 0).label('retourne')
+            ).join(
+                Facture, LigneFacture.id_facture == Facture.id_facture
+            ).filter(
+                Facture.date_facture == aujourd_hui,
+                Facture.type_facture.in_(['COMPTOIR', 'RETOUR']),
+                LigneFacture.id_article.in_(ids_articles)
+            ).group_by(LigneFacture.id_article).all()
+            quantites_du_jour = {ligne.id_article: ligne for ligne in quantites_du_jour}
+            
+            # Un même article peut apparaître sur plusieurs lignes du panier
+            quantites_retour = {}
             for item in vente.articles:
-                # Vérifier si cet article a été vendu aujourd'hui
-                vente_article_aujourdhui = db.query(LigneFacture).join(
-                    Facture, LigneFacture.id_facture == Facture.id_facture
-                ).filter(
-                    Facture.date_facture == aujourd_hui,
-                    Facture.type_facture == 'COMPTOIR',
-                    LigneFacture.id_article == item.id_article
-                ).first()
+                quantites_retour[item.id_article] = quantites_retour.get(item.id_article, 0) + item.quantite
+            
+            for id_article, quantite_retour in quantites_retour.items():
+                article = articles.get(id_article)
+                article_nom = article.designation if article else f"Article {id_article}"
+                du_jour = quantites_du_jour.get(id_article)
                 
-                if not vente_article_aujourdhui:
+                if not du_jour or not du_jour.nb_lignes_vendues:
                     # Article pas vendu aujourd'hui, REFUSER le retour
-                    article = db.query(Article).filter(Article.id_article == item.id_article).first()
-                    article_nom = article.designation if article else f"Article {item.id_article}"
                     raise HTTPException(
                         status_code=400, 
                         detail=f"❌ RETOUR REFUSÉ : L'article '{article_nom}' n'a pas été vendu aujourd'hui. Seuls les articles vendus aujourd'hui peuvent être retournés."
                     )
                 
                 # Vérifier que la quantité retournée ne dépasse pas la quantité vendue
-                total_vendu_aujourdhui = db.query(
-                    func.sum(LigneFacture.quantite)
-                ).join(
-                    Facture, LigneFacture.id_facture == Facture.id_facture
-                ).filter(
-                    Facture.date_facture == aujourd_hui,
-                    Facture.type_facture == 'COMPTOIR',
-                    LigneFacture.id_article == item.id_article
-                ).scalar() or 0
-                
-                total_retourne_aujourdhui = db.query(
-                    func.sum(LigneFacture.quantite)
-                ).join(
-                    Facture, LigneFacture.id_facture == Facture.id_facture
-                ).filter(
-                    Facture.date_facture == aujourd_hui,
-                    Facture.type_facture == 'RETOUR',
-                    LigneFacture.id_article == item.id_article
-                ).scalar() or 0
-                
+                total_vendu_aujourdhui = du_jour.vendu
+                total_retourne_aujourdhui = du_jour.retourne
                 quantite_disponible_retour = total_vendu_aujourdhui - total_retourne_aujourdhui
                 
-                if item.quantite > quantite_disponible_retour:
-                    article = db.query(Article).filter(Article.id_article == item.id_article).first()
-                    article_nom = article.designation if article else f"Article {item.id_article}"
+                if quantite_retour > quantite_disponible_retour:
                     raise HTTPException(
                         status_code=400,
                         detail=f"❌ RETOUR REFUSÉ : Quantité invalide pour '{article_nom}'. Vendu aujourd'hui: {total_vendu_aujourdhui}, Déjà retourné: {total_retourne_aujourdhui}, Disponible pour retour: {quantite_disponible_retour}"
@@ -284,7 +296,7 @@ async def creer_vente_comptoir(
         montant_ttc = 0.0
         
         for item in vente.articles:
-            article = db.query(Article).filter(Article.id_article == item.id_article).first()
+            article = articles.get(item.id_article)
             if not article:
                 raise HTTPException(status_code=404, detail=f"Article {item.id_article} non trouvé")
             
@@ -310,9 +322,8 @@ async def creer_vente_comptoir(
         
         # 🔥 SYSTÈME PYTHON ORIGINAL : Double écriture (facture + vente_comptoir)
         # Générer le numéro de facture
-        last_facture = db.query(Facture).order_by(Facture.id_facture.desc()).first()
-        next_num = (last_facture.id_facture + 1) if last_facture else 1
-        numero_facture = f"F{datetime.now().strftime('%Y%m%d%H%M%S')}"  # Comme Python
+        # Séquence dédiée : plus de doublon quand deux ventes tombent dans la même seconde
+        numero_facture = prochain_numero('F', db)
         
         # 1. Créer la FACTURE (table principale pour historique)
         # Trouver ou créer le client COMPTOIR (comme Python ligne 1267)
@@ -345,45 +356,57 @@ async def creer_vente_comptoir(
         )
         db.add(nouvelle_facture)
         db.flush()
+        maj_agregats(db, apres=instantane_facture(nouvelle_facture))
         
         # 2. Créer les lignes dans ligne_facture et mettre à jour le stock
+        quantites_stock = []
+        lignes_facture = []
+        mouvements = []
         for item in vente.articles:
-            article = db.query(Article).filter(Article.id_article == item.id_article).first()
+            article = articles[item.id_article]
             
             # Créer ligne dans ligne_facture (pour historique/rapports)
-            ligne_facture = LigneFacture(
-                id_facture=nouvelle_facture.id_facture,
-                id_article=item.id_article,
-                quantite=item.quantite,
-                prix_unitaire=item.prix_unitaire,
-                total_ht=item.quantite * item.prix_unitaire
-            )
-            db.add(ligne_facture)
+            lignes_facture.append({
+                "id_facture": nouvelle_facture.id_facture,
+                "id_article": item.id_article,
+                "quantite": item.quantite,
+                "prix_unitaire": item.prix_unitaire,
+                "total_ht": item.quantite * item.prix_unitaire
+            })
             
             # Mettre à jour le stock pour les produits (comme Python ligne 1293-1355)
             if article.type_article == "PRODUIT":
+                quantites_stock.append((item.id_article, item.quantite))
                 if vente.type_vente == "RETOUR":
                     # Mode retour : AJOUTER au stock (comme Python ligne 1294-1299)
-                    article.stock_actuel = (article.stock_actuel or 0) + abs(item.quantite)
                     type_mouvement = "ENTREE"
                     type_operation = "Retour comptoir"
                 else:
                     # Mode vente : ENLEVER du stock (comme Python ligne 1326-1331)
-                    article.stock_actuel = (article.stock_actuel or 0) - abs(item.quantite)
                     type_mouvement = "SORTIE"
                     type_operation = "Vente comptoir"
                 
                 # Créer un mouvement de stock (comme Python ligne 1319-1323 et 1351-1355)
-                mouvement = MouvementStock(
-                    id_article=item.id_article,
-                    type_mouvement=type_mouvement,
-                    quantite=abs(item.quantite),
-                    date_mouvement=datetime.now(),
-                    reference=f"{type_operation} {numero_facture}"
-                )
-                db.add(mouvement)
+                mouvements.append({
+                    "id_article": item.id_article,
+                    "type_mouvement": type_mouvement,
+                    "quantite": abs(item.quantite),
+                    "date_mouvement": datetime.now(),
+                    "reference": f"{type_operation} {numero_facture}"
+                })
+        
+        # Lignes et mouvements écrits en INSERT multi-lignes
+        inserer_en_masse(db, LigneFacture, lignes_facture)
+        inserer_en_masse(db, MouvementStock, mouvements)
+        
+        # 🔥 Stock modifié par UPDATE conditionnel : une vente concurrente ne peut pas survendre
+        if vente.type_vente == "RETOUR":
+            remettre_stock(db, quantites_stock)
+        else:
+            retirer_stock(db, quantites_stock)
         
         db.commit()
+        invalider_cache('factures', 'articles')
         db.refresh(nouvelle_facture)
         
         return {
@@ -407,7 +430,7 @@ async def creer_vente_comptoir(
 
 
 @router.get("/ventes")
-async def get_ventes_comptoir(
+def get_ventes_comptoir(
     limit: int = 50,
     db: Session = Depends(get_db)
 ):
@@ -480,14 +503,14 @@ async def get_ventes_comptoir(
                 ]
             })
         
-        return ventes_data
+        return ReponseJSON(ventes_data)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur récupération ventes: {str(e)}")
 
 
 @router.get("/ventes/{id_facture}")
-async def get_vente_by_id(
+def get_vente_by_id(
     id_facture: int,
     db: Session = Depends(get_db)
 ):
@@ -544,7 +567,7 @@ async def get_vente_by_id(
 
 
 @router.delete("/ventes/{id_facture}")
-async def supprimer_vente_comptoir(
+def supprimer_vente_comptoir(
     id_facture: int,
     db: Session = Depends(get_db)
 ):
@@ -571,28 +594,34 @@ async def supprimer_vente_comptoir(
         ).all()
         
         # Restaurer le stock pour chaque article (comme Python ligne 1703-1728)
+        quantites_stock = []
+        mouvements = []
         for ligne_facture, article in lignes:
             if article and article.type_article == "PRODUIT":
                 # Remettre en stock
-                article.stock_actuel += ligne_facture.quantite
+                quantites_stock.append((ligne_facture.id_article, ligne_facture.quantite))
                 
                 # Créer un mouvement de stock (ENTREE)
-                mouvement = MouvementStock(
-                    id_article=ligne_facture.id_article,
-                    type_mouvement="ENTREE",
-                    quantite=ligne_facture.quantite,
-                    date_mouvement=datetime.now(),
-                    reference=f"Suppression {numero_facture}"
-                )
-                db.add(mouvement)
+                mouvements.append({
+                    "id_article": ligne_facture.id_article,
+                    "type_mouvement": "ENTREE",
+                    "quantite": ligne_facture.quantite,
+                    "date_mouvement": datetime.now(),
+                    "reference": f"Suppression {numero_facture}"
+                })
+        
+        remettre_stock(db, quantites_stock)
+        inserer_en_masse(db, MouvementStock, mouvements)
         
         # Supprimer les lignes de facture
         db.query(LigneFacture).filter(LigneFacture.id_facture == id_facture).delete()
         
         # Supprimer la facture
+        maj_agregats(db, avant=instantane_facture(facture))
         db.delete(facture)
         
         db.commit()
+        invalider_cache('factures', 'articles')
         
         return {
             "success": True,
@@ -608,7 +637,7 @@ async def supprimer_vente_comptoir(
 
 
 @router.get("/stats")
-async def get_stats_comptoir(db: Session = Depends(get_db)):
+def get_stats_comptoir(db: Session = Depends(get_db)):
     """
     Statistiques pour le tableau de bord comptoir (depuis FACTURE comme Python)
     """
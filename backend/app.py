@@ -8,27 +8,56 @@ Recréation identique de l'application desktop en version web
 from fastapi import FastAPI, Depends, HTTPException, status, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 import sys
 import os
+import time
 from datetime import datetime, date, timedelta
 import json
-from passlib.hash import bcrypt
 
 # Ajouter le répertoire racine au path Python
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Importer la configuration MySQL
-from database_mysql import get_db, test_connection, create_tables
+from database_mysql import get_db, SessionLocal, engine
+from version_schema import preparer_base
+from pool_connexions import statistiques_pool, reinitialiser_statistiques_pool
+from instrumentation_sql import installer_instrumentation
+from metriques import MiddlewareMetriques, exposition_prometheus
+from compression import MiddlewareCompression, StaticFilesPrecompresses
+from reponses_json import ReponseJSON
+from versions_tables import initialiser_versions, lire_version, non_modifie, reponse_304, entetes_version
+from sante import demarrer_surveillance, arreter_surveillance, etat_sante, SANTE_INTERVALLE
+from pagination import paginer_par_curseur
+from projections import champs_du_modele, colonnes_demandees, en_dicts
+from cache_stats import cache_stats, invalider_cache, statistiques_cache
+from sequences import prochain_numero, apercu_numero, numero_document
+from stock_articles import retirer_stock, remettre_stock
+from ecriture_masse import inserer_en_masse
+from images_articles import (
+    stocker_image_path, chemin_fichier, original_de, lancer_miniatures, arreter_pool_images,
+    stockage_persistant, IMAGES_DOSSIER, MOTIF_NOM, TYPES_MIME, TAILLES_MINIATURES, FORMATS_MINIATURES
+)
+from journal import obtenir_journal, champs, debug_echantillonne
+from concurrence import configurer_pool_threads, statistiques_pool_threads
+from mots_de_passe import verifier_mot_de_passe, hacher_mot_de_passe, doit_rehacher, lancer_calibration
+from inventaire import (
+    normaliser_ligne, appliquer_ajustements, lire_feuille_comptage, TAILLE_LOT_INVENTAIRE, MAX_ERREURS_DETAILLEES,
+    DEFAUTS_VALIDATION
+)
 from database_mysql import (
     Client, Article, Facture, Devis, Reglement, Avoir, LigneAvoir,
     Utilisateur, Fournisseur, Entreprise, MouvementStock,
-    LigneFacture, LigneDevis, SignalementBug, VenteComptoir, LigneVente
+    LigneFacture, LigneDevis, SignalementBug, VenteComptoir, LigneVente,
+    VenteJournaliere
+)
+from agregats_ventes import (
+    instantane_facture, maj_agregats, reconstruire_agregats, expression_ca
 )
 
 # Importer les routes des modules (avec try/except pour éviter les erreurs)
@@ -42,6 +71,21 @@ except ImportError as e:
 
 # ==================== UTILITAIRES ====================
 
+journal_auth = obtenir_journal("auth")
+journal_factures = obtenir_journal("factures")
+journal_devis = obtenir_journal("devis")
+journal_avoirs = obtenir_journal("avoirs")
+journal_clients = obtenir_journal("clients")
+journal_articles = obtenir_journal("articles")
+journal_fournisseurs = obtenir_journal("fournisseurs")
+journal_reglements = obtenir_journal("reglements")
+journal_bugs = obtenir_journal("bugs")
+journal_stock = obtenir_journal("stock")
+journal_stats = obtenir_journal("stats")
+journal_inventaire = obtenir_journal("inventaire")
+journal_utilisateurs = obtenir_journal("utilisateurs")
+journal_entreprise = obtenir_journal("entreprise")
+
 def get_current_user_id(request: Request) -> int:
     """Extraire l'ID utilisateur du token JWT"""
     try:
@@ -52,13 +96,13 @@ def get_current_user_id(request: Request) -> int:
             parts = token.split('_')
             if len(parts) >= 2:
                 id_utilisateur = int(parts[1])
-                print(f"  🔑 ID utilisateur extrait du token: {id_utilisateur}")
+                debug_echantillonne(journal_auth, "ID utilisateur extrait du token", id_utilisateur=id_utilisateur)
                 return id_utilisateur
     except (ValueError, IndexError) as e:
-        print(f"   ⚠️ Erreur extraction ID utilisateur: {e}")
+        journal_auth.warning("Token illisible", extra=champs(erreur=str(e)))
     
     # Retourner 1 (admin) par défaut si le token est invalide
-    print(f"  ⚠️ Utilisation de l'utilisateur par défaut (ID: 1)")
+    debug_echantillonne(journal_auth, "Utilisateur par défaut", id_utilisateur=1)
     return 1
 
 # Modèles Pydantic pour l'API
@@ -149,6 +193,15 @@ class FournisseurResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# Réponses en mode curseur (?after=, voir pagination.py)
+class PageClients(BaseModel):
+    items: List[ClientResponse]
+    next_cursor: Optional[str] = None
+
+class PageFournisseurs(BaseModel):
+    items: List[FournisseurResponse]
+    next_cursor: Optional[str] = None
+
 class FactureCreate(BaseModel):
     id_client: int
     date_facture: date
@@ -254,13 +307,22 @@ class LoginResponse(BaseModel):
     token_type: str
     utilisateur: UtilisateurResponse
 
+# Colonnes lues par défaut par les listes (voir projections.py, ?fields= pour en demander d'autres)
+CHAMPS_CLIENT = list(ClientResponse.model_fields)
+CHAMPS_RECHERCHE_CLIENT = champs_du_modele(Client, sauf=('adresse',))
+CHAMPS_ARTICLE = champs_du_modele(Article)
+CHAMPS_RECHERCHE_ARTICLE = champs_du_modele(Article, sauf=('description', 'image_path'))
+CHAMPS_FOURNISSEUR = list(FournisseurResponse.model_fields)
+CHAMPS_AVOIR = champs_du_modele(Avoir)
+
 # Créer l'application FastAPI
 app = FastAPI(
     title="Tech Info Plus API",
     description="API complète pour le système de facturation et gestion de stock",
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ReponseJSON  # orjson (voir reponses_json.py)
 )
 
 # Configuration CORS pour React
@@ -272,6 +334,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Métriques par route (/metrics) et temps passé en base par requête
+installer_instrumentation(engine)
+app.add_middleware(MiddlewareMetriques)
+
+# Compression gzip/brotli négociée (le dernier ajouté enveloppe les autres)
+app.add_middleware(MiddlewareCompression)
+
 # Sécurité
 security = HTTPBearer()
 
@@ -280,35 +349,9 @@ if routes_imported:
     app.include_router(comptoir_router)
     print("[OK] Routes Comptoir chargees")
 
-# -- Servir le frontend build (si présent) pour produire une application "tout-en-un" --
-try:
-    # Chemin attendu du build créé par `npm run build` (frontend/build)
-    frontend_build_path = os.path.normpath(
-        os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "frontend", "build")
-    )
-
-    if os.path.isdir(frontend_build_path):
-        # Monter les fichiers statiques (l'API garde la priorité sur les routes)
-        app.mount("/", StaticFiles(directory=frontend_build_path, html=True), name="frontend")
-        print(f"[OK] Frontend statique monte depuis: {frontend_build_path}")
-
-        # Fallback SPA: servir index.html pour les routes non-API (utile quand le build existe)
-        index_file = os.path.join(frontend_build_path, "index.html")
-
-        if os.path.exists(index_file):
-            @app.get("/{full_path:path}", include_in_schema=False)
-            async def spa_catchall(request: Request, full_path: str):
-                # Laisser passer les appels aux routes d'API/doc
-                if request.url.path.startswith("/api") or request.url.path.startswith("/docs") or request.url.path.startswith("/redoc"):
-                    raise HTTPException(status_code=404)
-                return FileResponse(index_file)
-except Exception as _e:
-    # Ne doit pas empêcher l'application de démarrer si quelque chose échoue
-    print(f"[WARNING] Impossible de monter le frontend statique: {_e}")
-
 # Routes principales
 @app.get("/")
-async def root():
+def root():
     """Point d'entrée de l'API"""
     return {
         "message": "Tech Info Plus API",
@@ -333,18 +376,34 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Vérification de l'état de l'API"""
-    db_status = test_connection()
+    """Vérification de l'état de l'API (dernier résultat de la sonde de fond, voir sante.py)"""
+    etat = etat_sante()
     return {
-        "status": "healthy" if db_status else "unhealthy",
-        "database": "connected" if db_status else "disconnected",
+        "status": "healthy" if etat["pret"] else "unhealthy",
+        "database": "connected" if etat["base"] else "disconnected",
         "timestamp": datetime.now().isoformat()
     }
 
+@app.get("/health/live")
+async def health_live():
+    """Le processus répond (aucune entrée/sortie)"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def health_ready():
+    """Prêt à recevoir du trafic : base joignable, pool non saturé, boucle réactive (503 sinon)"""
+    etat = etat_sante()
+    return JSONResponse(status_code=200 if etat["pret"] else 503, content=etat)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Compteurs et histogrammes de latence par route, format Prometheus"""
+    return PlainTextResponse(exposition_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # ==================== AUTHENTIFICATION ====================
 
 @app.post("/api/auth/login", response_model=LoginResponse)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     """Connexion utilisateur"""
     # Vérifier si l'utilisateur existe
     user = db.query(Utilisateur).filter(
@@ -364,26 +423,38 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
             detail="Ce compte est désactivé. Contactez l'administrateur"
         )
     
-    # Vérifier le mot de passe avec bcrypt
+    # Rendre la connexion au pool pendant le calcul bcrypt : une rafale de connexions
+    # ne doit pas monopoliser toutes les connexions base de données
+    db.close()
+    
+    # Vérifier le mot de passe avec bcrypt (pool bcrypt borné)
     try:
-        if not bcrypt.verify(login_data.mot_de_passe, user.mot_de_passe):
+        if not verifier_mot_de_passe(login_data.mot_de_passe, user.mot_de_passe):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Mot de passe incorrect"
             )
-    except ValueError:
-        # Erreur de déchiffrement du mot de passe
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Mot de passe incorrect"
-        )
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Erreur vérification mot de passe: {e}")
+        journal_auth.exception("Erreur vérification mot de passe")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Mot de passe incorrect"
         )
     
+    # Mettre le hash au coût calibré de ce serveur (une seule fois par utilisateur)
+    if doit_rehacher(user.mot_de_passe):
+        try:
+            nouveau_hash = hacher_mot_de_passe(login_data.mot_de_passe)
+            db.query(Utilisateur).filter(
+                Utilisateur.id_utilisateur == user.id_utilisateur
+            ).update({Utilisateur.mot_de_passe: nouveau_hash})
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            journal_auth.exception("Erreur mise à jour du hash")
+    
     # Créer le token (simplifié)
     access_token = f"token_{user.id_utilisateur}_{datetime.now().timestamp()}"
     
@@ -395,14 +466,25 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
 
 # ==================== CLIENTS ====================
 
-@app.get("/api/clients", response_model=List[ClientResponse])
-async def get_clients(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Récupérer tous les clients"""
-    clients = db.query(Client).offset(skip).limit(limit).all()
-    return clients
+@app.get("/api/clients", response_model=Union[List[ClientResponse], PageClients])
+def get_clients(request: Request, skip: int = 0, limit: int = 100, after: Optional[str] = None, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    """Récupérer tous les clients (?after=<id> active la pagination par curseur, ?fields=nom,telephone limite les colonnes)"""
+    query = db.query(*colonnes_demandees(Client, fields, CHAMPS_CLIENT))
+    
+    # 304 si le navigateur a déjà cette version de la table (voir versions_tables.py)
+    version = lire_version(db, 'client')
+    if non_modifie(request, version):
+        return reponse_304(version)
+    
+    if after is not None:
+        clients, next_cursor = paginer_par_curseur(query, [Client.id_client], after, limit)
+        return ReponseJSON({"items": en_dicts(clients), "next_cursor": next_cursor}, headers=entetes_version(version))
+    
+    clients = query.offset(skip).limit(limit).all()
+    return ReponseJSON(en_dicts(clients), headers=entetes_version(version))
 
 @app.get("/api/clients/{client_id}")
-async def get_client(client_id: int, db: Session = Depends(get_db)):
+def get_client(client_id: int, db: Session = Depends(get_db)):
     """Récupérer un client par ID"""
     try:
         client = db.query(Client).filter(Client.id_client == client_id).first()
@@ -441,56 +523,54 @@ async def get_client(client_id: int, db: Session = Depends(get_db)):
             }
         }
     except Exception as e:
-        print(f"Erreur get_client: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_clients.exception("Erreur get_client")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 @app.post("/api/clients", response_model=ClientResponse)
-async def create_client(client: ClientCreate, db: Session = Depends(get_db)):
+def create_client(client: ClientCreate, db: Session = Depends(get_db)):
     """Créer un nouveau client"""
     # Générer un numéro client automatique si non fourni
     if not client.numero_client:
-        last_client = db.query(Client).order_by(Client.id_client.desc()).first()
-        next_num = (last_client.id_client + 1) if last_client else 1
-        year = datetime.now().year
-        client.numero_client = f"CLI-{year}-{next_num:03d}"
+        client.numero_client = prochain_numero('CLI', db)
     
     db_client = Client(**client.dict())
     db.add(db_client)
     db.commit()
+    invalider_cache('clients')
     db.refresh(db_client)
     return db_client
 
 @app.put("/api/clients/{client_id}")
-async def update_client(client_id: int, data: dict, db: Session = Depends(get_db)):
+def update_client(client_id: int, data: dict, db: Session = Depends(get_db)):
     """Mettre à jour un client"""
     try:
-        print(f"🔍 DEBUG - Modification client {client_id}: {data}")
+        debug_echantillonne(journal_clients, "Modification client", id_client=client_id, cles=sorted(data))
         
         db_client = db.query(Client).filter(Client.id_client == client_id).first()
         if not db_client:
             raise HTTPException(status_code=404, detail="Client non trouvé")
         
+        if data.get('image_path'):
+            data['image_path'] = stocker_image_path(data['image_path'])
+        
         # Mettre à jour les champs
         for key, value in data.items():
             if hasattr(db_client, key) and value is not None:
                 setattr(db_client, key, value)
         
         db.commit()
+        invalider_cache('clients')
         db.refresh(db_client)
         
-        print(f"  Client {db_client.nom} modifié avec succès!")
+        journal_clients.info("Client modifié", extra=champs(id_client=client_id))
         return db_client
     except Exception as e:
         db.rollback()
-        print(f"  ERREUR modification client: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_clients.exception("Erreur modification client")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 @app.delete("/api/clients/{client_id}")
-async def delete_client(client_id: int, force: bool = False, db: Session = Depends(get_db)):
+def delete_client(client_id: int, force: bool = False, db: Session = Depends(get_db)):
     """Supprimer un client"""
     try:
         db_client = db.query(Client).filter(Client.id_client == client_id).first()
@@ -504,11 +584,12 @@ async def delete_client(client_id: int, force: bool = False, db: Session = Depen
         if factures_count > 0 or devis_count > 0:
             if force:
                 # Supprimer les documents liés d'abord
-                print(f"Suppression forcée: {factures_count} factures et {devis_count} devis")
+                journal_clients.info("Suppression forcée", extra=champs(id_client=client_id, factures=factures_count, devis=devis_count))
                 
                 # Supprimer les lignes de factures liées
                 factures_client = db.query(Facture).filter(Facture.id_client == client_id).all()
                 for facture in factures_client:
+                    maj_agregats(db, avant=instantane_facture(facture))
                     db.query(LigneFacture).filter(LigneFacture.id_facture == facture.id_facture).delete()
                 
                 # Supprimer les factures
@@ -522,7 +603,7 @@ async def delete_client(client_id: int, force: bool = False, db: Session = Depen
                 # Supprimer les devis
                 db.query(Devis).filter(Devis.id_client == client_id).delete()
                 
-                print(f"Documents supprimés: {factures_count} factures et {devis_count} devis")
+                journal_clients.info("Documents du client supprimés", extra=champs(id_client=client_id, factures=factures_count, devis=devis_count))
             else:
                 raise HTTPException(
                     status_code=400, 
@@ -531,49 +612,59 @@ async def delete_client(client_id: int, force: bool = False, db: Session = Depen
         
         db.delete(db_client)
         db.commit()
+        invalider_cache('clients', 'factures', 'devis', 'reglements', 'avoirs')
         return {"message": "Client supprimé avec succès"}
         
     except HTTPException:
         raise
     except Exception as e:
         db.rollback()
-        print(f"Erreur suppression client: {e}")
+        journal_clients.exception("Erreur suppression client")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 # ==================== ARTICLES ====================
 
 @app.get("/api/articles/generate-code")
-async def generate_code_article(db: Session = Depends(get_db)):
+def generate_code_article(db: Session = Depends(get_db)):
     """Générer un code article séquentiel"""
     try:
-        last_article = db.query(Article).order_by(Article.id_article.desc()).first()
-        next_num = (last_article.id_article + 1) if last_article else 1
-        code = f"ART-{next_num:04d}"
-        return code
+        # Aperçu sans réservation : le code est attribué à la création (numero_document)
+        return apercu_numero('ART', db)
     except Exception as e:
-        print(f"Erreur génération code: {e}")
+        journal_articles.exception("Erreur génération code")
         return "ART-0001"
 
 @app.get("/api/articles")
-async def get_articles(skip: int = 0, limit: int = 100, inclure_inactifs: bool = False, db: Session = Depends(get_db)):
-    """Récupérer tous les articles (uniquement actifs par défaut)"""
+def get_articles(request: Request, skip: int = 0, limit: int = 100, inclure_inactifs: bool = False, after: Optional[str] = None, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    """Récupérer tous les articles (uniquement actifs par défaut, ?after=<id> pour la pagination par curseur, ?fields= pour limiter les colonnes)"""
     try:
-        query = db.query(Article)
+        colonnes = colonnes_demandees(Article, fields, CHAMPS_ARTICLE)
+        query = db.query(*colonnes)
+        
+        # 304 si le navigateur a déjà cette version de la table (voir versions_tables.py) ;
+        # le stock ne change pas la version, il a sa propre fenêtre de validité
+        version = lire_version(db, 'article', stock=any(colonne.key == 'stock_actuel' for colonne in colonnes))
+        if non_modifie(request, version):
+            return reponse_304(version)
         
         # Par défaut, ne retourner que les articles actifs
         if not inclure_inactifs:
             query = query.filter(Article.actif == True)
         
+        if after is not None:
+            articles, next_cursor = paginer_par_curseur(query, [Article.id_article], after, limit)
+            return ReponseJSON({"items": en_dicts(articles), "next_cursor": next_cursor}, headers=entetes_version(version))
+        
         articles = query.offset(skip).limit(limit).all()
-        return articles
+        return ReponseJSON(en_dicts(articles), headers=entetes_version(version))
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Erreur chargement articles: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_articles.exception("Erreur chargement articles")
         return []
 
 @app.get("/api/articles/{article_id}")
-async def get_article(article_id: int, db: Session = Depends(get_db)):
+def get_article(article_id: int, db: Session = Depends(get_db)):
     """Récupérer un article par ID avec statistiques"""
     try:
         article = db.query(Article).filter(Article.id_article == article_id).first()
@@ -620,61 +711,60 @@ async def get_article(article_id: int, db: Session = Depends(get_db)):
             }
         }
     except Exception as e:
-        print(f"Erreur get_article: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_articles.exception("Erreur get_article")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 @app.post("/api/articles")
-async def create_article(article: ArticleCreate, db: Session = Depends(get_db)):
+def create_article(article: ArticleCreate, db: Session = Depends(get_db)):
     """Créer un nouvel article"""
     try:
-        # Générer un code article automatique si non fourni
-        if not article.code_article:
-            last_article = db.query(Article).order_by(Article.id_article.desc()).first()
-            next_num = (last_article.id_article + 1) if last_article else 1
-            article.code_article = f"ART-{next_num:04d}"
+        # Code saisi à la main conservé, sinon attribué maintenant (l'aperçu du formulaire n'est pas réservé)
+        article.code_article = numero_document('ART', article.code_article, db)
+        
+        # Image base64 -> fichier sur disque, la base ne garde que l'URL
+        article.image_path = stocker_image_path(article.image_path)
         
         db_article = Article(**article.dict())
         db.add(db_article)
         db.commit()
+        invalider_cache('articles')
         db.refresh(db_article)
         return db_article
     except Exception as e:
         db.rollback()
-        print(f"Erreur création article: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_articles.exception("Erreur création article")
         raise HTTPException(status_code=400, detail=f"Erreur lors de la création: {str(e)}")
 
 @app.put("/api/articles/{article_id}")
-async def update_article(article_id: int, data: dict, db: Session = Depends(get_db)):
+def update_article(article_id: int, data: dict, db: Session = Depends(get_db)):
     """Mettre à jour un article"""
     try:
-        print(f"🔍 DEBUG - Modification article {article_id}: {data}")
+        debug_echantillonne(journal_articles, "Modification article", id_article=article_id, cles=sorted(data))
         db_article = db.query(Article).filter(Article.id_article == article_id).first()
         if not db_article:
             raise HTTPException(status_code=404, detail="Article non trouvé")
         
+        if data.get('image_path'):
+            data['image_path'] = stocker_image_path(data['image_path'])
+        
         # Mettre à jour les champs
         for key, value in data.items():
             if hasattr(db_article, key) and (value is not None or key in ['id_fournisseur']):
                 setattr(db_article, key, value)
         
         db.commit()
+        invalider_cache('articles')
         db.refresh(db_article)
         return db_article
     except HTTPException:
         raise
     except Exception as e:
         db.rollback()
-        print(f"Erreur mise à jour article: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_articles.exception("Erreur mise à jour article")
         raise HTTPException(status_code=400, detail=f"Erreur lors de la mise à jour: {str(e)}")
 
 @app.delete("/api/articles/{article_id}")
-async def delete_article(article_id: int, db: Session = Depends(get_db)):
+def delete_article(article_id: int, db: Session = Depends(get_db)):
     """Supprimer un article (désactiver)"""
     db_article = db.query(Article).filter(Article.id_article == article_id).first()
     if not db_article:
@@ -682,15 +772,63 @@ async def delete_article(article_id: int, db: Session = Depends(get_db)):
     
     db_article.actif = False
     db.commit()
+    invalider_cache('articles')
     return {"message": "Article désactivé avec succès"}
 
+@app.get("/api/images/{nom}")
+def get_image(nom: str):
+    """
+    Image d'article (<sha256>.<ext>) ou miniature (<sha256>_<taille>.<webp|jpg>) :
+    le contenu d'une URL ne change jamais, cache d'un an
+    """
+    correspondance = MOTIF_NOM.match(nom)
+    if not correspondance:
+        raise HTTPException(status_code=404, detail="Image non trouvée")
+    chemin = chemin_fichier(nom)
+    
+    if not os.path.exists(chemin) and correspondance.group('taille'):
+        # Miniature pas encore générée (image migrée, génération en cours) : la lancer dans le pool
+        # d'images sans l'attendre (aucun thread de route bloqué) et servir l'original sans cache long
+        original = original_de(correspondance.group('empreinte'))
+        if (original is None or int(correspondance.group('taille')) not in TAILLES_MINIATURES
+                or correspondance.group('extension') not in FORMATS_MINIATURES):
+            raise HTTPException(status_code=404, detail="Image non trouvée")
+        try:
+            lancer_miniatures(original)
+        except Exception as e:
+            journal_articles.exception("Erreur génération miniature", extra=champs(image=nom))
+        return FileResponse(
+            chemin_fichier(original),
+            media_type=TYPES_MIME[original.rsplit('.', 1)[1]],
+            headers={"Cache-Control": "no-cache"},
+        )
+    
+    if not os.path.exists(chemin):
+        raise HTTPException(status_code=404, detail="Image non trouvée")
+    return FileResponse(
+        chemin,
+        media_type=TYPES_MIME[correspondance.group('extension')],
+        headers={
+            "Cache-Control": "public, max-age=31536000, immutable",
+            "ETag": f'"{nom.rsplit(".", 1)[0]}-{correspondance.group("extension")}"',
+        },
+    )
+
 # ==================== MOUVEMENTS DE STOCK ====================
 
 @app.get("/api/mouvements")
-async def get_mouvements(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Récupérer tous les mouvements de stock avec infos articles"""
+def get_mouvements(skip: int = 0, limit: int = 100, after: Optional[str] = None, db: Session = Depends(get_db)):
+    """Récupérer tous les mouvements de stock avec infos articles (?after=<date>,<id> pour la pagination par curseur)"""
     try:
-        mouvements = db.query(MouvementStock).order_by(MouvementStock.date_mouvement.desc()).offset(skip).limit(limit).all()
+        query = db.query(MouvementStock)
+        next_cursor = None
+        
+        if after is not None:
+            mouvements, next_cursor = paginer_par_curseur(
+                query, [MouvementStock.date_mouvement, MouvementStock.id_mouvement], after, limit, descendant=True
+            )
+        else:
+            mouvements = query.order_by(MouvementStock.date_mouvement.desc()).offset(skip).limit(limit).all()
         
         # Enrichir avec les infos des articles
         result = []
@@ -707,13 +845,18 @@ async def get_mouvements(skip: int = 0, limit: int = 100, db: Session = Depends(
                 "reference": mvt.reference,
                 "motif": mvt.motif if hasattr(mvt, 'motif') else None
             })
-        return result
+        
+        if after is not None:
+            return ReponseJSON({"items": result, "next_cursor": next_cursor})
+        return ReponseJSON(result)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Erreur chargement mouvements: {e}")
+        journal_stock.exception("Erreur chargement mouvements")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 @app.get("/api/mouvements/{mouvement_id}")
-async def get_mouvement(mouvement_id: int, db: Session = Depends(get_db)):
+def get_mouvement(mouvement_id: int, db: Session = Depends(get_db)):
     """Récupérer un mouvement par ID"""
     mouvement = db.query(MouvementStock).filter(MouvementStock.id_mouvement == mouvement_id).first()
     if not mouvement:
@@ -738,7 +881,7 @@ class MouvementCreate(BaseModel):
     reference: Optional[str] = None
 
 @app.post("/api/mouvements")
-async def create_mouvement(mouvement: MouvementCreate, db: Session = Depends(get_db)):
+def create_mouvement(mouvement: MouvementCreate, db: Session = Depends(get_db)):
     """Créer un mouvement de stock manuel"""
     try:
         # Vérifier que l'article existe
@@ -756,36 +899,48 @@ async def create_mouvement(mouvement: MouvementCreate, db: Session = Depends(get
         )
         db.add(nouveau_mvt)
         
-        # Mettre à jour le stock de l'article
+        # Mettre à jour le stock de l'article (UPDATE atomique)
         if mouvement.type_mouvement == "ENTREE":
-            article.stock_actuel = (article.stock_actuel or 0) + mouvement.quantite
+            remettre_stock(db, [(mouvement.id_article, mouvement.quantite)])
         elif mouvement.type_mouvement == "SORTIE":
-            if (article.stock_actuel or 0) < mouvement.quantite:
-                raise HTTPException(status_code=400, detail="Stock insuffisant")
-            article.stock_actuel = (article.stock_actuel or 0) - mouvement.quantite
+            retirer_stock(db, [(mouvement.id_article, mouvement.quantite)])
         
         db.commit()
+        invalider_cache('articles')
         db.refresh(nouveau_mvt)
         return nouveau_mvt
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
-        print(f"Erreur création mouvement: {e}")
+        journal_stock.exception("Erreur création mouvement")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 # ==================== FACTURES ====================
 
 @app.get("/api/factures")
-async def get_factures(
+def get_factures(
     skip: int = 0, 
     limit: int = 100, 
     id_client: int = None,  # Filtre par client
     type_facture: str = None,  # Filtre par type (NORMALE, COMPTOIR, RETOUR)
+    after: Optional[str] = None,  # Pagination par curseur (?after=<id_facture>)
     db: Session = Depends(get_db)
 ):
     """Récupérer toutes les factures avec infos client (avec filtres optionnels)"""
     try:
-        # Construire la requête de base
-        query = db.query(Facture).join(Client, Facture.id_client == Client.id_client)
+        # Construire la requête de base : client et créateur chargés dans le même SELECT
+        # (une seule requête quelle que soit la taille de la page, pas de N+1)
+        query = db.query(
+            Facture,
+            Client.nom.label('client_nom'),
+            Client.telephone.label('client_telephone'),
+            Utilisateur.nom_utilisateur.label('cree_par')
+        ).join(
+            Client, Facture.id_client == Client.id_client
+        ).outerjoin(
+            Utilisateur, Facture.id_utilisateur == Utilisateur.id_utilisateur
+        )
         
         # Appliquer les filtres si fournis
         if id_client:
@@ -795,16 +950,14 @@ async def get_factures(
             query = query.filter(Facture.type_facture == type_facture)
         
         # Exécuter la requête avec pagination
-        factures = query.offset(skip).limit(limit).all()
+        next_cursor = None
+        if after is not None:
+            factures, next_cursor = paginer_par_curseur(query, [Facture.id_facture], after, limit)
+        else:
+            factures = query.offset(skip).limit(limit).all()
         
         result = []
-        for facture in factures:
-            client = db.query(Client).filter(Client.id_client == facture.id_client).first()
-            # Récupérer l'utilisateur créateur
-            utilisateur = None
-            if facture.id_utilisateur:
-                utilisateur = db.query(Utilisateur).filter(Utilisateur.id_utilisateur == facture.id_utilisateur).first()
-            
+        for facture, client_nom, client_telephone, cree_par in factures:
             result.append({
                 "id_facture": facture.id_facture,
                 "numero_facture": facture.numero_facture,
@@ -822,17 +975,22 @@ async def get_factures(
                 "mode_paiement": facture.mode_paiement,
                 "notes": facture.notes,
                 "created_at": facture.created_at.isoformat() if facture.created_at else None,
-                "client_nom": client.nom if client else "N/A",
-                "client_telephone": client.telephone if client else "",
-                "cree_par": utilisateur.nom_utilisateur if utilisateur else "Système"  # 🔥 Nom du créateur
+                "client_nom": client_nom,
+                "client_telephone": client_telephone,
+                "cree_par": cree_par or "Système"  # 🔥 Nom du créateur
             })
-        return result
+        
+        if after is not None:
+            return ReponseJSON({"items": result, "next_cursor": next_cursor})
+        return ReponseJSON(result)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Erreur chargement factures: {e}")
+        journal_factures.exception("Erreur chargement factures")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 @app.get("/api/factures/{facture_id}")
-async def get_facture(facture_id: int, db: Session = Depends(get_db)):
+def get_facture(facture_id: int, db: Session = Depends(get_db)):
     """Récupérer une facture par ID avec infos client"""
     facture = db.query(Facture).filter(Facture.id_facture == facture_id).first()
     if not facture:
@@ -870,7 +1028,7 @@ async def get_facture(facture_id: int, db: Session = Depends(get_db)):
     }
 
 @app.get("/api/factures/{facture_id}/lignes")
-async def get_lignes_facture(facture_id: int, db: Session = Depends(get_db)):
+def get_lignes_facture(facture_id: int, db: Session = Depends(get_db)):
     """Récupérer les lignes d'une facture - EXACTEMENT comme Python ligne 1165-1196"""
     try:
         # Vérifier que la facture existe
@@ -904,9 +1062,7 @@ async def get_lignes_facture(facture_id: int, db: Session = Depends(get_db)):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"  ERREUR récupération lignes facture: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_factures.exception("Erreur récupération lignes facture")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 class LigneFactureCreate(BaseModel):
@@ -916,19 +1072,16 @@ class LigneFactureCreate(BaseModel):
     montant_ht: float
 
 @app.post("/api/factures")
-async def create_facture(data: dict, request: Request, db: Session = Depends(get_db)):
+def create_facture(data: dict, request: Request, db: Session = Depends(get_db)):
     """Créer une nouvelle facture - EXACTEMENT comme Python ligne 1544-1579"""
     try:
         # Récupérer l'ID utilisateur connecté
         id_utilisateur = get_current_user_id(request)
-        print(f"  🔑 Facture créée par l'utilisateur ID: {id_utilisateur}")
-        print(f"🔍 DEBUG - Données reçues: {data}")
+        debug_echantillonne(journal_factures, "Création facture", id_utilisateur=id_utilisateur,
+                            id_client=data.get('id_client'), nb_lignes=len(data.get('lignes') or []))
         
         # Générer un numéro de facture automatique
-        last_facture = db.query(Facture).order_by(Facture.id_facture.desc()).first()
-        next_num = (last_facture.id_facture + 1) if last_facture else 1
-        year = datetime.now().year
-        numero_facture = f"FAC-{year}-{next_num:03d}"
+        numero_facture = prochain_numero('FAC', db)
         
         # Extraire les données EXACTEMENT comme Python
         id_client = data.get('id_client')
@@ -952,8 +1105,6 @@ async def create_facture(data: dict, request: Request, db: Session = Depends(get
         type_facture = data.get('type_facture', 'NORMALE')
         lignes = data.get('lignes', [])
         
-        print(f"  Numéro: {numero_facture}, Client: {id_client}, Montant TTC: {montant_ttc}")
-        
         # Créer la facture EXACTEMENT comme Python (ligne 1544-1547)
         db_facture = Facture(
             numero_facture=numero_facture,
@@ -972,10 +1123,16 @@ async def create_facture(data: dict, request: Request, db: Session = Depends(get
         )
         db.add(db_facture)
         db.flush()
-        
-        print(f"  Facture créée avec ID: {db_facture.id_facture}")
+        maj_agregats(db, apres=instantane_facture(db_facture))
         
         # Sauvegarder les lignes EXACTEMENT comme Python (ligne 1560-1579)
+        # Articles de la facture en une seule requête IN (...)
+        articles = {
+            article.id_article: article
+            for article in db.query(Article).filter(Article.id_article.in_({ligne['id_article'] for ligne in lignes})).all()
+        }
+        
+        lignes_facture = []
         for ligne in lignes:
             id_article = ligne['id_article']
             quantite = ligne['quantite']
@@ -983,7 +1140,7 @@ async def create_facture(data: dict, request: Request, db: Session = Depends(get
             montant_ht_ligne = quantite * prix_unitaire
             
             # Récupérer l'article pour vérifier le stock
-            article = db.query(Article).filter(Article.id_article == id_article).first()
+            article = articles.get(id_article)
             
             # 🔥 VÉRIFICATION DE STOCK pour les produits
             if article and article.type_article == 'PRODUIT':
@@ -1008,39 +1165,42 @@ async def create_facture(data: dict, request: Request, db: Session = Depends(get
                     precompte = montant_ht_ligne * 0.095
                     montant_ttc_ligne = montant_ht_ligne - precompte
             
-            db_ligne = LigneFacture(
-                quantite=quantite,
-                prix_unitaire=prix_unitaire,
-                montant_ht=montant_ht_ligne,
-                total_ht=montant_ht_ligne,
-                id_facture=db_facture.id_facture,
-                id_article=id_article
-            )
-            db.add(db_ligne)
+            lignes_facture.append({
+                "quantite": quantite,
+                "prix_unitaire": prix_unitaire,
+                "montant_ht": montant_ht_ligne,
+                "total_ht": montant_ht_ligne,
+                "id_facture": db_facture.id_facture,
+                "id_article": id_article
+            })
         
-        print(f"  {len(lignes)} lignes ajoutées")
+        inserer_en_masse(db, LigneFacture, lignes_facture)
         
         # Décrémenter le stock si payé (comme Python ligne 1581-1599)
         if montant_avance > 0:
-            for ligne in lignes:
-                article = db.query(Article).filter(Article.id_article == ligne['id_article']).first()
-                if article:
-                    article.stock_actuel = (article.stock_actuel or 0) - ligne['quantite']
-                    
-                    mouvement = MouvementStock(
-                        id_article=ligne['id_article'],
-                        type_mouvement='SORTIE',
-                        quantite=ligne['quantite'],
-                        date_mouvement=datetime.now(),
-                        reference=f"Facture {numero_facture}"
-                    )
-                    db.add(mouvement)
-            print(f"  Stock décrémenté pour {len(lignes)} articles")
+            # 🔥 UPDATE conditionnel : la vérification ci-dessus ne protège pas des ventes simultanées
+            retirer_stock(db, [(ligne['id_article'], ligne['quantite']) for ligne in lignes])
+            inserer_en_masse(db, MouvementStock, [
+                {
+                    "id_article": ligne['id_article'],
+                    "type_mouvement": 'SORTIE',
+                    "quantite": ligne['quantite'],
+                    "date_mouvement": datetime.now(),
+                    "reference": f"Facture {numero_facture}"
+                }
+                for ligne in lignes
+                if ligne['id_article'] in articles
+            ])
         
         db.commit()
+        invalider_cache('factures', 'articles')
         db.refresh(db_facture)
         
-        print(f"  Facture {numero_facture} enregistrée avec succès!")
+        journal_factures.info("Facture enregistrée", extra=champs(
+            id_facture=db_facture.id_facture, numero=numero_facture, id_client=id_client,
+            total_ttc=montant_ttc, lignes=len(lignes), stock_decremente=montant_avance > 0,
+            id_utilisateur=id_utilisateur
+        ))
         
         # Retourner avec infos client
         client = db.query(Client).filter(Client.id_client == id_client).first()
@@ -1059,26 +1219,25 @@ async def create_facture(data: dict, request: Request, db: Session = Depends(get
             "statut": statut,
             "client_nom": client.nom if client else "N/A"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
-        print(f"  ERREUR création facture: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_factures.exception("Erreur création facture", extra=champs(erreur=str(e)))
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 @app.put("/api/factures/{facture_id}")
-async def update_facture(facture_id: int, data: dict, db: Session = Depends(get_db)):
+def update_facture(facture_id: int, data: dict, db: Session = Depends(get_db)):
     """Modifier une facture existante"""
     try:
-        print(f"🔍 DEBUG - Modification facture {facture_id}")
-        print(f"🔍 DEBUG - Données reçues: {data}")
-        
         # Récupérer la facture
         facture = db.query(Facture).filter(Facture.id_facture == facture_id).first()
         if not facture:
             raise HTTPException(status_code=404, detail="Facture non trouvée")
         
-        print(f"🔍 DEBUG - Facture trouvée: {facture.numero_facture}")
+        debug_echantillonne(journal_factures, "Modification facture", id_facture=facture_id,
+                            numero=facture.numero_facture, cles=sorted(data), nb_lignes=len(data.get('lignes') or []))
+        agregat_avant = instantane_facture(facture)
         
         # Mettre à jour les champs un par un avec gestion d'erreurs
         try:
@@ -1100,10 +1259,8 @@ async def update_facture(facture_id: int, data: dict, db: Session = Depends(get_
             
             facture.precompte_applique = 1 if data.get('precompte_actif') else 0
             facture.type_facture = data.get('type_facture', facture.type_facture)
-            
-            print(f"  DEBUG - Champs mis à jour avec succès")
         except Exception as e:
-            print(f"  DEBUG - Erreur lors de la mise à jour des champs: {e}")
+            journal_factures.debug("Champs de facture invalides", extra=champs(id_facture=facture_id, erreur=str(e)))
             raise
         
         # Supprimer les anciennes lignes
@@ -1122,10 +1279,12 @@ async def update_facture(facture_id: int, data: dict, db: Session = Depends(get_
             )
             db.add(db_ligne)
         
+        maj_agregats(db, agregat_avant, instantane_facture(facture))
         db.commit()
+        invalider_cache('factures', 'articles')
         db.refresh(facture)
         
-        print(f"  Facture {facture.numero_facture} modifiée avec succès!")
+        journal_factures.info("Facture modifiée", extra=champs(numero=facture.numero_facture))
         
         # Retourner avec infos client
         client = db.query(Client).filter(Client.id_client == facture.id_client).first()
@@ -1146,13 +1305,11 @@ async def update_facture(facture_id: int, data: dict, db: Session = Depends(get_
         }
     except Exception as e:
         db.rollback()
-        print(f"  ERREUR modification facture: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_factures.exception("Erreur modification facture")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 @app.put("/api/factures/{facture_id}/annuler")
-async def annuler_facture(facture_id: int, db: Session = Depends(get_db)):
+def annuler_facture(facture_id: int, db: Session = Depends(get_db)):
     """Annuler une facture (marquer comme Annulée au lieu de supprimer)"""
     try:
         # Récupérer la facture
@@ -1174,25 +1331,31 @@ async def annuler_facture(facture_id: int, db: Session = Depends(get_db)):
         ).all()
         
         # Restaurer le stock pour chaque article
-        for ligne_facture, article in lignes:
-            if article and article.type_article == "PRODUIT":
-                # Remettre en stock
-                article.stock_actuel = (article.stock_actuel or 0) + ligne_facture.quantite
-                
-                # Créer un mouvement de stock (ENTREE)
-                mouvement = MouvementStock(
-                    id_article=ligne_facture.id_article,
-                    type_mouvement="ENTREE",
-                    quantite=ligne_facture.quantite,
-                    date_mouvement=datetime.now(),
-                    reference=f"Annulation {numero_facture}"
-                )
-                db.add(mouvement)
+        remettre_stock(db, [
+            (ligne_facture.id_article, ligne_facture.quantite)
+            for ligne_facture, article in lignes
+            if article and article.type_article == "PRODUIT"
+        ])
+        # Créer les mouvements de stock (ENTREE) en un seul INSERT multi-lignes
+        inserer_en_masse(db, MouvementStock, [
+            {
+                "id_article": ligne_facture.id_article,
+                "type_mouvement": "ENTREE",
+                "quantite": ligne_facture.quantite,
+                "date_mouvement": datetime.now(),
+                "reference": f"Annulation {numero_facture}"
+            }
+            for ligne_facture, article in lignes
+            if article and article.type_article == "PRODUIT"
+        ])
         
         # Marquer la facture comme annulée
+        agregat_avant = instantane_facture(facture)
         facture.statut = 'Annulée'
+        maj_agregats(db, agregat_avant, instantane_facture(facture))
         
         db.commit()
+        invalider_cache('factures', 'articles')
         
         return {
             "success": True,
@@ -1204,13 +1367,11 @@ async def annuler_facture(facture_id: int, db: Session = Depends(get_db)):
         raise
     except Exception as e:
         db.rollback()
-        print(f"  ERREUR annulation facture: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_factures.exception("Erreur annulation facture")
         raise HTTPException(status_code=500, detail=f"Erreur lors de l'annulation : {str(e)}")
 
 @app.delete("/api/factures/{facture_id}")
-async def delete_facture(facture_id: int, db: Session = Depends(get_db)):
+def delete_facture(facture_id: int, db: Session = Depends(get_db)):
     """Supprimer une facture - EXACTEMENT comme Python interface/facturation.py ligne 1965-1994"""
     try:
         # Récupérer la facture
@@ -1228,20 +1389,23 @@ async def delete_facture(facture_id: int, db: Session = Depends(get_db)):
         ).all()
         
         # Restaurer le stock pour chaque article (comme Python)
-        for ligne_facture, article in lignes:
-            if article and article.type_article == "PRODUIT":
-                # Remettre en stock
-                article.stock_actuel = (article.stock_actuel or 0) + ligne_facture.quantite
-                
-                # Créer un mouvement de stock (ENTREE)
-                mouvement = MouvementStock(
-                    id_article=ligne_facture.id_article,
-                    type_mouvement="ENTREE",
-                    quantite=ligne_facture.quantite,
-                    date_mouvement=datetime.now(),
-                    reference=f"Suppression {numero_facture}"
-                )
-                db.add(mouvement)
+        remettre_stock(db, [
+            (ligne_facture.id_article, ligne_facture.quantite)
+            for ligne_facture, article in lignes
+            if article and article.type_article == "PRODUIT"
+        ])
+        # Créer les mouvements de stock (ENTREE) en un seul INSERT multi-lignes
+        inserer_en_masse(db, MouvementStock, [
+            {
+                "id_article": ligne_facture.id_article,
+                "type_mouvement": "ENTREE",
+                "quantite": ligne_facture.quantite,
+                "date_mouvement": datetime.now(),
+                "reference": f"Suppression {numero_facture}"
+            }
+            for ligne_facture, article in lignes
+            if article and article.type_article == "PRODUIT"
+        ])
         
         # Supprimer d'abord les règlements associés
         db.query(Reglement).filter(Reglement.id_facture == facture_id).delete()
@@ -1250,9 +1414,11 @@ async def delete_facture(facture_id: int, db: Session = Depends(get_db)):
         db.query(LigneFacture).filter(LigneFacture.id_facture == facture_id).delete()
         
         # Supprimer la facture (comme Python ligne 1985)
+        maj_agregats(db, avant=instantane_facture(facture))
         db.delete(facture)
         
         db.commit()
+        invalider_cache('factures', 'articles', 'reglements')
         
         return {
             "success": True,
@@ -1264,18 +1430,24 @@ async def delete_facture(facture_id: int, db: Session = Depends(get_db)):
         raise
     except Exception as e:
         db.rollback()
-        print(f"  ERREUR suppression facture: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_factures.exception("Erreur suppression facture")
         raise HTTPException(status_code=500, detail=f"Erreur lors de la suppression : {str(e)}")
 
 # ==================== DEVIS ====================
 
 @app.get("/api/devis")
-async def get_devis(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Récupérer tous les devis avec informations enrichies"""
+def get_devis(skip: int = 0, limit: int = 100, after: Optional[str] = None, db: Session = Depends(get_db)):
+    """Récupérer tous les devis avec informations enrichies (?after=<created_at>,<id> pour la pagination par curseur)"""
     try:
-        devis_list = db.query(Devis).order_by(Devis.created_at.desc()).offset(skip).limit(limit).all()
+        query = db.query(Devis)
+        next_cursor = None
+        
+        if after is not None:
+            devis_list, next_cursor = paginer_par_curseur(
+                query, [Devis.created_at, Devis.id_devis], after, limit, descendant=True
+            )
+        else:
+            devis_list = query.order_by(Devis.created_at.desc()).offset(skip).limit(limit).all()
         
         result = []
         for devis in devis_list:
@@ -1311,34 +1483,26 @@ async def get_devis(skip: int = 0, limit: int = 100, db: Session = Depends(get_d
             }
             result.append(devis_dict)
         
-        return result
+        if after is not None:
+            return ReponseJSON({"items": result, "next_cursor": next_cursor})
+        return ReponseJSON(result)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Erreur chargement devis: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_devis.exception("Erreur chargement devis")
         return []
 
 @app.post("/api/devis", response_model=DevisResponse)
-async def create_devis(devis: DevisCreate, request: Request, db: Session = Depends(get_db)):
+def create_devis(devis: DevisCreate, request: Request, db: Session = Depends(get_db)):
     """Créer un nouveau devis"""
-    print("=" * 60)
-    print("🔵 CRÉATION DEVIS - DÉBUT")
-    print(f"Données reçues: {devis.dict()}")
-    print("=" * 60)
-    
     try:
         # Récupérer l'ID utilisateur connecté
         id_utilisateur = get_current_user_id(request)
-        print(f"  🔑 Devis créé par l'utilisateur ID: {id_utilisateur}")
-        
-        # Générer un numéro de devis automatique si non fourni
-        if not devis.numero_devis:
-            last_devis = db.query(Devis).order_by(Devis.id_devis.desc()).first()
-            next_num = (last_devis.id_devis + 1) if last_devis else 1
-            year = datetime.now().year
-            numero_devis = f"DEV-{year}-{next_num:03d}"
-        else:
-            numero_devis = devis.numero_devis
+        debug_echantillonne(journal_devis, "Création devis", id_utilisateur=id_utilisateur,
+                            id_client=devis.id_client, nb_lignes=len(devis.lignes or []))
+        
+        # Numéro saisi à la main conservé, sinon attribué maintenant (l'aperçu du formulaire n'est pas réservé)
+        numero_devis = numero_document('DEV', devis.numero_devis, db)
         
         # Créer le devis
         devis_data = devis.dict(exclude={'numero_devis', 'lignes'})
@@ -1364,6 +1528,7 @@ async def create_devis(devis: DevisCreate, request: Request, db: Session = Depen
         )
         db.add(db_devis)
         db.commit()
+        invalider_cache('devis')
         db.refresh(db_devis)
         
         # Ajouter les lignes si fournies
@@ -1412,28 +1577,26 @@ async def create_devis(devis: DevisCreate, request: Request, db: Session = Depen
             db_devis.total_ht = total_ht
             db_devis.total_ttc = total_ttc
             db.commit()
+            invalider_cache('devis')
             db.refresh(db_devis)
         
-        print("  DEVIS CRÉÉ AVEC SUCCÈS")
+        journal_devis.info("Devis enregistré", extra=champs(
+            id_devis=db_devis.id_devis, numero=numero_devis, id_client=db_devis.id_client,
+            total_ttc=db_devis.total_ttc, id_utilisateur=id_utilisateur
+        ))
         return db_devis
         
     except Exception as e:
-        print(f"  ERREUR CRÉATION DEVIS: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_devis.exception("Erreur création devis", extra=champs(erreur=str(e)))
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/devis/generate-numero")
-async def generate_numero_devis(db: Session = Depends(get_db)):
-    """Générer un numéro de devis automatique"""
-    last_devis = db.query(Devis).order_by(Devis.id_devis.desc()).first()
-    next_num = (last_devis.id_devis + 1) if last_devis else 1
-    year = datetime.now().year
-    numero_devis = f"DEV-{year}-{next_num:03d}"
-    return numero_devis
+def generate_numero_devis(db: Session = Depends(get_db)):
+    """Aperçu du prochain numéro de devis (rien n'est réservé : le numéro est attribué à la création)"""
+    return apercu_numero('DEV', db)
 
 @app.get("/api/devis/{devis_id}", response_model=DevisResponse)
-async def get_devis_by_id(devis_id: int, db: Session = Depends(get_db)):
+def get_devis_by_id(devis_id: int, db: Session = Depends(get_db)):
     """Récupérer un devis par ID"""
     devis = db.query(Devis).filter(Devis.id_devis == devis_id).first()
     if not devis:
@@ -1441,7 +1604,7 @@ async def get_devis_by_id(devis_id: int, db: Session = Depends(get_db)):
     return devis
 
 @app.get("/api/devis/{devis_id}/lignes")
-async def get_devis_lignes(devis_id: int, db: Session = Depends(get_db)):
+def get_devis_lignes(devis_id: int, db: Session = Depends(get_db)):
     """Récupérer les lignes d'un devis"""
     try:
         # Vérifier que le devis existe
@@ -1469,13 +1632,11 @@ async def get_devis_lignes(devis_id: int, db: Session = Depends(get_db)):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"  ERREUR GET LIGNES DEVIS: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_devis.exception("Erreur get lignes devis")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 @app.get("/api/devis/{devis_id}/details")
-async def get_devis_details(devis_id: int, db: Session = Depends(get_db)):
+def get_devis_details(devis_id: int, db: Session = Depends(get_db)):
     """Récupérer un devis avec ses lignes et informations client"""
     devis = db.query(Devis).filter(Devis.id_devis == devis_id).first()
     if not devis:
@@ -1527,10 +1688,10 @@ async def get_devis_details(devis_id: int, db: Session = Depends(get_db)):
     }
 
 @app.put("/api/devis/{devis_id}")
-async def update_devis(devis_id: int, data: dict, db: Session = Depends(get_db)):
+def update_devis(devis_id: int, data: dict, db: Session = Depends(get_db)):
     """Mettre à jour un devis"""
     try:
-        print(f"🔍 DEBUG - Modification devis {devis_id}: {data}")
+        debug_echantillonne(journal_devis, "Modification devis", id_devis=devis_id, cles=sorted(data))
         
         db_devis = db.query(Devis).filter(Devis.id_devis == devis_id).first()
         if not db_devis:
@@ -1568,9 +1729,10 @@ async def update_devis(devis_id: int, data: dict, db: Session = Depends(get_db))
             db.add(db_ligne)
         
         db.commit()
+        invalider_cache('devis')
         db.refresh(db_devis)
         
-        print(f"  Devis {db_devis.numero_devis} modifié avec succès!")
+        journal_devis.info("Devis modifié", extra=champs(numero=db_devis.numero_devis))
         
         # Retourner avec infos client
         client = db.query(Client).filter(Client.id_client == db_devis.id_client).first()
@@ -1588,13 +1750,11 @@ async def update_devis(devis_id: int, data: dict, db: Session = Depends(get_db))
         }
     except Exception as e:
         db.rollback()
-        print(f"  ERREUR modification devis: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_devis.exception("Erreur modification devis")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 @app.put("/api/devis/{devis_id}/annuler")
-async def annuler_devis(devis_id: int, db: Session = Depends(get_db)):
+def annuler_devis(devis_id: int, db: Session = Depends(get_db)):
     """Annuler un devis (marquer comme Annulé au lieu de supprimer)"""
     try:
         db_devis = db.query(Devis).filter(Devis.id_devis == devis_id).first()
@@ -1608,6 +1768,7 @@ async def annuler_devis(devis_id: int, db: Session = Depends(get_db)):
         # Marquer le devis comme annulé
         db_devis.statut = 'Annulé'
         db.commit()
+        invalider_cache('devis')
         
         return {
             "success": True,
@@ -1617,13 +1778,11 @@ async def annuler_devis(devis_id: int, db: Session = Depends(get_db)):
         raise
     except Exception as e:
         db.rollback()
-        print(f"  ERREUR annulation devis: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_devis.exception("Erreur annulation devis")
         raise HTTPException(status_code=500, detail=f"Erreur lors de l'annulation : {str(e)}")
 
 @app.delete("/api/devis/{devis_id}")
-async def delete_devis(devis_id: int, db: Session = Depends(get_db)):
+def delete_devis(devis_id: int, db: Session = Depends(get_db)):
     """Supprimer un devis"""
     db_devis = db.query(Devis).filter(Devis.id_devis == devis_id).first()
     if not db_devis:
@@ -1635,10 +1794,11 @@ async def delete_devis(devis_id: int, db: Session = Depends(get_db)):
     # Supprimer le devis
     db.delete(db_devis)
     db.commit()
+    invalider_cache('devis')
     return {"message": "Devis supprimé avec succès"}
 
 @app.put("/api/devis/{devis_id}/valider")
-async def valider_devis(devis_id: int, db: Session = Depends(get_db)):
+def valider_devis(devis_id: int, db: Session = Depends(get_db)):
     """Valider un devis (passer de 'En attente' à 'Accepté') ET créer une facture"""
     db_devis = db.query(Devis).filter(Devis.id_devis == devis_id).first()
     if not db_devis:
@@ -1650,10 +1810,7 @@ async def valider_devis(devis_id: int, db: Session = Depends(get_db)):
     
     # 2. Créer une facture à partir du devis
     # Générer un numéro de facture
-    last_facture = db.query(Facture).order_by(Facture.id_facture.desc()).first()
-    next_num = (last_facture.id_facture + 1) if last_facture else 1
-    year = datetime.now().year
-    numero_facture = f"FAC-{year}-{next_num:03d}"
+    numero_facture = prochain_numero('FAC', db)
     
     # Créer la facture (NON PAYÉE initialement)
     # Le statut sera mis à jour lors du premier règlement
@@ -1676,26 +1833,28 @@ async def valider_devis(devis_id: int, db: Session = Depends(get_db)):
         id_devis=db_devis.id_devis
     )
     db.add(facture)
+    maj_agregats(db, apres=instantane_facture(facture))
     db.commit()
     db.refresh(facture)
     
     # 3. Copier les lignes du devis vers la facture
     lignes_devis = db.query(LigneDevis).filter(LigneDevis.id_devis == devis_id).all()
-    print(f"  Copie de {len(lignes_devis)} ligne(s) du devis {db_devis.numero_devis} vers facture {numero_facture}")
+    journal_devis.debug("Copie des lignes du devis", extra=champs(devis=db_devis.numero_devis, facture=numero_facture, nb_lignes=len(lignes_devis)))
     
+    lignes_facture = []
     for ligne_devis in lignes_devis:
-        ligne_facture = LigneFacture(
-            id_facture=facture.id_facture,
-            id_article=ligne_devis.id_article,
-            quantite=ligne_devis.quantite,
-            prix_unitaire=ligne_devis.prix_unitaire,
-            total_ht=ligne_devis.total_ht
-        )
-        db.add(ligne_facture)
-        print(f"    Ligne ajoutée: {ligne_devis.quantite}x article {ligne_devis.id_article} = {ligne_devis.total_ht} FCFA")
+        lignes_facture.append({
+            "id_facture": facture.id_facture,
+            "id_article": ligne_devis.id_article,
+            "quantite": ligne_devis.quantite,
+            "prix_unitaire": ligne_devis.prix_unitaire,
+            "total_ht": ligne_devis.total_ht
+        })
+    inserer_en_masse(db, LigneFacture, lignes_facture)
     
     db.commit()
-    print(f"  Facture {numero_facture} créée avec {len(lignes_devis)} ligne(s)")
+    invalider_cache('devis', 'factures')
+    journal_devis.info("Facture créée depuis le devis", extra=champs(devis=db_devis.numero_devis, facture=numero_facture, nb_lignes=len(lignes_devis)))
     
     return {
         "message": "Devis validé et facture créée avec succès",
@@ -1707,263 +1866,211 @@ async def valider_devis(devis_id: int, db: Session = Depends(get_db)):
 # ==================== STATISTIQUES DASHBOARD ====================
 
 @app.get("/api/stats/dashboard")
-async def get_dashboard_stats(db: Session = Depends(get_db)):
+def get_dashboard_stats(db: Session = Depends(get_db)):
     """Récupérer les statistiques du dashboard - EXACTEMENT comme Python ligne 324-417"""
     try:
-        from sqlalchemy import func, case
-        
-        # Statistique 1: Clients (ligne 329)
-        nb_clients = db.query(func.count(Client.id_client)).scalar() or 0
-        
-        # Statistique 2: Articles (ligne 330)
-        nb_articles = db.query(func.count(Article.id_article)).scalar() or 0
-        
-        # Statistique 3: Factures Normales (ligne 331)
-        nb_factures_normales = db.query(func.count(Facture.id_facture)).filter(
-            Facture.type_facture == 'NORMALE'
-        ).scalar() or 0
-        
-        # Statistique 4: Ventes Comptoir (ligne 332)
-        nb_ventes_comptoir = db.query(func.count(Facture.id_facture)).filter(
-            Facture.type_facture == 'COMPTOIR'
-        ).scalar() or 0
-        
-        # Statistique 5: Devis (ligne 333)
-        nb_devis = db.query(func.count(Devis.id_devis)).scalar() or 0
-        
-        # Statistique 6: Règlements (ligne 334)
-        nb_reglements = db.query(func.count(Reglement.id_reglement)).scalar() or 0
-        
-        # Statistique 7: Avoirs (ligne 335)
-        nb_avoirs = db.query(func.count(Avoir.id_avoir)).scalar() or 0
-        
-        # Statistique 8: Chiffre d'Affaires avec retours soustraits (ligne 336-361)
-        # 🔥 Mélange: COMPTOIR/RETOUR utilise total_ttc, NORMALE utilise montant_avance (déjà payé)
-        # 🔥 CORRECTION: Pour facturation NORMALE, ne comptabiliser que les factures payées (statut Payée)
-        ca_total = db.query(
-            func.coalesce(
-                func.sum(
-                    case(
-                        (Facture.type_facture == 'RETOUR', -Facture.total_ttc),
-                        (Facture.type_facture == 'COMPTOIR', Facture.total_ttc),
-                        else_=Facture.montant_avance  # NORMALE utilise montant déjà payé
-                    )
-                ),
-                0
-            )
-        ).filter(
-            Facture.statut != 'Annulée'
-        ).filter(
-            # Pour factures NORMALES: seulement celles payées (montant_avance > 0)
-            # Pour COMPTOIR/RETOUR: toutes les non-annulées
-            ((Facture.type_facture == 'NORMALE') & (Facture.montant_avance > 0)) |
-            (Facture.type_facture.in_(['COMPTOIR', 'RETOUR']))
-        ).scalar() or 0
-        
-        # Statistique 9: Créances (Impayés) (ligne 363-372)
-        creances = db.query(
-            func.coalesce(func.sum(Facture.montant_reste), 0)
-        ).filter(
-            Facture.statut != 'Annulée',
-            Facture.montant_reste > 0
-        ).scalar() or 0
-        
-        return {
-            "nb_clients": int(nb_clients),
-            "nb_articles": int(nb_articles),
-            "nb_factures_normales": int(nb_factures_normales),
-            "nb_ventes_comptoir": int(nb_ventes_comptoir),
-            "nb_devis": int(nb_devis),
-            "nb_reglements": int(nb_reglements),
-            "nb_avoirs": int(nb_avoirs),
-            "ca_total": float(ca_total),
-            "creances": float(creances)
-        }
+        return cache_stats(
+            "dashboard",
+            ('clients', 'articles', 'factures', 'devis', 'reglements', 'avoirs'),
+            lambda: _calculer_dashboard_stats(db)
+        )
     except Exception as e:
-        print(f"Erreur récupération stats dashboard: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_stats.exception("Erreur récupération stats dashboard")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _calculer_dashboard_stats(db: Session):
+    """Calcul des statistiques du dashboard (mis en cache par get_dashboard_stats)"""
+    from sqlalchemy import func, case
+    
+    # Statistique 1: Clients (ligne 329)
+    nb_clients = db.query(func.count(Client.id_client)).scalar() or 0
+    
+    # Statistique 2: Articles (ligne 330)
+    nb_articles = db.query(func.count(Article.id_article)).scalar() or 0
+    
+    # Statistiques 5 à 7: Devis, Règlements, Avoirs (ligne 333-335)
+    nb_devis = db.query(func.count(Devis.id_devis)).scalar() or 0
+    nb_reglements = db.query(func.count(Reglement.id_reglement)).scalar() or 0
+    nb_avoirs = db.query(func.count(Avoir.id_avoir)).scalar() or 0
+    
+    # Statistiques 3, 4, 8 et 9 lues dans la table d'agrégats vente_journaliere (un seul SELECT)
+    # 🔥 CA: COMPTOIR/RETOUR utilise total_ttc, NORMALE utilise montant_avance (factures payées seulement)
+    # 🔥 Créances: montant_reste > 0 des factures non annulées
+    agregats = db.query(
+        func.coalesce(func.sum(case(
+            (VenteJournaliere.type_facture == 'NORMALE', VenteJournaliere.nb_factures + VenteJournaliere.nb_annulees),
+            else_=0
+        )), 0).label('nb_factures_normales'),
+        func.coalesce(func.sum(case(
+            (VenteJournaliere.type_facture == 'COMPTOIR', VenteJournaliere.nb_factures + VenteJournaliere.nb_annulees),
+            else_=0
+        )), 0).label('nb_ventes_comptoir'),
+        func.coalesce(func.sum(expression_ca()), 0).label('ca_total'),
+        func.coalesce(func.sum(VenteJournaliere.montant_reste), 0).label('creances')
+    ).one()
+    
+    nb_factures_normales = agregats.nb_factures_normales or 0
+    nb_ventes_comptoir = agregats.nb_ventes_comptoir or 0
+    ca_total = agregats.ca_total or 0
+    creances = agregats.creances or 0
+    
+    return {
+        "nb_clients": int(nb_clients),
+        "nb_articles": int(nb_articles),
+        "nb_factures_normales": int(nb_factures_normales),
+        "nb_ventes_comptoir": int(nb_ventes_comptoir),
+        "nb_devis": int(nb_devis),
+        "nb_reglements": int(nb_reglements),
+        "nb_avoirs": int(nb_avoirs),
+        "ca_total": float(ca_total),
+        "creances": float(creances)
+    }
+
 @app.get("/api/stats/ventes-mois")
-async def get_ventes_par_mois(db: Session = Depends(get_db)):
+def get_ventes_par_mois(db: Session = Depends(get_db)):
     """Récupérer les ventes par mois SEPAREES par type (Comptoir, Normale, Total)"""
     try:
-        from sqlalchemy import func, case, extract
-        
-        annee_actuelle = datetime.now().year
-        
-        # VENTES COMPTOIR NETTES par mois (retours soustraits)
-        # 🔥 CORRECTION: Utiliser total_ttc (montant réel vendu) au lieu de montant_avance (montant reçu)
-        resultats_comptoir = db.query(
-            extract('month', Facture.date_facture).label('mois'),
-            func.coalesce(
-                func.sum(
-                    case(
-                        # Les factures de retour impactent le net en négatif
-                        (Facture.type_facture == 'RETOUR', -Facture.total_ttc),
-                        # Les ventes comptoir impactent en positif
-                        (Facture.type_facture == 'COMPTOIR', Facture.total_ttc),
-                        # Autres types n'impactent pas la série comptoir
-                        else_=0
-                    )
-                ),
-                0
-            ).label('total')
-        ).filter(
-            extract('year', Facture.date_facture) == annee_actuelle,
-            Facture.statut != 'Annulée'
-        ).group_by(
-            extract('month', Facture.date_facture)
-        ).order_by('mois').all()
-        
-        # VENTES NORMALES par mois (sans retours)
-        # 🔥 Pour facturation NORMALE: utiliser montant_avance (montant déjà payé) car paiement différé possible
-        # 🔥 CORRECTION: Ne comptabiliser que les factures payées (montant_avance > 0)
-        resultats_normales = db.query(
-            extract('month', Facture.date_facture).label('mois'),
-            func.coalesce(func.sum(Facture.montant_avance), 0).label('total')
-        ).filter(
-            extract('year', Facture.date_facture) == annee_actuelle,
-            Facture.type_facture == 'NORMALE',
-            Facture.statut != 'Annulée',
-            Facture.montant_avance > 0  # Seulement les factures payées
-        ).group_by(
-            extract('month', Facture.date_facture)
-        ).order_by('mois').all()
-        
-        # TOTAL (avec retours soustraits) - MySQL compatible
-        # 🔥 Mélange: COMPTOIR/RETOUR utilise total_ttc, NORMALE utilise montant_avance (déjà payé)
-        # 🔥 CORRECTION: Pour facturation NORMALE, ne comptabiliser que les factures payées (montant_avance > 0)
-        resultats_total = db.query(
-            extract('month', Facture.date_facture).label('mois'),
-            func.coalesce(
-                func.sum(
-                    case(
-                        (Facture.type_facture == 'RETOUR', -Facture.total_ttc),
-                        (Facture.type_facture == 'COMPTOIR', Facture.total_ttc),
-                        else_=Facture.montant_avance  # NORMALE utilise montant déjà payé
-                    )
-                ),
-                0
-            ).label('total')
-        ).filter(
-            extract('year', Facture.date_facture) == annee_actuelle,
-            Facture.statut != 'Annulée'
-        ).filter(
-            # Pour factures NORMALES: seulement celles payées (montant_avance > 0)
-            # Pour COMPTOIR/RETOUR: toutes les non-annulées
-            ((Facture.type_facture == 'NORMALE') & (Facture.montant_avance > 0)) |
-            (Facture.type_facture.in_(['COMPTOIR', 'RETOUR']))
-        ).group_by(
-            extract('month', Facture.date_facture)
-        ).order_by('mois').all()
-        
-        # Créer les dicts (mois en tant qu'entier maintenant)
-        comptoir_dict = {int(row.mois): float(row.total) for row in resultats_comptoir}
-        normales_dict = {int(row.mois): float(row.total) for row in resultats_normales}
-        total_dict = {int(row.mois): float(row.total) for row in resultats_total}
-        
-        # Préparer les données pour tous les 12 mois
-        totaux_comptoir = []
-        totaux_normales = []
-        totaux_total = []
-        
-        for i in range(1, 13):
-            val_comp = comptoir_dict.get(i, 0)
-            val_norm = normales_dict.get(i, 0)
-            val_total = total_dict.get(i, 0)
-            # Empêcher les valeurs négatives dans les graphes
-            totaux_comptoir.append(val_comp if val_comp > 0 else 0)
-            totaux_normales.append(val_norm if val_norm > 0 else 0)
-            totaux_total.append(val_total if val_total > 0 else 0)
-        
-        return {
-            "mois": ['Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin', 
-                    'Juillet', 'Août', 'Sept', 'Oct', 'Nov', 'Déc'],
-            "totaux_comptoir": totaux_comptoir,
-            "totaux_normales": totaux_normales,
-            "totaux_total": totaux_total,
-            "annee": annee_actuelle
-        }
-        
+        return cache_stats(
+            f"ventes-mois:{datetime.now().year}",
+            ('factures',),
+            lambda: _calculer_ventes_par_mois(db)
+        )
     except Exception as e:
-        print(f"Erreur ventes par mois: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_stats.exception("Erreur ventes par mois")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _calculer_ventes_par_mois(db: Session):
+    """Calcul des ventes par mois de l'année (mis en cache par get_ventes_par_mois)"""
+    from sqlalchemy import func, case, extract
+    
+    annee_actuelle = datetime.now().year
+    
+    # Les trois séries sont lues en un seul SELECT dans la table d'agrégats vente_journaliere
+    # - COMPTOIR NET: total_ttc des ventes comptoir, retours soustraits
+    # - NORMALES: montant_avance (montant déjà payé, factures payées seulement)
+    # - TOTAL: CA net (même règle que le dashboard)
+    mois = extract('month', VenteJournaliere.date_vente)
+    resultats = db.query(
+        mois.label('mois'),
+        func.coalesce(func.sum(case(
+            (VenteJournaliere.type_facture == 'RETOUR', -VenteJournaliere.total_ttc),
+            (VenteJournaliere.type_facture == 'COMPTOIR', VenteJournaliere.total_ttc),
+            else_=0
+        )), 0).label('comptoir'),
+        func.coalesce(func.sum(case(
+            (VenteJournaliere.type_facture == 'NORMALE', VenteJournaliere.montant_avance),
+            else_=0
+        )), 0).label('normales'),
+        func.coalesce(func.sum(expression_ca()), 0).label('total')
+    ).filter(
+        VenteJournaliere.date_vente >= date(annee_actuelle, 1, 1),
+        VenteJournaliere.date_vente <= date(annee_actuelle, 12, 31)
+    ).group_by(mois).all()
+    
+    # Créer les dicts (mois en tant qu'entier maintenant)
+    comptoir_dict = {int(row.mois): float(row.comptoir) for row in resultats}
+    normales_dict = {int(row.mois): float(row.normales) for row in resultats}
+    total_dict = {int(row.mois): float(row.total) for row in resultats}
+    
+    # Préparer les données pour tous les 12 mois
+    totaux_comptoir = []
+    totaux_normales = []
+    totaux_total = []
+    
+    for i in range(1, 13):
+        val_comp = comptoir_dict.get(i, 0)
+        val_norm = normales_dict.get(i, 0)
+        val_total = total_dict.get(i, 0)
+        # Empêcher les valeurs négatives dans les graphes
+        totaux_comptoir.append(val_comp if val_comp > 0 else 0)
+        totaux_normales.append(val_norm if val_norm > 0 else 0)
+        totaux_total.append(val_total if val_total > 0 else 0)
+    
+    return {
+        "mois": ['Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin', 
+                'Juillet', 'Août', 'Sept', 'Oct', 'Nov', 'Déc'],
+        "totaux_comptoir": totaux_comptoir,
+        "totaux_normales": totaux_normales,
+        "totaux_total": totaux_total,
+        "annee": annee_actuelle
+    }
+
 @app.get("/api/stats/activite-recente")
-async def get_activite_recente(db: Session = Depends(get_db)):
+def get_activite_recente(db: Session = Depends(get_db)):
     """Récupérer l'activité récente - EXACTEMENT comme Python ligne 583-700"""
     try:
-        from datetime import timedelta
-        
-        date_limite = date.today() - timedelta(days=7)
-        activites = []
-        
-        # Factures récentes (ligne 588-598)
-        factures = db.query(Facture, Client).join(
-            Client, Facture.id_client == Client.id_client, isouter=True
-        ).filter(
-            Facture.date_facture >= date_limite
-        ).order_by(Facture.date_facture.desc()).limit(10).all()
-        
-        for facture, client in factures:
-            activites.append({
-                "type_activite": "facture",
-                "numero": facture.numero_facture,
-                "client_nom": client.nom if client else "N/A",
-                "montant": float(facture.montant_ttc or facture.total_ttc or 0),
-                "date_activite": facture.date_facture.isoformat() if facture.date_facture else None,
-                "statut": facture.statut
-            })
-        
-        # Devis récents (ligne 600-611)
-        devis = db.query(Devis, Client).join(
-            Client, Devis.id_client == Client.id_client, isouter=True
-        ).filter(
-            Devis.date_devis >= date_limite
-        ).order_by(Devis.date_devis.desc()).limit(10).all()
-        
-        for dev, client in devis:
-            activites.append({
-                "type_activite": "devis",
-                "numero": dev.numero_devis,
-                "client_nom": client.nom if client else "N/A",
-                "montant": float(dev.montant_ttc or dev.total_ttc or 0),
-                "date_activite": dev.date_devis.isoformat() if dev.date_devis else None,
-                "statut": dev.statut
-            })
-        
-        # Trier toutes les activités par date décroissante et prendre les 10 premières (ligne 625)
-        activites.sort(key=lambda x: x['date_activite'] or '', reverse=True)
-        activites = activites[:10]
-        
-        return activites
-        
+        return cache_stats(
+            f"activite-recente:{date.today().isoformat()}",
+            ('factures', 'devis', 'clients'),
+            lambda: _calculer_activite_recente(db)
+        )
     except Exception as e:
-        print(f"Erreur activité récente: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_stats.exception("Erreur activité récente")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _calculer_activite_recente(db: Session):
+    """Calcul de l'activité récente (mis en cache par get_activite_recente)"""
+    from datetime import timedelta
+    
+    date_limite = date.today() - timedelta(days=7)
+    activites = []
+    
+    # Factures récentes (ligne 588-598)
+    factures = db.query(Facture, Client).join(
+        Client, Facture.id_client == Client.id_client, isouter=True
+    ).filter(
+        Facture.date_facture >= date_limite
+    ).order_by(Facture.date_facture.desc()).limit(10).all()
+    
+    for facture, client in factures:
+        activites.append({
+            "type_activite": "facture",
+            "numero": facture.numero_facture,
+            "client_nom": client.nom if client else "N/A",
+            "montant": float(facture.montant_ttc or facture.total_ttc or 0),
+            "date_activite": facture.date_facture.isoformat() if facture.date_facture else None,
+            "statut": facture.statut
+        })
+    
+    # Devis récents (ligne 600-611)
+    devis = db.query(Devis, Client).join(
+        Client, Devis.id_client == Client.id_client, isouter=True
+    ).filter(
+        Devis.date_devis >= date_limite
+    ).order_by(Devis.date_devis.desc()).limit(10).all()
+    
+    for dev, client in devis:
+        activites.append({
+            "type_activite": "devis",
+            "numero": dev.numero_devis,
+            "client_nom": client.nom if client else "N/A",
+            "montant": float(dev.montant_ttc or dev.total_ttc or 0),
+            "date_activite": dev.date_devis.isoformat() if dev.date_devis else None,
+            "statut": dev.statut
+        })
+    
+    # Trier toutes les activités par date décroissante et prendre les 10 premières (ligne 625)
+    activites.sort(key=lambda x: x['date_activite'] or '', reverse=True)
+    activites = activites[:10]
+    
+    return activites
+
 # ==================== RECHERCHE ====================
 
 @app.get("/api/search/clients")
-async def search_clients(q: str, db: Session = Depends(get_db)):
-    """Rechercher des clients"""
-    clients = db.query(Client).filter(
+def search_clients(q: str, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    """Rechercher des clients (sans l'adresse, sauf ?fields=...,adresse)"""
+    clients = db.query(*colonnes_demandees(Client, fields, CHAMPS_RECHERCHE_CLIENT)).filter(
         Client.nom.contains(q) | 
         Client.email.contains(q) |
         Client.telephone.contains(q)
     ).limit(10).all()
-    return clients
+    return ReponseJSON(en_dicts(clients))
 
 @app.get("/api/search/articles")
-async def search_articles(q: str, inclure_inactifs: bool = False, db: Session = Depends(get_db)):
-    """Rechercher des articles (uniquement actifs par défaut)"""
-    query = db.query(Article).filter(
+def search_articles(q: str, inclure_inactifs: bool = False, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    """Rechercher des articles (uniquement actifs par défaut, sans description ni image sauf ?fields=)"""
+    query = db.query(*colonnes_demandees(Article, fields, CHAMPS_RECHERCHE_ARTICLE)).filter(
         Article.designation.contains(q) |
         Article.code_article.contains(q) |
         Article.categorie.contains(q)
@@ -1974,21 +2081,32 @@ async def search_articles(q: str, inclure_inactifs: bool = False, db: Session =
         query = query.filter(Article.actif == True)
     
     articles = query.limit(10).all()
-    return articles
+    return ReponseJSON(en_dicts(articles))
 
 
 # ============================================================================
 # FOURNISSEURS
 # ============================================================================
 
-@app.get("/api/fournisseurs", response_model=List[FournisseurResponse])
-async def get_fournisseurs(db: Session = Depends(get_db)):
-    """Récupérer tous les fournisseurs"""
-    fournisseurs = db.query(Fournisseur).all()
-    return fournisseurs
+@app.get("/api/fournisseurs", response_model=Union[List[FournisseurResponse], PageFournisseurs])
+def get_fournisseurs(request: Request, after: Optional[str] = None, limit: int = 100, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    """Récupérer tous les fournisseurs (?after=<id> active la pagination par curseur, limit ne s'applique qu'à ce mode ; ?fields= limite les colonnes)"""
+    query = db.query(*colonnes_demandees(Fournisseur, fields, CHAMPS_FOURNISSEUR))
+    
+    # 304 si le navigateur a déjà cette version de la table (voir versions_tables.py)
+    version = lire_version(db, 'fournisseur')
+    if non_modifie(request, version):
+        return reponse_304(version)
+    
+    if after is not None:
+        fournisseurs, next_cursor = paginer_par_curseur(query, [Fournisseur.id_fournisseur], after, limit)
+        return ReponseJSON({"items": en_dicts(fournisseurs), "next_cursor": next_cursor}, headers=entetes_version(version))
+    
+    fournisseurs = query.all()
+    return ReponseJSON(en_dicts(fournisseurs), headers=entetes_version(version))
 
 @app.get("/api/fournisseurs/{fournisseur_id}")
-async def get_fournisseur(fournisseur_id: int, db: Session = Depends(get_db)):
+def get_fournisseur(fournisseur_id: int, db: Session = Depends(get_db)):
     """Récupérer un fournisseur par ID avec statistiques"""
     try:
         fournisseur = db.query(Fournisseur).filter(Fournisseur.id_fournisseur == fournisseur_id).first()
@@ -2025,21 +2143,16 @@ async def get_fournisseur(fournisseur_id: int, db: Session = Depends(get_db)):
             }
         }
     except Exception as e:
-        print(f"Erreur get_fournisseur: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_fournisseurs.exception("Erreur get_fournisseur")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 @app.post("/api/fournisseurs", response_model=FournisseurResponse)
-async def create_fournisseur(fournisseur: FournisseurCreate, db: Session = Depends(get_db)):
+def create_fournisseur(fournisseur: FournisseurCreate, db: Session = Depends(get_db)):
     """Créer un nouveau fournisseur"""
     # Générer un numéro de fournisseur automatique si non fourni
     fournisseur_data = fournisseur.dict()
     if not fournisseur_data.get('numero_fournisseur'):
-        last_fournisseur = db.query(Fournisseur).order_by(Fournisseur.id_fournisseur.desc()).first()
-        next_num = (last_fournisseur.id_fournisseur + 1) if last_fournisseur else 1
-        year = datetime.now().year
-        fournisseur_data['numero_fournisseur'] = f"FOUR-{year}-{next_num:03d}"
+        fournisseur_data['numero_fournisseur'] = prochain_numero('FOUR', db)
     
     new_fournisseur = Fournisseur(**fournisseur_data)
     db.add(new_fournisseur)
@@ -2048,15 +2161,18 @@ async def create_fournisseur(fournisseur: FournisseurCreate, db: Session = Depen
     return new_fournisseur
 
 @app.put("/api/fournisseurs/{fournisseur_id}")
-async def update_fournisseur(fournisseur_id: int, data: dict, db: Session = Depends(get_db)):
+def update_fournisseur(fournisseur_id: int, data: dict, db: Session = Depends(get_db)):
     """Mettre à jour un fournisseur"""
     try:
-        print(f"🔍 DEBUG - Modification fournisseur {fournisseur_id}: {data}")
+        debug_echantillonne(journal_fournisseurs, "Modification fournisseur", id_fournisseur=fournisseur_id, cles=sorted(data))
         
         db_fournisseur = db.query(Fournisseur).filter(Fournisseur.id_fournisseur == fournisseur_id).first()
         if not db_fournisseur:
             raise HTTPException(status_code=404, detail="Fournisseur non trouvé")
         
+        if data.get('image_path'):
+            data['image_path'] = stocker_image_path(data['image_path'])
+        
         # Mettre à jour les champs
         for key, value in data.items():
             if hasattr(db_fournisseur, key) and value is not None:
@@ -2065,17 +2181,15 @@ async def update_fournisseur(fournisseur_id: int, data: dict, db: Session = Depe
         db.commit()
         db.refresh(db_fournisseur)
         
-        print(f"  Fournisseur {db_fournisseur.nom_fournisseur} modifié avec succès!")
+        journal_fournisseurs.info("Fournisseur modifié", extra=champs(id_fournisseur=fournisseur_id))
         return db_fournisseur
     except Exception as e:
         db.rollback()
-        print(f"  ERREUR modification fournisseur: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_fournisseurs.exception("Erreur modification fournisseur")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 @app.delete("/api/fournisseurs/{fournisseur_id}")
-async def delete_fournisseur(fournisseur_id: int, db: Session = Depends(get_db)):
+def delete_fournisseur(fournisseur_id: int, db: Session = Depends(get_db)):
     """Supprimer un fournisseur"""
     fournisseur = db.query(Fournisseur).filter(Fournisseur.id_fournisseur == fournisseur_id).first()
     if not fournisseur:
@@ -2091,10 +2205,18 @@ async def delete_fournisseur(fournisseur_id: int, db: Session = Depends(get_db))
 # ============================================================================
 
 @app.get("/api/reglements")
-async def get_reglements(db: Session = Depends(get_db)):
-    """Récupérer tous les règlements avec informations enrichies"""
+def get_reglements(after: Optional[str] = None, limit: int = 100, db: Session = Depends(get_db)):
+    """Récupérer tous les règlements avec informations enrichies (?after=<date>,<id> pour la pagination par curseur)"""
     try:
-        reglements_list = db.query(Reglement).order_by(Reglement.date_reglement.desc()).all()
+        query = db.query(Reglement)
+        next_cursor = None
+        
+        if after is not None:
+            reglements_list, next_cursor = paginer_par_curseur(
+                query, [Reglement.date_reglement, Reglement.id_reglement], after, limit, descendant=True
+            )
+        else:
+            reglements_list = query.order_by(Reglement.date_reglement.desc()).all()
         
         result = []
         for reglement in reglements_list:
@@ -2121,15 +2243,17 @@ async def get_reglements(db: Session = Depends(get_db)):
             }
             result.append(reglement_dict)
         
-        return result
+        if after is not None:
+            return ReponseJSON({"items": result, "next_cursor": next_cursor})
+        return ReponseJSON(result)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Erreur chargement règlements: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_reglements.exception("Erreur chargement règlements")
         return []
 
 @app.get("/api/factures/{facture_id}/reglements")
-async def get_reglements_facture(facture_id: int, db: Session = Depends(get_db)):
+def get_reglements_facture(facture_id: int, db: Session = Depends(get_db)):
     """Récupérer tous les règlements d'une facture"""
     try:
         reglements = db.query(Reglement).filter(Reglement.id_facture == facture_id).order_by(Reglement.date_reglement.desc()).all()
@@ -2147,11 +2271,11 @@ async def get_reglements_facture(facture_id: int, db: Session = Depends(get_db))
         
         return result
     except Exception as e:
-        print(f"Erreur récupération règlements facture: {e}")
+        journal_reglements.exception("Erreur récupération règlements facture")
         return []
 
 @app.get("/api/reglements/{reglement_id}")
-async def get_reglement(reglement_id: int, db: Session = Depends(get_db)):
+def get_reglement(reglement_id: int, db: Session = Depends(get_db)):
     """Récupérer un règlement par ID avec détails de la facture"""
     try:
         reglement = db.query(Reglement).filter(Reglement.id_reglement == reglement_id).first()
@@ -2188,31 +2312,29 @@ async def get_reglement(reglement_id: int, db: Session = Depends(get_db)):
             } if client else None
         }
     except Exception as e:
-        print(f"Erreur get_reglement: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_reglements.exception("Erreur get_reglement")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 @app.post("/api/reglements")
-async def create_reglement(reglement: dict, db: Session = Depends(get_db)):
+def create_reglement(reglement: dict, db: Session = Depends(get_db)):
     """Créer un nouveau règlement - EXACTEMENT comme Python reglements.py ligne 617-728"""
     try:
         facture = db.query(Facture).filter(Facture.id_facture == reglement['id_facture']).first()
         if not facture:
             raise HTTPException(status_code=404, detail="Facture non trouvée")
         
+        agregat_avant = instantane_facture(facture)
+        
         # Vérifier si c'est le PREMIER paiement (ligne 657-663)
         montant_avance_actuel = facture.montant_avance or 0
         premier_paiement = (montant_avance_actuel == 0)
         
-        print(f"🔍 Règlement - Premier paiement: {premier_paiement}, montant_avance actuel: {montant_avance_actuel}")
+        debug_echantillonne(journal_reglements, "Règlement", id_facture=facture.id_facture,
+                            premier_paiement=premier_paiement, montant_avance=montant_avance_actuel)
         
         # Générer un numéro de règlement automatique si non fourni
         if 'numero_reglement' not in reglement or not reglement.get('numero_reglement'):
-            last_reglement = db.query(Reglement).order_by(Reglement.id_reglement.desc()).first()
-            next_num = (last_reglement.id_reglement + 1) if last_reglement else 1
-            year = datetime.now().year
-            reglement['numero_reglement'] = f"REG-{year}-{next_num:03d}"
+            reglement['numero_reglement'] = prochain_numero('REG', db)
         
         # Créer le règlement
         new_reglement = Reglement(**reglement)
@@ -2234,7 +2356,7 @@ async def create_reglement(reglement: dict, db: Session = Depends(get_db)):
         
         # Si c'est le PREMIER paiement, décrémenter le stock (ligne 680-725)
         if premier_paiement:
-            print(f"🔥 PREMIER PAIEMENT détecté - Décrémentation du stock pour facture {facture.numero_facture}")
+            journal_reglements.debug("Premier paiement : décrémentation du stock", extra=champs(facture=facture.numero_facture))
             
             # Récupérer toutes les lignes de la facture
             lignes = db.query(LigneFacture, Article).join(
@@ -2243,32 +2365,37 @@ async def create_reglement(reglement: dict, db: Session = Depends(get_db)):
                 LigneFacture.id_facture == facture.id_facture
             ).all()
             
-            for ligne_facture, article in lignes:
-                # Décrémenter le stock_actuel (ligne 692-697)
-                article.stock_actuel = (article.stock_actuel or 0) - ligne_facture.quantite
-                
-                # Créer un mouvement de stock SORTIE (ligne 719-723)
-                mouvement = MouvementStock(
-                    id_article=article.id_article,
-                    type_mouvement='SORTIE',
-                    quantite=ligne_facture.quantite,
-                    date_mouvement=datetime.now(),
-                    reference=f"Facture {facture.numero_facture}"
-                )
-                db.add(mouvement)
+            # Décrémenter le stock_actuel (ligne 692-697) par UPDATE conditionnel
+            retirer_stock(db, [(ligne_facture.id_article, ligne_facture.quantite) for ligne_facture, _ in lignes])
+            
+            # Créer les mouvements de stock SORTIE (ligne 719-723) en un seul INSERT multi-lignes
+            inserer_en_masse(db, MouvementStock, [
+                {
+                    "id_article": article.id_article,
+                    "type_mouvement": 'SORTIE',
+                    "quantite": ligne_facture.quantite,
+                    "date_mouvement": datetime.now(),
+                    "reference": f"Facture {facture.numero_facture}"
+                }
+                for ligne_facture, article in lignes
+            ])
             
-            print(f"  Stock décrémenté pour {len(lignes)} article(s) - Facture {facture.numero_facture}")
+            journal_reglements.info("Stock décrémenté", extra=champs(facture=facture.numero_facture, nb_articles=len(lignes)))
         
+        maj_agregats(db, agregat_avant, instantane_facture(facture))
         db.commit()
+        invalider_cache('reglements', 'factures')
         db.refresh(new_reglement)
         return new_reglement
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
-        print(f"Erreur création règlement: {e}")
+        journal_reglements.exception("Erreur création règlement")
         raise HTTPException(status_code=400, detail=f"Erreur lors de la création du règlement: {str(e)}")
 
 @app.delete("/api/reglements/{reglement_id}")
-async def delete_reglement(reglement_id: int, db: Session = Depends(get_db)):
+def delete_reglement(reglement_id: int, db: Session = Depends(get_db)):
     """Supprimer un règlement"""
     reglement = db.query(Reglement).filter(Reglement.id_reglement == reglement_id).first()
     if not reglement:
@@ -2277,6 +2404,7 @@ async def delete_reglement(reglement_id: int, db: Session = Depends(get_db)):
     # Restaurer le montant dans la facture
     facture = db.query(Facture).filter(Facture.id_facture == reglement.id_facture).first()
     if facture:
+        agregat_avant = instantane_facture(facture)
         facture.montant_avance = (facture.montant_avance or 0) - reglement.montant
         montant_ttc = facture.montant_ttc or facture.total_ttc or 0
         facture.montant_reste = montant_ttc - facture.montant_avance
@@ -2286,9 +2414,11 @@ async def delete_reglement(reglement_id: int, db: Session = Depends(get_db)):
             facture.statut = "En attente"
         elif facture.montant_avance > 0:
             facture.statut = "Partiellement payée"
+        maj_agregats(db, agregat_avant, instantane_facture(facture))
     
     db.delete(reglement)
     db.commit()
+    invalider_cache('reglements', 'factures')
     return {"message": "Règlement supprimé avec succès"}
 
 
@@ -2297,10 +2427,18 @@ async def delete_reglement(reglement_id: int, db: Session = Depends(get_db)):
 # ============================================================================
 
 @app.get("/api/avoirs")
-async def get_avoirs(db: Session = Depends(get_db)):
-    """Récupérer tous les avoirs avec informations enrichies"""
+def get_avoirs(after: Optional[str] = None, limit: int = 100, db: Session = Depends(get_db)):
+    """Récupérer tous les avoirs avec informations enrichies (?after=<created_at>,<id> pour la pagination par curseur)"""
     try:
-        avoirs_list = db.query(Avoir).order_by(Avoir.created_at.desc()).all()
+        query = db.query(Avoir)
+        next_cursor = None
+        
+        if after is not None:
+            avoirs_list, next_cursor = paginer_par_curseur(
+                query, [Avoir.created_at, Avoir.id_avoir], after, limit, descendant=True
+            )
+        else:
+            avoirs_list = query.order_by(Avoir.created_at.desc()).all()
         
         result = []
         for avoir in avoirs_list:
@@ -2331,39 +2469,36 @@ async def get_avoirs(db: Session = Depends(get_db)):
             }
             result.append(avoir_dict)
         
-        return result
+        if after is not None:
+            return ReponseJSON({"items": result, "next_cursor": next_cursor})
+        return ReponseJSON(result)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Erreur chargement avoirs: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_avoirs.exception("Erreur chargement avoirs")
         return []
 
 @app.get("/api/avoirs/generate-numero")
-async def generate_numero_avoir(db: Session = Depends(get_db)):
-    """Générer un numéro d'avoir automatique"""
+def generate_numero_avoir(db: Session = Depends(get_db)):
+    """Aperçu du prochain numéro d'avoir (rien n'est réservé : le numéro est attribué à la création)"""
     try:
-        last_avoir = db.query(Avoir).order_by(Avoir.id_avoir.desc()).first()
-        next_num = (last_avoir.id_avoir + 1) if last_avoir else 1
-        year = datetime.now().year
-        numero_avoir = f"AVO-{year}-{next_num:03d}"
+        numero_avoir = apercu_numero('AVO', db)
         return {"numero_avoir": numero_avoir}  # Retourner un JSON au lieu d'une chaîne
     except Exception as e:
-        print(f"  Erreur génération numéro avoir: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_avoirs.exception("Erreur génération numéro avoir")
         # Retourner un numéro par défaut en cas d'erreur
         return {"numero_avoir": f"AVO-{datetime.now().year}-001"}
 
 @app.get("/api/avoirs/{avoir_id}")
-async def get_avoir(avoir_id: int, db: Session = Depends(get_db)):
-    """Récupérer un avoir par ID"""
-    avoir = db.query(Avoir).filter(Avoir.id_avoir == avoir_id).first()
+def get_avoir(avoir_id: int, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    """Récupérer un avoir par ID (?fields= limite les colonnes)"""
+    avoir = db.query(*colonnes_demandees(Avoir, fields, CHAMPS_AVOIR)).filter(Avoir.id_avoir == avoir_id).first()
     if not avoir:
         raise HTTPException(status_code=404, detail="Avoir non trouvé")
-    return avoir
+    return avoir._asdict()
 
 @app.get("/api/avoirs/{avoir_id}/details")
-async def get_avoir_details(avoir_id: int, db: Session = Depends(get_db)):
+def get_avoir_details(avoir_id: int, db: Session = Depends(get_db)):
     """Récupérer un avoir avec informations complètes"""
     try:
         avoir = db.query(Avoir).filter(Avoir.id_avoir == avoir_id).first()
@@ -2410,24 +2545,18 @@ async def get_avoir_details(avoir_id: int, db: Session = Depends(get_db)):
             "lignes": lignes_data
         }
     except Exception as e:
-        print(f"  ERREUR GET AVOIR DETAILS: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_avoirs.exception("Erreur get avoir details")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 @app.post("/api/avoirs")
-async def create_avoir(avoir: dict, db: Session = Depends(get_db)):
+def create_avoir(avoir: dict, db: Session = Depends(get_db)):
     """Créer un nouvel avoir avec ses lignes (comme Python ligne 1410-1511)"""
     try:
         # Extraire les lignes si présentes
         lignes_data = avoir.pop('lignes', [])
         
-        # Générer un numéro si non fourni
-        if not avoir.get('numero_avoir'):
-            last_avoir = db.query(Avoir).order_by(Avoir.id_avoir.desc()).first()
-            next_num = (last_avoir.id_avoir + 1) if last_avoir else 1
-            year = datetime.now().year
-            avoir['numero_avoir'] = f"AVO-{year}-{next_num:03d}"
+        # Numéro saisi à la main conservé, sinon attribué maintenant (l'aperçu du formulaire n'est pas réservé)
+        avoir['numero_avoir'] = numero_document('AVO', avoir.get('numero_avoir'), db)
         
         # Convertir date_avoir si c'est une string
         if 'date_avoir' in avoir and isinstance(avoir['date_avoir'], str):
@@ -2451,22 +2580,20 @@ async def create_avoir(avoir: dict, db: Session = Depends(get_db)):
             db.add(ligne)
         
         db.commit()
+        invalider_cache('avoirs')
         db.refresh(new_avoir)
         return new_avoir
     except Exception as e:
         db.rollback()
-        print(f"  Erreur création avoir: {e}")
-        print(f"  Données reçues: {avoir}")
-        print(f"  Lignes reçues: {lignes_data}")
-        import traceback
-        traceback.print_exc()
+        journal_avoirs.exception("Erreur création avoir", extra=champs(
+            id_facture=avoir.get('id_facture'), nb_lignes=len(lignes_data)))
         raise HTTPException(status_code=400, detail=f"Erreur lors de la création de l'avoir: {str(e)}")
 
 @app.put("/api/avoirs/{avoir_id}")
-async def update_avoir(avoir_id: int, data: dict, db: Session = Depends(get_db)):
+def update_avoir(avoir_id: int, data: dict, db: Session = Depends(get_db)):
     """Mettre à jour un avoir"""
     try:
-        print(f"🔍 DEBUG - Modification avoir {avoir_id}: {data}")
+        debug_echantillonne(journal_avoirs, "Modification avoir", id_avoir=avoir_id, cles=sorted(data))
         
         db_avoir = db.query(Avoir).filter(Avoir.id_avoir == avoir_id).first()
         if not db_avoir:
@@ -2510,9 +2637,10 @@ async def update_avoir(avoir_id: int, data: dict, db: Session = Depends(get_db))
             db.add(db_ligne)
         
         db.commit()
+        invalider_cache('avoirs')
         db.refresh(db_avoir)
         
-        print(f"  Avoir {db_avoir.numero_avoir} modifié avec succès!")
+        journal_avoirs.info("Avoir modifié", extra=champs(numero=db_avoir.numero_avoir))
         
         # Récupérer l'id_client depuis la facture
         id_client = None
@@ -2535,13 +2663,11 @@ async def update_avoir(avoir_id: int, data: dict, db: Session = Depends(get_db))
         }
     except Exception as e:
         db.rollback()
-        print(f"  ERREUR MODIFICATION AVOIR: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_avoirs.exception("Erreur modification avoir")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 @app.delete("/api/avoirs/{avoir_id}")
-async def delete_avoir(avoir_id: int, db: Session = Depends(get_db)):
+def delete_avoir(avoir_id: int, db: Session = Depends(get_db)):
     """Supprimer un avoir"""
     db_avoir = db.query(Avoir).filter(Avoir.id_avoir == avoir_id).first()
     if not db_avoir:
@@ -2559,11 +2685,12 @@ async def delete_avoir(avoir_id: int, db: Session = Depends(get_db)):
     
     db.delete(db_avoir)
     db.commit()
+    invalider_cache('avoirs')
     return {"message": "Avoir supprimé avec succès"}
 
 
 @app.get("/api/avoirs/{avoir_id}/lignes")
-async def get_lignes_avoir(avoir_id: int, db: Session = Depends(get_db)):
+def get_lignes_avoir(avoir_id: int, db: Session = Depends(get_db)):
     """Récupérer les lignes d'un avoir avec détails des articles"""
     try:
         lignes = db.query(LigneAvoir, Article).join(
@@ -2586,14 +2713,12 @@ async def get_lignes_avoir(avoir_id: int, db: Session = Depends(get_db)):
         
         return result
     except Exception as e:
-        print(f"Erreur chargement lignes avoir: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_avoirs.exception("Erreur chargement lignes avoir")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/factures/{facture_id}/articles-disponibles")
-async def get_articles_facture_pour_avoir(facture_id: int, db: Session = Depends(get_db)):
+def get_articles_facture_pour_avoir(facture_id: int, db: Session = Depends(get_db)):
     """Récupérer les articles d'une facture pour sélection dans un avoir (comme Python ligne 1168-1192)"""
     try:
         lignes = db.query(LigneFacture, Article).join(
@@ -2616,44 +2741,37 @@ async def get_articles_facture_pour_avoir(facture_id: int, db: Session = Depends
         
         return result
     except Exception as e:
-        print(f"Erreur chargement articles facture: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_avoirs.exception("Erreur chargement articles facture")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.put("/api/avoirs/{avoir_id}/valider")
-async def valider_avoir(avoir_id: int, db: Session = Depends(get_db)):
+def valider_avoir(avoir_id: int, db: Session = Depends(get_db)):
     """Valider un avoir - EXACTEMENT comme Python ligne 1573-1722"""
     try:
         from sqlalchemy import func
         
-        print(f"\n{'='*80}")
-        print(f"🔄 VALIDATION AVOIR ID: {avoir_id}")
-        print(f"{'='*80}")
-        
         # Récupérer l'avoir
         db_avoir = db.query(Avoir).filter(Avoir.id_avoir == avoir_id).first()
         if not db_avoir:
             raise HTTPException(status_code=404, detail="Avoir non trouvé")
         
-        print(f"📄 Avoir: {db_avoir.numero_avoir} - Montant: {db_avoir.montant} FCFA")
-        
         # 1. Vérifier si déjà traité (ligne 1577-1592)
         if db_avoir.statut == 'TRAITE':
             raise HTTPException(status_code=400, detail="Cet avoir a déjà été traité")
         
         # 2. Valider l'avoir - TRAITE pas VALIDE (ligne 1595)
         db_avoir.statut = 'TRAITE'
-        print(f"  Statut avoir changé: {db_avoir.statut}")
         
         # 3. Récupérer la facture associée (ligne 1597-1610)
         facture = db.query(Facture).filter(Facture.id_facture == db_avoir.id_facture).first()
         if not facture:
             raise HTTPException(status_code=404, detail="Facture associée non trouvée")
         
-        print(f"📄 Facture: {facture.numero_facture}")
-        print(f"   Avant: montant_avance={facture.montant_avance}, montant_reste={facture.montant_reste}, statut={facture.statut}")
+        agregat_avant = instantane_facture(facture)
+        debug_echantillonne(journal_avoirs, "Validation avoir", numero=db_avoir.numero_avoir,
+                            facture=facture.numero_facture, montant_avance=facture.montant_avance,
+                            montant_reste=facture.montant_reste, statut=facture.statut)
         
         montant_avoir = float(db_avoir.montant or 0)  # MySQL a seulement 'montant'
         
@@ -2674,9 +2792,6 @@ async def valider_avoir(avoir_id: int, db: Session = Depends(get_db)):
             )
             db.add(remboursement)
             db.flush()  #   Flush pour que le règlement soit pris en compte dans le calcul
-            print(f"  Remboursement créé: {-montant_avoir} FCFA")
-        else:
-            print(f"    Remboursement existe déjà")
         
         # 5. Calculer le nouveau solde de la facture (ligne 1629-1637)
         #    NE PAS CHANGER LE STATUT SI LA FACTURE ÉTAIT PAYÉE !
@@ -2691,14 +2806,9 @@ async def valider_avoir(avoir_id: int, db: Session = Depends(get_db)):
             Reglement.id_facture == facture.id_facture
         ).scalar() or 0
         
-        print(f"  Total règlements (avec remboursement): {total_reglements} FCFA")
-        
         montant_ttc_facture = float(facture.montant_ttc or facture.total_ttc or 0)
         solde_restant = montant_ttc_facture - total_reglements
         
-        print(f"  Calcul: {montant_ttc_facture} - {total_reglements} = {solde_restant} FCFA")
-        print(f"🔍 État avant: {statut_avant} | Était payée: {etait_payee}")
-        
         # 6. Mettre à jour le statut SEULEMENT si facture n'était pas déjà payée
         if etait_payee:
             # Facture reste PAYÉE car tout avait déjà été réglé
@@ -2706,7 +2816,6 @@ async def valider_avoir(avoir_id: int, db: Session = Depends(get_db)):
             # Montant_avance = montant_ttc car elle était entièrement payée
             facture.montant_avance = montant_ttc_facture
             facture.montant_reste = 0
-            print(f"  Facture reste PAYÉE (avoir = remboursement seulement)")
         else:
             # Facture n'était pas payée, recalcul normal
             if solde_restant <= 0:
@@ -2719,7 +2828,7 @@ async def valider_avoir(avoir_id: int, db: Session = Depends(get_db)):
             facture.montant_reste = max(0, solde_restant)
             facture.montant_avance = montant_ttc_facture - facture.montant_reste
         
-        print(f"   Après: montant_avance={facture.montant_avance}, montant_reste={facture.montant_reste}, statut={facture.statut}")
+        maj_agregats(db, agregat_avant, instantane_facture(facture))
         
         # 7. Remettre les articles en stock (ligne 1658-1722)
         # Utiliser les lignes de l'AVOIR (pas de la facture) si elles existent
@@ -2730,55 +2839,50 @@ async def valider_avoir(avoir_id: int, db: Session = Depends(get_db)):
                 LigneAvoir.id_avoir == db_avoir.id_avoir
             ).all()
             
-            print(f"  {len(lignes_avoir)} ligne(s) d'avoir trouvée(s)")
-            
             # Si pas de lignes d'avoir, fallback sur les lignes de la facture (ancien comportement)
             if not lignes_avoir:
-                print(f"    Aucune ligne d'avoir, utilisation des lignes de facture")
                 lignes_avoir = db.query(LigneFacture, Article).join(
                     Article, LigneFacture.id_article == Article.id_article
                 ).filter(
                     LigneFacture.id_facture == facture.id_facture
                 ).all()
-                print(f"  {len(lignes_avoir)} ligne(s) de facture trouvée(s)")
         except Exception as e:
-            print(f"  Erreur récupération lignes: {e}")
+            journal_avoirs.warning("Erreur récupération lignes", extra=champs(id_avoir=avoir_id, erreur=str(e)))
             lignes_avoir = []
         
         nb_articles_stock = 0
+        quantites_retour = []
+        mouvements = []
         for ligne, article in lignes_avoir:
             # Ne traiter que les PRODUITS (pas les SERVICES)
             if article.type_article != 'PRODUIT':
-                print(f"⏭   Article {article.designation} est un SERVICE, pas de stock")
                 continue
             # Remettre en stock (ligne 1713-1718)
             quantite_retour = ligne.quantite
-            stock_avant = article.stock_actuel or 0
-            article.stock_actuel = stock_avant + quantite_retour
+            quantites_retour.append((article.id_article, quantite_retour))
             nb_articles_stock += 1
             
-            # Utiliser designation au lieu de nom
-            nom_article = getattr(article, 'nom', None) or getattr(article, 'designation', 'Article')
-            print(f"  Article {nom_article}: stock {stock_avant} → {article.stock_actuel} (+{quantite_retour})")
-            
             # Créer mouvement de stock ENTREE (ligne 1720-1723)
-            mouvement = MouvementStock(
-                id_article=article.id_article,
-                type_mouvement="ENTREE",
-                quantite=quantite_retour,
-                date_mouvement=datetime.now(),
-                reference=f"Retour avoir {db_avoir.numero_avoir}"
-            )
-            db.add(mouvement)
+            mouvements.append({
+                "id_article": article.id_article,
+                "type_mouvement": "ENTREE",
+                "quantite": quantite_retour,
+                "date_mouvement": datetime.now(),
+                "reference": f"Retour avoir {db_avoir.numero_avoir}"
+            })
         
-        print(f"  {nb_articles_stock} article(s) remis en stock")
-        print(f"💾 Commit des changements...")
+        remettre_stock(db, quantites_retour)
+        inserer_en_masse(db, MouvementStock, mouvements)
         
         db.commit()
+        invalider_cache('avoirs', 'factures', 'articles')
         db.refresh(db_avoir)
         
-        print(f"  VALIDATION TERMINÉE")
-        print(f"{'='*80}\n")
+        journal_avoirs.info("Avoir validé", extra=champs(
+            id_avoir=db_avoir.id_avoir, numero=db_avoir.numero_avoir, montant=montant_avoir,
+            facture=facture.numero_facture, statut_facture_avant=statut_avant, statut_facture=facture.statut,
+            remboursement_cree=not remboursement_existe, articles_remis_en_stock=nb_articles_stock
+        ))
         
         return {
             "success": True,
@@ -2797,13 +2901,11 @@ async def valider_avoir(avoir_id: int, db: Session = Depends(get_db)):
         raise
     except Exception as e:
         db.rollback()
-        print(f"  ERREUR validation avoir: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_avoirs.exception("Erreur validation avoir", extra=champs(id_avoir=avoir_id, erreur=str(e)))
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 @app.put("/api/avoirs/{avoir_id}/refuser")
-async def refuser_avoir(avoir_id: int, db: Session = Depends(get_db)):
+def refuser_avoir(avoir_id: int, db: Session = Depends(get_db)):
     """Refuser un avoir"""
     db_avoir = db.query(Avoir).filter(Avoir.id_avoir == avoir_id).first()
     if not db_avoir:
@@ -2811,6 +2913,7 @@ async def refuser_avoir(avoir_id: int, db: Session = Depends(get_db)):
     
     db_avoir.statut = "REFUSE"
     db.commit()
+    invalider_cache('avoirs')
     db.refresh(db_avoir)
     return {"message": "Avoir refusé", "avoir": db_avoir}
 
@@ -2820,7 +2923,7 @@ async def refuser_avoir(avoir_id: int, db: Session = Depends(get_db)):
 # ============================================================================
 
 @app.get("/api/mouvements")
-async def get_mouvements(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_mouvements(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     """Récupérer tous les mouvements de stock avec informations enrichies"""
     try:
         mouvements = db.query(MouvementStock).order_by(MouvementStock.date_mouvement.desc()).offset(skip).limit(limit).all()
@@ -2843,15 +2946,13 @@ async def get_mouvements(skip: int = 0, limit: int = 100, db: Session = Depends(
             }
             result.append(mouvement_dict)
         
-        return result
+        return ReponseJSON(result)
     except Exception as e:
-        print(f"Erreur chargement mouvements: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_stock.exception("Erreur chargement mouvements")
         return []
 
 @app.post("/api/mouvements")
-async def create_mouvement(mouvement: dict, db: Session = Depends(get_db)):
+def create_mouvement(mouvement: dict, db: Session = Depends(get_db)):
     """Créer un nouveau mouvement de stock"""
     try:
         # Créer le mouvement
@@ -2876,68 +2977,72 @@ async def create_mouvement(mouvement: dict, db: Session = Depends(get_db)):
                     article.stock_actuel = 0
         
         db.commit()
+        invalider_cache('articles')
         db.refresh(new_mouvement)
         return new_mouvement
     except Exception as e:
         db.rollback()
-        print(f"Erreur création mouvement: {e}")
+        journal_stock.exception("Erreur création mouvement")
         raise HTTPException(status_code=400, detail=f"Erreur lors de la création du mouvement: {str(e)}")
 
 @app.get("/api/stock/stats")
-async def get_stock_stats(db: Session = Depends(get_db)):
+def get_stock_stats(db: Session = Depends(get_db)):
     """Récupérer les statistiques du stock (uniquement articles actifs)"""
     try:
-        # Articles en stock (seulement produits actifs)
-        total = db.query(Article).filter(
-            Article.type_article == 'PRODUIT',
-            Article.actif == True
-        ).count()
-        
-        # Stock faible (stock_actuel <= stock_alerte)
-        faible = db.query(Article).filter(
-            Article.type_article == 'PRODUIT',
-            Article.actif == True,
-            Article.stock_actuel <= Article.stock_alerte,
-            Article.stock_actuel > 0
-        ).count()
-        
-        # Stock critique (stock_actuel = 0)
-        critique = db.query(Article).filter(
-            Article.type_article == 'PRODUIT',
-            Article.actif == True,
-            Article.stock_actuel == 0
-        ).count()
-        
-        # Valeur du stock (uniquement articles actifs)
-        articles = db.query(Article).filter(
-            Article.type_article == 'PRODUIT',
-            Article.actif == True
-        ).all()
-        valeur = sum(a.stock_actuel * (a.prix_achat or 0) for a in articles)
-        
-        return {
-            "total": total,
-            "faible": faible,
-            "critique": critique,
-            "valeur": valeur
-        }
+        return cache_stats("stock-stats", ('articles',), lambda: _calculer_stock_stats(db))
     except Exception as e:
-        print(f"Erreur stats stock: {e}")
+        journal_stock.exception("Erreur stats stock")
         return {"total": 0, "faible": 0, "critique": 0, "valeur": 0}
 
+def _calculer_stock_stats(db: Session):
+    """Calcul des statistiques du stock (mis en cache par get_stock_stats)"""
+    # Articles en stock (seulement produits actifs)
+    total = db.query(Article).filter(
+        Article.type_article == 'PRODUIT',
+        Article.actif == True
+    ).count()
+    
+    # Stock faible (stock_actuel <= stock_alerte)
+    faible = db.query(Article).filter(
+        Article.type_article == 'PRODUIT',
+        Article.actif == True,
+        Article.stock_actuel <= Article.stock_alerte,
+        Article.stock_actuel > 0
+    ).count()
+    
+    # Stock critique (stock_actuel = 0)
+    critique = db.query(Article).filter(
+        Article.type_article == 'PRODUIT',
+        Article.actif == True,
+        Article.stock_actuel == 0
+    ).count()
+    
+    # Valeur du stock (uniquement articles actifs)
+    articles = db.query(Article).filter(
+        Article.type_article == 'PRODUIT',
+        Article.actif == True
+    ).all()
+    valeur = sum(a.stock_actuel * (a.prix_achat or 0) for a in articles)
+    
+    return {
+        "total": total,
+        "faible": faible,
+        "critique": critique,
+        "valeur": valeur
+    }
 
 # ============================================================================
 # UTILISATEURS
 # ============================================================================
 
 @app.get("/api/utilisateurs")
-async def get_utilisateurs(db: Session = Depends(get_db)):
+def get_utilisateurs(db: Session = Depends(get_db)):
     """Récupérer tous les utilisateurs"""
     utilisateurs = db.query(Utilisateur).all()
     return utilisateurs
 
 @app.get("/api/utilisateurs/{utilisateur_id}")
-async def get_utilisateur(utilisateur_id: int, db: Session = Depends(get_db)):
+def get_utilisateur(utilisateur_id: int, db: Session = Depends(get_db)):
     """Récupérer un utilisateur par ID"""
     utilisateur = db.query(Utilisateur).filter(Utilisateur.id_utilisateur == utilisateur_id).first()
     if not utilisateur:
@@ -2945,11 +3050,11 @@ async def get_utilisateur(utilisateur_id: int, db: Session = Depends(get_db)):
     return utilisateur
 
 @app.post("/api/utilisateurs")
-async def create_utilisateur(utilisateur: dict, db: Session = Depends(get_db)):
+def create_utilisateur(utilisateur: dict, db: Session = Depends(get_db)):
     """Créer un nouvel utilisateur"""
     # Hasher le mot de passe si fourni
     if "mot_de_passe" in utilisateur:
-        utilisateur["mot_de_passe"] = bcrypt.hash(utilisateur["mot_de_passe"])
+        utilisateur["mot_de_passe"] = hacher_mot_de_passe(utilisateur["mot_de_passe"])
     
     new_utilisateur = Utilisateur(**utilisateur)
     db.add(new_utilisateur)
@@ -2958,7 +3063,7 @@ async def create_utilisateur(utilisateur: dict, db: Session = Depends(get_db)):
     return new_utilisateur
 
 @app.put("/api/utilisateurs/{utilisateur_id}")
-async def update_utilisateur(utilisateur_id: int, utilisateur: dict, db: Session = Depends(get_db)):
+def update_utilisateur(utilisateur_id: int, utilisateur: dict, db: Session = Depends(get_db)):
     """Mettre à jour un utilisateur"""
     db_utilisateur = db.query(Utilisateur).filter(Utilisateur.id_utilisateur == utilisateur_id).first()
     if not db_utilisateur:
@@ -2966,7 +3071,7 @@ async def update_utilisateur(utilisateur_id: int, utilisateur: dict, db: Session
     
     # Hasher le mot de passe si modifié
     if "mot_de_passe" in utilisateur:
-        utilisateur["mot_de_passe"] = bcrypt.hash(utilisateur["mot_de_passe"])
+        utilisateur["mot_de_passe"] = hacher_mot_de_passe(utilisateur["mot_de_passe"])
     
     for key, value in utilisateur.items():
         setattr(db_utilisateur, key, value)
@@ -2976,7 +3081,7 @@ async def update_utilisateur(utilisateur_id: int, utilisateur: dict, db: Session
     return db_utilisateur
 
 @app.delete("/api/utilisateurs/{utilisateur_id}")
-async def delete_utilisateur(utilisateur_id: int, db: Session = Depends(get_db)):
+def delete_utilisateur(utilisateur_id: int, db: Session = Depends(get_db)):
     """Supprimer un utilisateur"""
     utilisateur = db.query(Utilisateur).filter(Utilisateur.id_utilisateur == utilisateur_id).first()
     if not utilisateur:
@@ -2987,7 +3092,7 @@ async def delete_utilisateur(utilisateur_id: int, db: Session = Depends(get_db))
     return {"message": "Utilisateur supprimé avec succès"}
 
 @app.put("/api/utilisateurs/{utilisateur_id}/droits")
-async def update_droits_utilisateur(utilisateur_id: int, droits_data: dict, db: Session = Depends(get_db)):
+def update_droits_utilisateur(utilisateur_id: int, droits_data: dict, db: Session = Depends(get_db)):
     """Mettre à jour les droits d'un utilisateur"""
     utilisateur = db.query(Utilisateur).filter(Utilisateur.id_utilisateur == utilisateur_id).first()
     if not utilisateur:
@@ -3007,18 +3112,18 @@ async def update_droits_utilisateur(utilisateur_id: int, droits_data: dict, db:
         droits_json = json.dumps(droits)
         utilisateur.droits = droits_json
         
-        print(f"✅ Droits mis à jour pour utilisateur {utilisateur_id}: {droits_json}")
+        journal_utilisateurs.info("Droits mis à jour", extra=champs(id_utilisateur=utilisateur_id))
         
         db.commit()
         db.refresh(utilisateur)
         return {"message": "Droits mis à jour avec succès", "utilisateur": utilisateur}
     except json.JSONDecodeError as e:
         db.rollback()
-        print(f"❌ Erreur parsing JSON droits: {e}")
+        journal_utilisateurs.exception("Erreur parsing JSON droits")
         raise HTTPException(status_code=400, detail=f"Format JSON invalide: {str(e)}")
     except Exception as e:
         db.rollback()
-        print(f"❌ Erreur mise à jour droits: {e}")
+        journal_utilisateurs.exception("Erreur mise à jour droits")
         raise HTTPException(status_code=400, detail=f"Erreur: {str(e)}")
 
 
@@ -3027,7 +3132,7 @@ async def update_droits_utilisateur(utilisateur_id: int, droits_data: dict, db:
 # ============================================================================
 
 @app.post("/api/inventaire/valider")
-async def valider_inventaire(ajustements: dict, db: Session = Depends(get_db)):
+def valider_inventaire(ajustements: dict, db: Session = Depends(get_db)):
     """Valider un inventaire et créer les ajustements - EXACTEMENT comme Python inventaire.py ligne 429-512"""
     try:
         articles_ajustes = ajustements.get('articles', [])
@@ -3035,35 +3140,22 @@ async def valider_inventaire(ajustements: dict, db: Session = Depends(get_db)):
         if not articles_ajustes:
             raise HTTPException(status_code=400, detail="Aucun ajustement à traiter")
         
-        ajustements_count = 0
+        lignes = []
+        for numero, article_data in enumerate(articles_ajustes, start=1):
+            try:
+                # Contrat historique : quantite_reelle et stock_systeme absents valent 0
+                lignes.append(normaliser_ligne(article_data, DEFAUTS_VALIDATION))
+            except (ValueError, TypeError, AttributeError) as e:
+                raise HTTPException(status_code=400, detail=f"Ligne {numero} invalide: {e}")
         
-        for article_data in articles_ajustes:
-            id_article = article_data.get('id_article')
-            quantite_reelle = article_data.get('quantite_reelle', 0)
-            stock_systeme = article_data.get('stock_systeme', 0)
-            ecart = quantite_reelle - stock_systeme
-            
-            if ecart == 0:  # Pas d'écart, on passe
-                continue
-            
-            # Mettre à jour le stock_actuel (ligne 473-478)
-            article = db.query(Article).filter(Article.id_article == id_article).first()
-            if article:
-                article.stock_actuel = quantite_reelle
-                
-                # Créer le mouvement d'ajustement (ligne 467-471)
-                mouvement = MouvementStock(
-                    id_article=id_article,
-                    type_mouvement='AJUSTEMENT',
-                    quantite=abs(ecart),
-                    reference=f"Inventaire du {datetime.now().strftime('%d/%m/%Y')}",
-                    date_mouvement=datetime.now()
-                )
-                db.add(mouvement)
-                
-                ajustements_count += 1
+        # Ensembliste, par lots comme l'import (IN (...) borné) : une requête pour les articles,
+        # un UPDATE groupé, un INSERT multi-lignes ; un seul commit, l'inventaire reste tout ou rien
+        ajustements_count = 0
+        for debut in range(0, len(lignes), TAILLE_LOT_INVENTAIRE):
+            ajustements_count += appliquer_ajustements(db, lignes[debut:debut + TAILLE_LOT_INVENTAIRE])["ajustements"]
         
         db.commit()
+        invalider_cache('articles')
         
         return {
             "success": True,
@@ -3071,20 +3163,92 @@ async def valider_inventaire(ajustements: dict, db: Session = Depends(get_db)):
             "ajustements": ajustements_count
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
-        print(f"  Erreur validation inventaire: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_inventaire.exception("Erreur validation inventaire")
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
 
+def _valider_lot_inventaire(db: Session, lot: list):
+    """Appliquer et valider (commit) un lot de la feuille de comptage"""
+    resultat = appliquer_ajustements(db, lot)
+    db.commit()
+    return resultat
+
+
+@app.post("/api/inventaire/import")
+async def importer_inventaire(
+    request: Request,
+    format: Optional[str] = None,
+    taille_lot: int = TAILLE_LOT_INVENTAIRE,
+    db: Session = Depends(get_db)
+):
+    """
+    Inventaire complet envoyé en flux (corps brut), traité par lots
+    
+    - NDJSON : {"id_article": 12, "quantite_reelle": 8} par ligne (ou "code_article")
+    - CSV : en-tête id_article/code_article;quantite_reelle[;stock_systeme]
+    Contrairement à /api/inventaire/valider, quantite_reelle est obligatoire
+    (ligne en erreur sinon) et un stock_systeme absent est lu en base.
+    Format déduit du Content-Type (text/csv) ou forcé par ?format=csv|ndjson.
+    Chaque lot est validé (commit) séparément : en cas d'erreur, les lots
+    précédents restent appliqués et le résumé indique où reprendre.
+    """
+    format_feuille = (format or ('csv' if 'csv' in request.headers.get('content-type', '') else 'ndjson')).lower()
+    if format_feuille not in ('csv', 'ndjson'):
+        raise HTTPException(status_code=400, detail=f"Format non supporté: {format_feuille} (csv ou ndjson)")
+    taille_lot = max(1, min(taille_lot, 5000))
+    
+    resume = {"lignes": 0, "ajustements": 0, "sans_ecart": 0, "inconnus": 0, "lots": 0}
+    erreurs = []
+    
+    async def traiter(lot):
+        # Travail base de données hors de la boucle d'événements
+        resultat = await run_in_threadpool(_valider_lot_inventaire, db, lot)
+        resume["lots"] += 1
+        resume["lignes"] += len(lot)
+        for cle, valeur in resultat.items():
+            resume[cle] += valeur
+        journal_inventaire.debug("Lot d'inventaire traité", extra=champs(
+                lot=resume['lots'], lignes=resume['lignes'], ajustements=resume['ajustements']))
+    
+    try:
+        lot = []
+        async for ligne in lire_feuille_comptage(request.stream(), format_feuille, erreurs):
+            lot.append(ligne)
+            if len(lot) >= taille_lot:
+                await traiter(lot)
+                lot = []
+        if lot:
+            await traiter(lot)
+    except Exception as e:
+        await run_in_threadpool(db.rollback)
+        journal_inventaire.exception("Erreur import inventaire")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur après {resume['lots']} lot(s) validé(s) ({resume['lignes']} ligne(s)): {str(e)}"
+        )
+    finally:
+        if resume["ajustements"]:
+            invalider_cache('articles')
+    
+    return {
+        "success": True,
+        "message": f"Inventaire importé : {resume['lignes']} ligne(s), {resume['ajustements']} ajustement(s) créé(s)",
+        **resume,
+        "erreurs": len(erreurs),
+        "details_erreurs": [{"ligne": numero, "erreur": message} for numero, message in erreurs[:MAX_ERREURS_DETAILLEES]]
+    }
+
+
 # ============================================================================
 # RAPPORTS
 # ============================================================================
 
 @app.get("/api/rapports/{type_rapport}")
-async def get_rapport(type_rapport: str, periode: str = "ce_mois", db: Session = Depends(get_db)):
+def get_rapport(type_rapport: str, periode: str = "ce_mois", db: Session = Depends(get_db)):
     """Récupérer un rapport selon le type"""
     try:
         # Calculer les dates selon la période
@@ -3110,136 +3274,65 @@ async def get_rapport(type_rapport: str, periode: str = "ce_mois", db: Session =
         if type_rapport == "ventes":
             from sqlalchemy import func, extract
             
-            # Ventes par montant réellement payé (montant_avance) - ligne 275-287 rapports.py
-            factures = db.query(Facture).filter(
-                Facture.date_facture >= date_debut,
-                Facture.date_facture <= date_fin,
-                Facture.statut != 'Annulée'
-            ).all()
+            # Lecture dans la table d'agrégats vente_journaliere au lieu de re-scanner facture
+            # CA net: COMPTOIR/RETOUR utilise total_ttc, NORMALE utilise montant_avance (seulement si payée)
+            # 🔥 Même logique que le dashboard (expression_ca)
+            filtre_periode = (
+                VenteJournaliere.date_vente >= date_debut,
+                VenteJournaliere.date_vente <= date_fin
+            )
             
-            # CA net: montant encaissé avec retours soustraits
-            # 🔥 CORRECTION: Utiliser la même logique que le dashboard
-            # COMPTOIR/RETOUR: utiliser total_ttc (montant réel vendu)
-            # NORMALE: utiliser montant_avance (montant déjà payé, seulement si payée)
-            from sqlalchemy import case
-            ca_total = db.query(
-                func.coalesce(
-                    func.sum(
-                        case(
-                            (Facture.type_facture == 'RETOUR', -Facture.total_ttc),
-                            (Facture.type_facture == 'COMPTOIR', Facture.total_ttc),
-                            else_=Facture.montant_avance  # NORMALE utilise montant déjà payé
-                        )
-                    ),
-                    0
-                )
-            ).filter(
-                Facture.date_facture >= date_debut,
-                Facture.date_facture <= date_fin,
-                Facture.statut != 'Annulée'
-            ).filter(
-                # Pour factures NORMALES: seulement celles payées (montant_avance > 0)
-                # Pour COMPTOIR/RETOUR: toutes les non-annulées
-                ((Facture.type_facture == 'NORMALE') & (Facture.montant_avance > 0)) |
-                (Facture.type_facture.in_(['COMPTOIR', 'RETOUR']))
-            ).scalar() or 0
-            nb_ventes = len(factures)
+            totaux = db.query(
+                func.coalesce(func.sum(VenteJournaliere.nb_factures), 0).label('nb_ventes'),
+                func.coalesce(func.sum(expression_ca()), 0).label('ca_total')
+            ).filter(*filtre_periode).one()
+            
+            nb_ventes = int(totaux.nb_ventes or 0)
+            ca_total = totaux.ca_total or 0
             ticket_moyen = ca_total / nb_ventes if nb_ventes > 0 else 0
             
+            def ventes_par(champ):
+                """CA net de la période groupé par mois / jour / semaine"""
+                groupe = extract(champ, VenteJournaliere.date_vente)
+                return db.query(
+                    groupe.label('cle'),
+                    func.coalesce(func.sum(expression_ca()), 0).label('total')
+                ).filter(*filtre_periode).group_by(groupe).order_by(groupe).all()
+            
             # Évolution des ventes (par mois pour l'année, par jour pour le mois)
             evolution_labels = []
             evolution_data = []
             
             if periode == "cette_annee":
                 # Ventes par mois
-                # 🔥 CORRECTION: Utiliser la même logique (total_ttc pour COMPTOIR/RETOUR, montant_avance pour NORMALE payée)
-                ventes_par_mois = db.query(
-                    extract('month', Facture.date_facture).label('mois'),
-                    func.coalesce(
-                        func.sum(
-                            case(
-                                (Facture.type_facture == 'RETOUR', -Facture.total_ttc),
-                                (Facture.type_facture == 'COMPTOIR', Facture.total_ttc),
-                                else_=Facture.montant_avance  # NORMALE utilise montant déjà payé
-                            )
-                        ),
-                        0
-                    ).label('total')
-                ).filter(
-                    Facture.date_facture >= date_debut,
-                    Facture.date_facture <= date_fin,
-                    Facture.statut != 'Annulée'
-                ).filter(
-                    ((Facture.type_facture == 'NORMALE') & (Facture.montant_avance > 0)) |
-                    (Facture.type_facture.in_(['COMPTOIR', 'RETOUR']))
-                ).group_by('mois').order_by('mois').all()
+                ventes_par_mois = ventes_par('month')
                 
                 mois_noms = ['Jan', 'Fév', 'Mar', 'Avr', 'Mai', 'Jun', 'Jul', 'Aoû', 'Sep', 'Oct', 'Nov', 'Déc']
                 for i in range(1, 13):
                     evolution_labels.append(mois_noms[i-1])
-                    montant = next((float(v.total or 0) for v in ventes_par_mois if v.mois == i), 0)
+                    montant = next((float(v.total or 0) for v in ventes_par_mois if v.cle == i), 0)
                     # Empêcher valeurs négatives sur le graphe
                     evolution_data.append(montant if montant > 0 else 0)
             
             elif periode == "ce_mois":
                 # Ventes par jour du mois
-                # 🔥 CORRECTION: Utiliser la même logique (total_ttc pour COMPTOIR/RETOUR, montant_avance pour NORMALE payée)
-                ventes_par_jour = db.query(
-                    extract('day', Facture.date_facture).label('jour'),
-                    func.coalesce(
-                        func.sum(
-                            case(
-                                (Facture.type_facture == 'RETOUR', -Facture.total_ttc),
-                                (Facture.type_facture == 'COMPTOIR', Facture.total_ttc),
-                                else_=Facture.montant_avance  # NORMALE utilise montant déjà payé
-                            )
-                        ),
-                        0
-                    ).label('total')
-                ).filter(
-                    Facture.date_facture >= date_debut,
-                    Facture.date_facture <= date_fin,
-                    Facture.statut != 'Annulée'
-                ).filter(
-                    ((Facture.type_facture == 'NORMALE') & (Facture.montant_avance > 0)) |
-                    (Facture.type_facture.in_(['COMPTOIR', 'RETOUR']))
-                ).group_by('jour').order_by('jour').all()
+                ventes_par_jour = ventes_par('day')
                 
                 # Tous les jours du mois
                 import calendar
                 nb_jours = calendar.monthrange(aujourd_hui.year, aujourd_hui.month)[1]
                 for jour in range(1, nb_jours + 1):
                     evolution_labels.append(str(jour))
-                    montant = next((float(v.total or 0) for v in ventes_par_jour if v.jour == jour), 0)
+                    montant = next((float(v.total or 0) for v in ventes_par_jour if v.cle == jour), 0)
                     # Empêcher valeurs négatives sur le graphe
                     evolution_data.append(montant if montant > 0 else 0)
             
             else:
                 # Pour les autres périodes, grouper par semaine
-                # 🔥 CORRECTION: Utiliser la même logique (total_ttc pour COMPTOIR/RETOUR, montant_avance pour NORMALE payée)
-                ventes_par_semaine = db.query(
-                    extract('week', Facture.date_facture).label('semaine'),
-                    func.coalesce(
-                        func.sum(
-                            case(
-                                (Facture.type_facture == 'RETOUR', -Facture.total_ttc),
-                                (Facture.type_facture == 'COMPTOIR', Facture.total_ttc),
-                                else_=Facture.montant_avance  # NORMALE utilise montant déjà payé
-                            )
-                        ),
-                        0
-                    ).label('total')
-                ).filter(
-                    Facture.date_facture >= date_debut,
-                    Facture.date_facture <= date_fin,
-                    Facture.statut != 'Annulée'
-                ).filter(
-                    ((Facture.type_facture == 'NORMALE') & (Facture.montant_avance > 0)) |
-                    (Facture.type_facture.in_(['COMPTOIR', 'RETOUR']))
-                ).group_by('semaine').order_by('semaine').all()
+                ventes_par_semaine = ventes_par('week')
                 
                 for v in ventes_par_semaine:
-                    evolution_labels.append(f"Sem {int(v.semaine)}")
+                    evolution_labels.append(f"Sem {int(v.cle)}")
                     val = float(v.total or 0)
                     evolution_data.append(val if val > 0 else 0)
             
@@ -3404,9 +3497,7 @@ async def get_rapport(type_rapport: str, periode: str = "ce_mois", db: Session =
         return {"error": "Type de rapport inconnu"}
         
     except Exception as e:
-        print(f"Erreur génération rapport: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_stats.exception("Erreur génération rapport")
         return {
             "error": str(e),
             "nb_ventes": 0,
@@ -3420,7 +3511,7 @@ async def get_rapport(type_rapport: str, periode: str = "ce_mois", db: Session =
 # ============================================================================
 
 @app.get("/api/auth/me")
-async def get_current_user_info(db: Session = Depends(get_db)):
+def get_current_user_info(db: Session = Depends(get_db)):
     """Récupérer les informations de l'utilisateur connecté"""
     # Pour l'instant, retourner l'admin par défaut
     utilisateur = db.query(Utilisateur).filter(Utilisateur.nom_utilisateur == "admin").first()
@@ -3437,37 +3528,72 @@ async def startup_event():
     print("🚀 Démarrage de Tech Info Plus API v2.0")
     print("=" * 60)
     
-    # Vérifier la connexion MySQL et créer les tables si nécessaire
+    # Schéma : une lecture de schema_version si rien n'a changé (voir version_schema.py)
     print("\n🗄️  Initialisation de la base de données...")
+    debut = time.perf_counter()
     try:
-        if test_connection():
-            print("  ✅ Connexion MySQL OK")
-            print("\n  🔄 Migration automatique des tables...")
-            # Créer toutes les tables automatiquement via SQLAlchemy
-            if create_tables():
-                print("  ✅ Migration terminée avec succès !")
-            else:
-                print("  ⚠️  Erreur lors de la migration des tables")
+        if await run_in_threadpool(preparer_base):
+            print("  ✅ Connexion base de données OK")
         else:
-            print("  ❌ ERREUR: Impossible de se connecter à MySQL")
+            print("  ❌ ERREUR: Impossible de se connecter à la base de données")
             print("  💡 Vérifiez que XAMPP MySQL est démarré sur le port 3306")
     except Exception as e:
         print(f"  ❌ Erreur initialisation base de données: {str(e)}")
+    print(f"  ⏱️  Base prête en {(time.perf_counter() - debut) * 1000:.0f} ms")
+    
+    # Compteurs de modifications des tables : ETag / 304 des listes (voir versions_tables.py)
+    if await run_in_threadpool(initialiser_versions):
+        print("  🏷️  Versions des tables suivies (GET conditionnels)")
+    
+    if not stockage_persistant():
+        print(f"  ⚠️  Images : {IMAGES_DOSSIER} non persistant, images conservées en base64 (définir IMAGES_DOSSIER)")
+    
+    pool = statistiques_pool(engine)
+    if "taille" in pool:
+        print(f"  🔌 Pool de connexions: {pool['taille']} + {pool['debordement_max']} en pointe, "
+              f"recycle {pool['recycle_s']}s, pre-ping {'oui' if pool['pre_ping'] else 'non'}")
+    # Routes def : exécutées dans un pool de threads borné (voir concurrence.py)
+    print(f"  🧵 Pool de threads des routes: {configurer_pool_threads()}")
+    
+    # Coût bcrypt adapté à la machine (durée de hachage visée: BCRYPT_CIBLE_MS),
+    # calibré en tâche de fond pour ne pas retarder la première requête
+    lancer_calibration().add_done_callback(
+        lambda calibration: print(
+            f"  ⚠️  Calibration bcrypt impossible: {calibration.exception()}" if calibration.exception()
+            else f"  🔐 Coût bcrypt: {calibration.result()}"
+        )
+    )
+    
+    # Sondes de santé : vérification en tâche de fond, /health/ready lit le résultat
+    demarrer_surveillance()
+    print(f"  🩺 Vérification de santé toutes les {SANTE_INTERVALLE:g}s")
     
     print("\n✅ Serveur API prêt!")
     print("=" * 60)
 
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Arrêt de l'application"""
+    arreter_surveillance()
+    arreter_pool_images()
+
 # ============================================================================
 # CONFIGURATION ENTREPRISE
 # ============================================================================
 
 @app.get("/api/entreprise/config")
-async def get_entreprise_config(db: Session = Depends(get_db)):
+def get_entreprise_config(request: Request, db: Session = Depends(get_db)):
     """Récupérer la configuration de l'entreprise"""
     try:
+        # 304 si le navigateur a déjà cette version de la table (voir versions_tables.py)
+        version = lire_version(db, 'entreprise')
+        if non_modifie(request, version):
+            return reponse_304(version)
+        
         entreprise = db.query(Entreprise).first()
         if entreprise:
-            return {
+            return ReponseJSON({
                 "id_entreprise": entreprise.id_entreprise,
                 "nom": entreprise.nom,
                 "adresse": entreprise.adresse,
@@ -3480,14 +3606,14 @@ async def get_entreprise_config(db: Session = Depends(get_db)):
                 "slogan": entreprise.slogan if hasattr(entreprise, 'slogan') else None,
                 "site_web": entreprise.site_web if hasattr(entreprise, 'site_web') else None,
                 "compte_bancaire": entreprise.compte_bancaire if hasattr(entreprise, 'compte_bancaire') else None
-            }
+            }, headers=entetes_version(version))
         return None
     except Exception as e:
-        print(f"Erreur chargement config entreprise: {e}")
+        journal_entreprise.exception("Erreur chargement config entreprise")
         return None
 
 @app.post("/api/entreprise/config")
-async def update_entreprise_config(config: dict, db: Session = Depends(get_db)):
+def update_entreprise_config(config: dict, db: Session = Depends(get_db)):
     """Mettre à jour la configuration de l'entreprise"""
     try:
         entreprise = db.query(Entreprise).first()
@@ -3507,7 +3633,7 @@ async def update_entreprise_config(config: dict, db: Session = Depends(get_db)):
         return {"message": "Configuration enregistrée avec succès", "entreprise": entreprise}
     except Exception as e:
         db.rollback()
-        print(f"Erreur mise à jour config: {e}")
+        journal_entreprise.exception("Erreur mise à jour config")
         raise HTTPException(status_code=400, detail=f"Erreur: {str(e)}")
 
 
@@ -3516,7 +3642,7 @@ async def update_entreprise_config(config: dict, db: Session = Depends(get_db)):
 # ============================================================================
 
 @app.get("/api/bugs")
-async def get_all_bugs(db: Session = Depends(get_db)):
+def get_all_bugs(db: Session = Depends(get_db)):
     """Récupérer tous les signalements de bugs avec infos utilisateur"""
     try:
         from sqlalchemy import case
@@ -3557,45 +3683,50 @@ async def get_all_bugs(db: Session = Depends(get_db)):
         } for bug in bugs]
         
     except Exception as e:
-        print(f"Erreur récupération bugs: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_bugs.exception("Erreur récupération bugs")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/bugs/stats")
-async def get_bugs_stats(db: Session = Depends(get_db)):
+def get_bugs_stats(db: Session = Depends(get_db)):
     """Récupérer les statistiques des bugs"""
     try:
-        from datetime import datetime, timedelta
-        from sqlalchemy import func
-        
-        # Total bugs
-        total = db.query(func.count(SignalementBug.id_signalement)).scalar() or 0
-        
-        # Bugs ouverts (OUVERT ou EN_COURS)
-        ouverts = db.query(func.count(SignalementBug.id_signalement)).filter(
-            SignalementBug.statut.in_(['OUVERT', 'EN_COURS'])
-        ).scalar() or 0
-        
-        # Bugs résolus ce mois
-        debut_mois = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        resolus_mois = db.query(func.count(SignalementBug.id_signalement)).filter(
-            SignalementBug.statut == 'RESOLU',
-            SignalementBug.date_resolution >= debut_mois
-        ).scalar() or 0
-        
-        return {
-            "total": total,
-            "ouverts": ouverts,
-            "resolus_mois": resolus_mois
-        }
-        
+        return cache_stats(
+            f"bugs-stats:{datetime.now().strftime('%Y-%m')}",
+            ('bugs',),
+            lambda: _calculer_bugs_stats(db)
+        )
     except Exception as e:
-        print(f"Erreur stats bugs: {e}")
+        journal_bugs.exception("Erreur stats bugs")
         return {"total": 0, "ouverts": 0, "resolus_mois": 0}
 
+def _calculer_bugs_stats(db: Session):
+    """Calcul des statistiques des bugs (mis en cache par get_bugs_stats)"""
+    from datetime import datetime, timedelta
+    from sqlalchemy import func
+    
+    # Total bugs
+    total = db.query(func.count(SignalementBug.id_signalement)).scalar() or 0
+    
+    # Bugs ouverts (OUVERT ou EN_COURS)
+    ouverts = db.query(func.count(SignalementBug.id_signalement)).filter(
+        SignalementBug.statut.in_(['OUVERT', 'EN_COURS'])
+    ).scalar() or 0
+    
+    # Bugs résolus ce mois
+    debut_mois = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    resolus_mois = db.query(func.count(SignalementBug.id_signalement)).filter(
+        SignalementBug.statut == 'RESOLU',
+        SignalementBug.date_resolution >= debut_mois
+    ).scalar() or 0
+    
+    return {
+        "total": total,
+        "ouverts": ouverts,
+        "resolus_mois": resolus_mois
+    }
+
 @app.post("/api/bugs")
-async def create_bug(bug: dict, request: Request, db: Session = Depends(get_db)):
+def create_bug(bug: dict, request: Request, db: Session = Depends(get_db)):
     """Créer un nouveau signalement de bug"""
     try:
         # Récupérer l'utilisateur depuis le token
@@ -3609,14 +3740,13 @@ async def create_bug(bug: dict, request: Request, db: Session = Depends(get_db))
                 parts = token.split('_')
                 if len(parts) >= 2:
                     id_utilisateur = int(parts[1])
-                    print(f"  ID utilisateur extrait du token: {id_utilisateur}")
+                    debug_echantillonne(journal_auth, "ID utilisateur extrait du token", id_utilisateur=id_utilisateur)
             except (ValueError, IndexError) as e:
-                print(f"   Erreur extraction ID utilisateur: {e}")
+                journal_bugs.exception("Erreur extraction ID utilisateur")
                 # Garder la valeur par défaut
         
-        print(f"🐛 Création bug par utilisateur ID: {id_utilisateur}")
-        print(f"   Titre: {bug.get('titre')}")
-        print(f"   Priorité: {bug.get('priorite')}")
+        debug_echantillonne(journal_bugs, "Création bug", id_utilisateur=id_utilisateur,
+                            titre=bug.get('titre'), priorite=bug.get('priorite'))
         
         nouveau_bug = SignalementBug(
             titre=bug.get('titre'),
@@ -3627,9 +3757,10 @@ async def create_bug(bug: dict, request: Request, db: Session = Depends(get_db))
         
         db.add(nouveau_bug)
         db.commit()
+        invalider_cache('bugs')
         db.refresh(nouveau_bug)
         
-        print(f"  Bug créé avec succès - ID: {nouveau_bug.id_signalement}")
+        journal_bugs.info("Bug créé", extra=champs(id_signalement=nouveau_bug.id_signalement))
         
         return {
             "message": "Bug créé avec succès",
@@ -3638,13 +3769,11 @@ async def create_bug(bug: dict, request: Request, db: Session = Depends(get_db))
         
     except Exception as e:
         db.rollback()
-        print(f"  Erreur création bug: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_bugs.exception("Erreur création bug")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/api/bugs/{bug_id}")
-async def update_bug(bug_id: int, bug: dict, db: Session = Depends(get_db)):
+def update_bug(bug_id: int, bug: dict, db: Session = Depends(get_db)):
     """Modifier un signalement de bug"""
     try:
         bug_db = db.query(SignalementBug).filter(
@@ -3668,19 +3797,18 @@ async def update_bug(bug_id: int, bug: dict, db: Session = Depends(get_db)):
                 bug_db.date_resolution = datetime.now()
         
         db.commit()
+        invalider_cache('bugs')
         return {"message": "Bug modifié avec succès"}
         
     except HTTPException:
         raise
     except Exception as e:
         db.rollback()
-        print(f"Erreur modification bug: {e}")
-        import traceback
-        traceback.print_exc()
+        journal_bugs.exception("Erreur modification bug")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/api/bugs/{bug_id}")
-async def delete_bug(bug_id: int, db: Session = Depends(get_db)):
+def delete_bug(bug_id: int, db: Session = Depends(get_db)):
     """Supprimer un signalement de bug"""
     try:
         bug_db = db.query(SignalementBug).filter(
@@ -3692,6 +3820,7 @@ async def delete_bug(bug_id: int, db: Session = Depends(get_db)):
         
         db.delete(bug_db)
         db.commit()
+        invalider_cache('bugs')
         
         return {"message": "Bug supprimé avec succès"}
         
@@ -3699,14 +3828,60 @@ async def delete_bug(bug_id: int, db: Session = Depends(get_db)):
         raise
     except Exception as e:
         db.rollback()
-        print(f"Erreur suppression bug: {e}")
+        journal_bugs.exception("Erreur suppression bug")
         raise HTTPException(status_code=500, detail=str(e))
 
+# ==================== ADMIN: CACHE DES STATISTIQUES ====================
+
+@app.get("/api/admin/cache")
+def get_cache_stats():
+    """Compteurs hits/misses/invalidations du cache des statistiques"""
+    return statistiques_cache()
+
+@app.delete("/api/admin/cache")
+def vider_cache_stats():
+    """Vider le cache des statistiques"""
+    invalider_cache()
+    return {"success": True, "message": "Cache des statistiques vidé"}
+
+# ==================== ADMIN: POOL DE CONNEXIONS ====================
+
+@app.get("/api/admin/pool")
+async def get_pool_stats():
+    """
+    Connexions utilisées/libres/en débordement, attentes et expirations du pool
+    (async : lit le limiteur de threads de la boucle, sans accès base)
+    """
+    return {
+        "connexions": statistiques_pool(engine),
+        "threads": statistiques_pool_threads()
+    }
+
+@app.delete("/api/admin/pool")
+def reinitialiser_pool_stats():
+    """Remettre à zéro les compteurs d'attente du pool"""
+    reinitialiser_statistiques_pool()
+    return {"success": True, "message": "Compteurs du pool remis à zéro"}
+
+# ==================== ADMIN: AGRÉGATS DE VENTES ====================
+
+@app.post("/api/admin/agregats/reconstruire")
+def reconstruire_agregats_ventes(db: Session = Depends(get_db)):
+    """Recalculer entièrement la table vente_journaliere depuis les factures"""
+    try:
+        nb_lignes = reconstruire_agregats(db)
+        invalider_cache('factures')
+        return {"message": "Agrégats de ventes reconstruits", "lignes": nb_lignes}
+    except Exception as e:
+        db.rollback()
+        journal_stats.exception("Erreur reconstruction agrégats")
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
 # ==================== ADMIN: NETTOYAGE COMPLET ====================
 from fastapi import APIRouter
 
 @app.delete("/api/admin/nettoyage/all")
-async def purge_all_data(db: Session = Depends(get_db)):
+def purge_all_data(db: Session = Depends(get_db)):
     """
     Attention: Cette route supprime toutes les données métier (ordre intégrité FK):
     LignesAvoir -> Avoir -> LigneFacture -> LigneDevis -> Reglement -> Facture -> Devis -> LigneVente -> VenteComptoir -> MouvementStock -> Article/Client/Fournisseur/Bug
@@ -3719,6 +3894,7 @@ async def purge_all_data(db: Session = Depends(get_db)):
         db.query(LigneDevis).delete()
         db.query(Reglement).delete()
         db.query(Facture).delete()
+        db.query(VenteJournaliere).delete()
         db.query(Devis).delete()
         db.query(LigneVente).delete()
         db.query(VenteComptoir).delete()
@@ -3728,13 +3904,37 @@ async def purge_all_data(db: Session = Depends(get_db)):
         db.query(Fournisseur).delete()
         db.query(SignalementBug).delete()
         db.commit()
+        invalider_cache()
         return {"message": "Toutes les données métiers (hors utilisateurs et config) ont été effacées avec succès."}
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Erreur lors du nettoyage: {str(e)}")
 
-    
+
+# -- Servir le frontend build (si présent) pour produire une application "tout-en-un" --
+# En dernier : le montage "/" prend tout chemin qui lui parvient, les routes
+# d'API déclarées au-dessus doivent passer avant lui.
+try:
+    # Chemin attendu du build créé par `npm run build` (frontend/build)
+    frontend_build_path = os.path.normpath(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "frontend", "build")
+    )
+
+    if os.path.isdir(frontend_build_path):
+        # "/" sert index.html plutôt que la description JSON de l'API
+        app.router.routes = [r for r in app.router.routes if getattr(r, "path", None) != "/"]
+        # .br/.gz précompressés par `npm run build` quand ils existent ; index.html
+        # pour les routes du frontend (fallback SPA), jamais pour /api, /docs, /redoc
+        app.mount("/", StaticFilesPrecompresses(directory=frontend_build_path, html=True, spa=True), name="frontend")
+        print(f"[OK] Frontend statique monte depuis: {frontend_build_path}")
+except Exception as _e:
+    # Ne doit pas empêcher l'application de démarrer si quelque chose échoue
+    print(f"[WARNING] Impossible de monter le frontend statique: {_e}")
+
+
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()  # processus de miniatures d'un exécutable figé (voir serve_pack.py)
     import uvicorn
     print("  Démarrage du serveur FastAPI...")
     print("  Documentation: http://localhost:8000/docs")
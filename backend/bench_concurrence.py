@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - BENCHMARK : DÉBIT SELON LE NOMBRE DE REQUÊTES EN VOL
+Envoie des requêtes sur un endpoint avec 1, 2, 4, ... requêtes simultanées et
+affiche le débit (requêtes/s) et la latence (p50 / p95) pour chaque niveau.
+Si les accès base de données bloquaient la boucle d'événements, le débit
+resterait plat quel que soit le nombre de requêtes en vol.
+
+Option --lent : un endpoint lent (rapport) tourne en boucle pendant toute la
+mesure, pour vérifier qu'il ne bloque pas les autres requêtes.
+Option --corps : POST de ce JSON au lieu d'un GET (ex. ventes du comptoir).
+Option --asgi : application chargée dans ce processus (base configurée par
+config.env / DATABASE_URL), sans serveur ; avec un petit pool de connexions,
+vérifie qu'à saturation les requêtes attendent au lieu d'échouer sur
+pool_timeout (voir concurrence.py).
+
+Serveur à lancer au préalable (sauf --asgi) :
+    python bench_concurrence.py --url http://localhost:8000 --chemin /api/articles
+    python bench_concurrence.py --niveaux 1,4,16,32 --duree 5 --lent /api/stats/dashboard
+    DB_POOL_SIZE=2 DB_MAX_OVERFLOW=0 DB_POOL_TIMEOUT=3 python bench_concurrence.py --asgi \
+        --chemin /api/comptoir/vente --corps '{"articles": [{"id_article": 1, "quantite": 1, "prix_unitaire": 100}]}'
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import sys
+import time
+
+import httpx
+
+
+def percentile(valeurs, p):
+    if not valeurs:
+        return 0.0
+    valeurs = sorted(valeurs)
+    index = min(len(valeurs) - 1, max(0, int(round(p / 100 * len(valeurs))) - 1))
+    return valeurs[index]
+
+
+async def requete(client, chemin, corps):
+    if corps is None:
+        return await client.get(chemin)
+    return await client.post(chemin, json=corps)
+
+
+async def charger(client, chemin, simultanees, duree, latences, echecs, corps=None):
+    """`simultanees` clients enchaînent des requêtes pendant `duree` secondes"""
+    fin = time.perf_counter() + duree
+
+    async def un_client():
+        while time.perf_counter() < fin:
+            debut = time.perf_counter()
+            reponse = await requete(client, chemin, corps)
+            latences.append(time.perf_counter() - debut)
+            if reponse.status_code != 200:
+                echecs.append(reponse.status_code)
+
+    await asyncio.gather(*(un_client() for _ in range(simultanees)))
+
+
+async def boucle_lente(client, chemin, arret, compteur):
+    while not arret.is_set():
+        await client.get(chemin)
+        compteur.append(1)
+
+
+@contextlib.asynccontextmanager
+async def application_locale():
+    """App dans ce processus : événements de démarrage/arrêt compris"""
+    from app import app
+    async with app.router.lifespan_context(app):
+        yield httpx.ASGITransport(app=app)
+
+
+async def principal(args):
+    niveaux = [int(n) for n in args.niveaux.split(',')]
+    corps = json.loads(args.corps) if args.corps else None
+    limites = httpx.Limits(max_connections=max(niveaux) + 10)
+    async with contextlib.AsyncExitStack() as pile:
+        options = {"base_url": args.url}
+        if args.asgi:
+            options = {"base_url": "http://asgi", "transport": await pile.enter_async_context(application_locale())}
+        client = await pile.enter_async_context(
+            httpx.AsyncClient(timeout=120, limits=limites, headers={"Authorization": "Bearer token_1_bench"}, **options)
+        )
+        await requete(client, args.chemin, corps)  # chauffe (connexions, caches)
+
+        arret = asyncio.Event()
+        lentes = []
+        tache_lente = asyncio.create_task(boucle_lente(client, args.lent, arret, lentes)) if args.lent else None
+
+        print(f"📊 {'GET' if corps is None else 'POST'} {args.chemin} - {args.duree:.0f}s par niveau"
+              + (f" (en parallèle: {args.lent} en boucle)" if args.lent else ""))
+        print(f"  {'en vol':>6}  {'req/s':>8}  {'p50':>9}  {'p95':>9}  {'échecs':>6}")
+        reference = None
+        for simultanees in niveaux:
+            latences, echecs = [], []
+            debut = time.perf_counter()
+            await charger(client, args.chemin, simultanees, args.duree, latences, echecs, corps)
+            debit = len(latences) / (time.perf_counter() - debut)
+            reference = reference or debit
+            ms = [v * 1000 for v in latences]
+            print(f"  {simultanees:>6}  {debit:8.1f}  {percentile(ms, 50):6.1f} ms  {percentile(ms, 95):6.1f} ms  "
+                  f"{len(echecs):>6}   x{debit / reference:.1f}")
+
+        if tache_lente:
+            arret.set()
+            await tache_lente
+            print(f"🐢 {args.lent}: {len(lentes)} requête(s) lente(s) servie(s) pendant la mesure")
+        if args.asgi:
+            from concurrence import statistiques_pool_threads
+            print(f"🧵 Pool de threads des routes: {statistiques_pool_threads()['taille']}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit d'un endpoint selon le nombre de requêtes simultanées")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--chemin", default="/api/articles", help="Endpoint mesuré")
+    parser.add_argument("--niveaux", default="1,2,4,8,16,32", help="Requêtes en vol, séparées par des virgules")
+    parser.add_argument("--duree", type=float, default=3.0, help="Durée de chaque niveau (s)")
+    parser.add_argument("--lent", default=None, help="Endpoint lent lancé en boucle pendant la mesure")
+    parser.add_argument("--corps", default=None, help="JSON envoyé en POST (défaut: GET)")
+    parser.add_argument("--asgi", action="store_true", help="Application dans ce processus, sans serveur")
+    args = parser.parse_args()
+    return asyncio.run(principal(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
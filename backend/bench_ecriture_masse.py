@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - BENCHMARK : LIGNES DE FACTURE ET MOUVEMENTS DE STOCK
+Compare, sur un document de N lignes, l'écriture objet par objet (db.add)
+et l'INSERT multi-lignes de ecriture_masse.inserer_en_masse.
+
+Tout se passe dans une transaction annulée à la fin : la base n'est pas modifiée.
+    python bench_ecriture_masse.py --lignes 500 --repetitions 5
+"""
+
+import argparse
+import statistics
+import time
+from datetime import date, datetime
+
+from database_mysql import SessionLocal, Article, Client, Facture, LigneFacture, MouvementStock
+from ecriture_masse import inserer_en_masse
+
+
+def preparer(db, nb_articles=50):
+    """Client, facture et articles temporaires (dans la transaction du benchmark)"""
+    suffixe = datetime.now().strftime('%H%M%S%f')
+    client = Client(nom=f"BENCH {suffixe}", type_client="Particulier")
+    db.add(client)
+    db.flush()
+    facture = Facture(numero_facture=f"BENCH-{suffixe}", id_client=client.id_client, date_facture=date.today())
+    articles = [
+        Article(code_article=f"BENCH-{suffixe}-{i}", designation=f"Bench {i}", type_article='PRODUIT', stock_actuel=0)
+        for i in range(nb_articles)
+    ]
+    db.add(facture)
+    db.add_all(articles)
+    db.flush()
+    return facture.id_facture, [a.id_article for a in articles]
+
+
+def donnees(id_facture, ids_articles, nb_lignes):
+    lignes, mouvements = [], []
+    for i in range(nb_lignes):
+        id_article = ids_articles[i % len(ids_articles)]
+        lignes.append({
+            "id_facture": id_facture,
+            "id_article": id_article,
+            "quantite": 2,
+            "prix_unitaire": 1500.0,
+            "total_ht": 3000.0
+        })
+        mouvements.append({
+            "id_article": id_article,
+            "type_mouvement": "SORTIE",
+            "quantite": 2,
+            "date_mouvement": datetime.now(),
+            "reference": "Benchmark"
+        })
+    return lignes, mouvements
+
+
+def ecriture_orm(db, lignes, mouvements):
+    for ligne in lignes:
+        db.add(LigneFacture(**ligne))
+    for mouvement in mouvements:
+        db.add(MouvementStock(**mouvement))
+    db.flush()
+
+
+def ecriture_masse(db, lignes, mouvements):
+    inserer_en_masse(db, LigneFacture, lignes)
+    inserer_en_masse(db, MouvementStock, mouvements)
+    db.flush()
+
+
+def mesurer(methode, nb_lignes):
+    db = SessionLocal()
+    try:
+        id_facture, ids_articles = preparer(db)
+        lignes, mouvements = donnees(id_facture, ids_articles, nb_lignes)
+        debut = time.perf_counter()
+        methode(db, lignes, mouvements)
+        return time.perf_counter() - debut
+    finally:
+        db.rollback()
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ORM objet par objet vs INSERT multi-lignes")
+    parser.add_argument("--lignes", type=int, default=500, help="Lignes par document")
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"📊 Document de {args.lignes} lignes (+ {args.lignes} mouvements), {args.repetitions} répétitions")
+    resultats = {}
+    for nom, methode in (("ORM db.add()", ecriture_orm), ("INSERT en masse", ecriture_masse)):
+        mesurer(methode, 10)  # chauffe (connexions, compilation des requêtes)
+        durees = [mesurer(methode, args.lignes) for _ in range(args.repetitions)]
+        resultats[nom] = statistics.median(durees)
+        print(f"  {nom:<18} médiane {resultats[nom] * 1000:8.1f} ms  (min {min(durees) * 1000:.1f} ms)")
+
+    orm, masse = resultats["ORM db.add()"], resultats["INSERT en masse"]
+    if masse > 0:
+        print(f"✅ Gain: x{orm / masse:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - BENCHMARK : SÉRIALISATION JSON DES LISTES
+Pour chaque endpoint, compare le coût de sérialisation de sa réponse :
+- avant : jsonable_encoder de FastAPI + JSONResponse (json de la bibliothèque standard)
+- après : ReponseJSON (orjson, sans passer par jsonable_encoder)
+et affiche la durée complète de la requête (dans le processus, sans réseau
+ni compression). Vérifie aussi que les deux sérialisations donnent le même JSON.
+
+Utilise la base configurée (config.env / DATABASE_URL) :
+    python bench_json.py
+    python bench_json.py --repetitions 50 --chemin "/api/articles?limit=2000"
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from reponses_json import ReponseJSON, orjson
+
+CHEMINS = ["/api/factures?limit=1000", "/api/comptoir/ventes?limit=1000"]
+
+
+def mediane_ms(fonction, repetitions):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append((time.perf_counter() - debut) * 1000)
+    return statistics.median(durees)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coût de sérialisation JSON des endpoints de liste")
+    parser.add_argument("--chemin", action="append", help="Endpoint mesuré (répétable, défaut: factures et ventes)")
+    parser.add_argument("--repetitions", type=int, default=20, help="Mesures par endpoint (médiane)")
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+    from app import app
+
+    print(f"⏱️  Sérialisation JSON ({'orjson ' + orjson.__version__ if orjson else 'orjson absent : repli json'}), "
+          f"médiane de {args.repetitions} mesures")
+    ok = True
+    with TestClient(app, headers={"Accept-Encoding": "identity"}) as client:
+        for chemin in args.chemin or CHEMINS:
+            reponse = client.get(chemin)
+            if reponse.status_code != 200:
+                print(f"❌ {chemin}: HTTP {reponse.status_code}")
+                ok = False
+                continue
+            contenu = reponse.json()
+            lignes = len(contenu["items"] if isinstance(contenu, dict) and "items" in contenu else contenu)
+
+            avant = mediane_ms(lambda: JSONResponse(jsonable_encoder(contenu)).body, args.repetitions)
+            apres = mediane_ms(lambda: ReponseJSON(contenu).body, args.repetitions)
+            requete = mediane_ms(lambda: client.get(chemin), args.repetitions)
+            identique = json.loads(ReponseJSON(contenu).body) == json.loads(JSONResponse(jsonable_encoder(contenu)).body)
+            ok = ok and identique
+
+            print(f"\n📄 {chemin} : {lignes} ligne(s), {len(reponse.content) / 1024:.0f} Ko")
+            print(f"    {avant:8.1f} ms  avant (jsonable_encoder + json)")
+            print(f"    {apres:8.1f} ms  après (ReponseJSON)")
+            print(f"    {avant - apres:8.1f} ms  gagnés par requête")
+            print(f"    {requete:8.1f} ms  requête complète")
+            print(f"    {'✅ JSON identique' if identique else '❌ JSON différent'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
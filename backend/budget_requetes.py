@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - BUDGET DE REQUÊTES SQL PAR ENDPOINT
+Appelle chaque endpoint de la liste BUDGETS (en process, sans serveur) et
+vérifie qu'il n'exécute pas plus de requêtes SQL que son budget. Un N+1
+réintroduit dans une liste fait exploser le compte dès qu'il y a quelques
+lignes en base : le script échoue (code de sortie 1) et affiche le SQL.
+
+Utilise la base configurée (config.env / DATABASE_URL), en lecture seule :
+    python budget_requetes.py
+    python budget_requetes.py --filtre /api/devis -v
+"""
+
+import argparse
+import sys
+
+from fastapi.testclient import TestClient
+
+from app import app
+from database_mysql import engine
+from instrumentation_sql import max_requetes, TropDeRequetes
+
+# Endpoint -> nombre maximal de requêtes SQL (indépendant du nombre de lignes)
+BUDGETS = {
+    "/api/clients": 2,
+    "/api/articles": 2,
+    "/api/fournisseurs": 2,
+    "/api/factures": 3,
+    "/api/devis": 3,
+    "/api/reglements": 3,
+    "/api/avoirs": 3,
+    "/api/mouvements": 3,
+    "/api/comptoir/ventes": 3,
+    "/api/comptoir/articles/populaires": 2,
+    "/api/entreprise/config": 2,
+}
+
+# N+1 connus (une requête par ligne affichée) : signalés sans faire échouer
+# le script. Retirer l'endpoint de cette liste une fois corrigé.
+N_PLUS_UN_CONNUS = {
+    "/api/devis",
+    "/api/reglements",
+    "/api/avoirs",
+    "/api/mouvements",
+    "/api/comptoir/ventes",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérifier le nombre de requêtes SQL par endpoint")
+    parser.add_argument("--filtre", default="", help="Ne vérifier que les endpoints contenant ce texte")
+    parser.add_argument("-v", "--verbeux", action="store_true", help="Afficher le SQL de chaque endpoint")
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    depassements = 0
+    print(f"📏 Budget de requêtes SQL ({engine.url.get_backend_name()})")
+    for chemin, budget in BUDGETS.items():
+        if args.filtre not in chemin:
+            continue
+        try:
+            with max_requetes(engine, budget) as compteur:
+                reponse = client.get(chemin)
+            print(f"  ✅ {chemin:<40} {compteur['requetes']:>3} / {budget}  (HTTP {reponse.status_code})")
+            if args.verbeux:
+                for sql in compteur["sql"]:
+                    print(f"       {' '.join(sql.split())[:160]}")
+        except TropDeRequetes as e:
+            if chemin in N_PLUS_UN_CONNUS:
+                print(f"  ⚠️  {chemin:<40} N+1 connu - {str(e).splitlines()[0].rstrip(':')}")
+                continue
+            depassements += 1
+            print(f"  ❌ {chemin:<40} {e}")
+
+    if depassements:
+        print(f"❌ {depassements} endpoint(s) au-dessus de leur budget")
+        return 1
+    print("✅ Tous les endpoints respectent leur budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - CACHE DES STATISTIQUES
+Cache mémoire (par processus) à durée de vie limitée pour les endpoints de
+statistiques interrogés en boucle par le Dashboard et le Layout.
+
+- Chaque entrée déclare les tables dont elle dépend
+- Les routes qui écrivent appellent invalider_cache('factures', ...) après le commit
+- Un seul calcul à la fois par clé : les requêtes simultanées attendent le résultat
+"""
+
+import os
+import threading
+import time
+
+# Durée de vie par défaut (secondes), 0 pour désactiver le cache
+STATS_CACHE_TTL = float(os.getenv('STATS_CACHE_TTL', '15'))
+
+_entrees = {}          # cle -> (expire_a, valeur, dependances)
+_verrous_cles = {}     # cle -> Lock (un seul calcul simultané par clé)
+_compteurs = {}        # cle -> {"hits", "misses", "invalidations"}
+_verrou = threading.Lock()
+
+
+def _compteur(cle):
+    return _compteurs.setdefault(cle, {"hits": 0, "misses": 0, "invalidations": 0})
+
+
+def _lire(cle):
+    entree = _entrees.get(cle)
+    if entree is not None and entree[0] > time.monotonic():
+        return True, entree[1]
+    return False, None
+
+
+def cache_stats(cle, dependances, calculer, ttl=None):
+    """
+    Retourner la valeur en cache pour `cle`, sinon l'obtenir via calculer()
+
+    cle : identifiant de l'endpoint et de ses paramètres (ex: "ventes-mois:2026")
+    dependances : tables lues par le calcul (ex: ('factures', 'devis'))
+    """
+    ttl = STATS_CACHE_TTL if ttl is None else ttl
+    if ttl <= 0:
+        return calculer()
+
+    with _verrou:
+        trouve, valeur = _lire(cle)
+        if trouve:
+            _compteur(cle)["hits"] += 1
+            return valeur
+        verrou_cle = _verrous_cles.setdefault(cle, threading.Lock())
+
+    with verrou_cle:
+        # Un autre appel a pu remplir l'entrée pendant l'attente du verrou
+        with _verrou:
+            trouve, valeur = _lire(cle)
+            if trouve:
+                _compteur(cle)["hits"] += 1
+                return valeur
+            _compteur(cle)["misses"] += 1
+
+        valeur = calculer()
+
+        with _verrou:
+            _entrees[cle] = (time.monotonic() + ttl, valeur, frozenset(dependances))
+        return valeur
+
+
+def invalider_cache(*tables):
+    """Supprimer les entrées qui dépendent d'une des tables modifiées (toutes si aucune table)"""
+    with _verrou:
+        for cle, (_, _, dependances) in list(_entrees.items()):
+            if not tables or dependances.intersection(tables):
+                del _entrees[cle]
+                _compteur(cle)["invalidations"] += 1
+
+
+def statistiques_cache():
+    """Compteurs hits/misses/invalidations par clé (endpoint d'administration)"""
+    with _verrou:
+        maintenant = time.monotonic()
+        return {
+            "ttl": STATS_CACHE_TTL,
+            "entrees": {
+                cle: {
+                    **compteurs,
+                    "en_cache": cle in _entrees and _entrees[cle][0] > maintenant
+                }
+                for cle, compteurs in _compteurs.items()
+            },
+            "hits": sum(c["hits"] for c in _compteurs.values()),
+            "misses": sum(c["misses"] for c in _compteurs.values())
+        }
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - TEST DE CHARGE : RAFALE DE CONNEXIONS
+Mesure la latence d'un endpoint "sonde" (p50 / p95 / p99) seul, puis pendant
+une rafale de connexions simultanées (début de service : toutes les caisses se
+connectent en même temps). Si bcrypt bloquait la boucle d'événements, la
+latence de la sonde exploserait pendant la rafale.
+
+Serveur à lancer au préalable :
+    python charge_login.py --url http://localhost:8000 --utilisateur admin --mot-de-passe admin123
+    python charge_login.py --connexions 200 --simultanees 50 --sonde /api/stats/dashboard
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+
+def percentile(valeurs, p):
+    if not valeurs:
+        return 0.0
+    valeurs = sorted(valeurs)
+    index = min(len(valeurs) - 1, max(0, int(round(p / 100 * len(valeurs))) - 1))
+    return valeurs[index]
+
+
+def afficher(titre, latences):
+    ms = [v * 1000 for v in latences]
+    print(f"  {titre:<28} n={len(ms):<5} p50={percentile(ms, 50):7.1f} ms  "
+          f"p95={percentile(ms, 95):7.1f} ms  p99={percentile(ms, 99):7.1f} ms  max={max(ms, default=0):7.1f} ms")
+
+
+async def sonder(client, chemin, arret, latences, intervalle):
+    """Latence mesurée depuis l'instant prévu de l'appel (inclut le retard si la boucle était bloquée)"""
+    prevu = time.perf_counter()
+    while not arret.is_set():
+        await client.get(chemin)
+        fin = time.perf_counter()
+        latences.append(fin - prevu)
+        prevu = fin + intervalle
+        await asyncio.sleep(intervalle)
+
+
+async def rafale(client, args, latences_login, echecs):
+    semaphore = asyncio.Semaphore(args.simultanees)
+
+    async def une_connexion():
+        async with semaphore:
+            debut = time.perf_counter()
+            reponse = await client.post("/api/auth/login", json={
+                "nom_utilisateur": args.utilisateur,
+                "mot_de_passe": args.mot_de_passe
+            })
+            latences_login.append(time.perf_counter() - debut)
+            if reponse.status_code != 200:
+                echecs.append(reponse.status_code)
+
+    await asyncio.gather(*(une_connexion() for _ in range(args.connexions)))
+
+
+async def principal(args):
+    limites = httpx.Limits(max_connections=args.simultanees + 10)
+    async with httpx.AsyncClient(base_url=args.url, timeout=120, limits=limites) as client:
+        # 1. Référence : sonde seule
+        arret = asyncio.Event()
+        reference = []
+        tache = asyncio.create_task(sonder(client, args.sonde, arret, reference, args.intervalle))
+        await asyncio.sleep(args.duree_reference)
+        arret.set()
+        await tache
+
+        # 2. Sonde pendant la rafale de connexions
+        arret = asyncio.Event()
+        pendant, latences_login, echecs = [], [], []
+        tache = asyncio.create_task(sonder(client, args.sonde, arret, pendant, args.intervalle))
+        debut = time.perf_counter()
+        await rafale(client, args, latences_login, echecs)
+        duree = time.perf_counter() - debut
+        arret.set()
+        await tache
+
+    print(f"🔐 {args.connexions} connexions ({args.simultanees} simultanées) en {duree:.2f}s "
+          f"- {args.connexions / duree:.1f} connexions/s, échecs: {len(echecs)}")
+    afficher(f"Sonde {args.sonde} (seule)", reference)
+    afficher(f"Sonde {args.sonde} (rafale)", pendant)
+    afficher("Login", latences_login)
+    if reference and pendant:
+        print(f"📈 p99 sonde: x{percentile(pendant, 99) / max(percentile(reference, 99), 1e-6):.1f} pendant la rafale "
+              f"(médiane login {statistics.median(latences_login) * 1000:.0f} ms)")
+    return 1 if echecs else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latence des autres endpoints pendant une rafale de connexions")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--utilisateur", default="admin")
+    parser.add_argument("--mot-de-passe", dest="mot_de_passe", default="admin123")
+    parser.add_argument("--connexions", type=int, default=100, help="Nombre total de connexions")
+    parser.add_argument("--simultanees", type=int, default=50, help="Connexions en parallèle")
+    parser.add_argument("--sonde", default="/", help="Endpoint dont on mesure la latence")
+    parser.add_argument("--intervalle", type=float, default=0.02, help="Pause entre deux appels de la sonde (s)")
+    parser.add_argument("--duree-reference", dest="duree_reference", type=float, default=3.0)
+    args = parser.parse_args()
+    return asyncio.run(principal(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - COMPRESSION DES RÉPONSES
+Les listes (ventes du comptoir avec leurs lignes, règlements, avoirs,
+rapports) sont du JSON très répétitif : compressées, elles passent bien
+mieux sur les connexions mobiles des boutiques.
+
+- MiddlewareCompression : middleware ASGI pur qui négocie Accept-Encoding
+  (brotli si le module est installé, sinon gzip) et compresse les réponses
+  texte/JSON au-delà de COMPRESSION_SEUIL octets. Les réponses déjà encodées,
+  les images, les réponses partielles (206) et les HEAD ne sont pas touchées.
+- StaticFilesPrecompresses : sert frontend/build en préférant les fichiers
+  .br / .gz écrits à côté de chaque fichier par `npm run build`
+  (frontend/scripts/precompresser.js) : aucune compression à la volée pour
+  les bundles JS/CSS.
+
+Variables d'environnement :
+- COMPRESSION_SEUIL : taille minimale compressée en octets (défaut: 1024)
+- COMPRESSION_NIVEAU_GZIP : 1-9 (défaut: 6)
+- COMPRESSION_NIVEAU_BR : 0-11 (défaut: 4 ; au-delà, trop lent pour des réponses dynamiques)
+"""
+
+import mimetypes
+import os
+import zlib
+
+import anyio
+from starlette.exceptions import HTTPException
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse
+from fastapi.staticfiles import StaticFiles
+
+try:
+    import brotli  # optionnel : pip install brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_SEUIL = int(os.getenv('COMPRESSION_SEUIL', '1024'))
+COMPRESSION_NIVEAU_GZIP = int(os.getenv('COMPRESSION_NIVEAU_GZIP', '6'))
+COMPRESSION_NIVEAU_BR = int(os.getenv('COMPRESSION_NIVEAU_BR', '4'))
+
+TYPES_COMPRESSIBLES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/manifest+json",
+    "image/svg+xml",
+)
+
+PREFIXES_HORS_SPA = ("/api", "/docs", "/redoc", "/openapi.json", "/health", "/metrics")
+
+# Fichiers écrits par frontend/scripts/precompresser.js, par ordre de préférence à qualité égale
+_ENCODAGES_PRECOMPRESSES = (("br", ".br"), ("gzip", ".gz"))
+
+
+def encodages_acceptes(accept_encoding):
+    """'gzip, deflate, br;q=0.9' -> {'gzip': 1.0, 'deflate': 1.0, 'br': 0.9} (q=0 exclu)"""
+    acceptes = {}
+    for element in (accept_encoding or "").split(","):
+        nom, _, parametres = element.strip().partition(";")
+        nom = nom.strip().lower()
+        if not nom:
+            continue
+        qualite = 1.0
+        parametres = parametres.strip()
+        if parametres.startswith("q="):
+            try:
+                qualite = float(parametres[2:])
+            except ValueError:
+                qualite = 0.0
+        if qualite > 0:
+            acceptes[nom] = qualite
+    return acceptes
+
+
+def choisir_encodage(accept_encoding, disponibles):
+    """Meilleur encodage accepté parmi `disponibles` (ordre de préférence), None sinon"""
+    acceptes = encodages_acceptes(accept_encoding)
+    meilleur, meilleure_qualite = None, 0.0
+    for encodage in disponibles:
+        qualite = acceptes.get(encodage, acceptes.get("*", 0.0))
+        if qualite > meilleure_qualite:
+            meilleur, meilleure_qualite = encodage, qualite
+    return meilleur
+
+
+def _compressible(type_contenu):
+    type_contenu = (type_contenu or "").split(";", 1)[0].strip().lower()
+    return type_contenu.startswith("text/") or type_contenu in TYPES_COMPRESSIBLES
+
+
+def _ajouter_vary(entetes):
+    vary = entetes.get("vary")
+    if vary is None:
+        entetes["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower() and vary.strip() != "*":
+        entetes["Vary"] = f"{vary}, Accept-Encoding"
+
+
+class _Compresseur:
+    """Compression par morceaux : gzip (zlib) ou brotli"""
+
+    def __init__(self, encodage):
+        if encodage == "br":
+            self._objet = brotli.Compressor(quality=COMPRESSION_NIVEAU_BR)
+            self.compresser, self._vider, self._terminer = self._objet.process, self._objet.flush, self._objet.finish
+        else:
+            self._objet = zlib.compressobj(COMPRESSION_NIVEAU_GZIP, zlib.DEFLATED, 31)  # 31 : en-tête gzip
+            self.compresser = self._objet.compress
+            self._vider = lambda: self._objet.flush(zlib.Z_SYNC_FLUSH)
+            self._terminer = self._objet.flush
+
+    def morceau(self, donnees):
+        """Un morceau d'une réponse en flux : envoyé tout de suite au client"""
+        return self.compresser(donnees) + self._vider()
+
+    def fin(self, donnees=b""):
+        return self.compresser(donnees) + self._terminer()
+
+
+class MiddlewareCompression:
+    """Middleware ASGI pur (même principe que MiddlewareMetriques)"""
+
+    def __init__(self, app):
+        self.app = app
+        self.disponibles = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encodage = choisir_encodage(Headers(scope=scope).get("accept-encoding"), self.disponibles)
+        if encodage is None:
+            await self.app(scope, receive, send)
+            return
+
+        debut_reponse = None
+        compresseur = None
+        transparent = False
+
+        async def envoyer(message):
+            nonlocal debut_reponse, compresseur, transparent
+
+            if message["type"] == "http.response.start":
+                entetes = Headers(raw=message.get("headers", []))
+                transparent = (
+                    message["status"] < 200 or message["status"] in (204, 206, 304)
+                    or "content-encoding" in entetes
+                    or not _compressible(entetes.get("content-type"))
+                )
+                if transparent:
+                    await send(message)
+                else:
+                    debut_reponse = message  # en-têtes envoyés avec le premier morceau
+                return
+
+            if message["type"] != "http.response.body" or transparent:
+                await send(message)
+                return
+
+            corps = message.get("body", b"")
+            suite = message.get("more_body", False)
+
+            if compresseur is None:
+                debut_reponse["headers"] = list(debut_reponse.get("headers", []))
+                entetes = MutableHeaders(raw=debut_reponse["headers"])
+                _ajouter_vary(entetes)
+                if not suite and len(corps) < COMPRESSION_SEUIL:
+                    # Trop petit : la compression coûterait plus qu'elle ne rapporte
+                    transparent = True
+                    await send(debut_reponse)
+                    await send(message)
+                    return
+
+                compresseur = _Compresseur(encodage)
+                entetes["Content-Encoding"] = encodage
+                etag = entetes.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # Même ressource, autres octets : l'ETag fort ne vaut plus
+                    entetes["ETag"] = f"W/{etag}"
+                if suite:
+                    # Réponse en flux : longueur inconnue d'avance
+                    del entetes["content-length"]
+                    await send(debut_reponse)
+                else:
+                    corps = compresseur.fin(corps)
+                    entetes["Content-Length"] = str(len(corps))
+                    await send(debut_reponse)
+                    await send({"type": "http.response.body", "body": corps})
+                    return
+
+            corps = compresseur.morceau(corps) if suite else compresseur.fin(corps)
+            await send({"type": "http.response.body", "body": corps, "more_body": suite})
+
+        await self.app(scope, receive, envoyer)
+
+
+class StaticFilesPrecompresses(StaticFiles):
+    """
+    StaticFiles qui sert <fichier>.br / <fichier>.gz quand ils existent et sont
+    acceptés. spa=True : index.html pour tout chemin inconnu hors API (routes
+    du frontend rechargées dans le navigateur).
+    """
+
+    def __init__(self, *args, spa=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.spa = spa
+
+    async def get_response(self, path, scope):
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as exc:
+            if exc.status_code != 404 or not self.spa or scope["path"].startswith(PREFIXES_HORS_SPA):
+                raise
+        full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, "index.html")
+        if stat_result is None:
+            raise HTTPException(status_code=404)
+        return self.file_response(full_path, stat_result, scope)
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        requete = Headers(scope=scope)
+        if "range" not in requete:
+            reponse = self._reponse_precompressee(os.fspath(full_path), requete, status_code)
+            if reponse is not None:
+                if self.is_not_modified(reponse.headers, requete):
+                    return NotModifiedResponse(reponse.headers)
+                return reponse
+
+        reponse = super().file_response(full_path, stat_result, scope, status_code)
+        if _compressible(reponse.headers.get("content-type")):
+            _ajouter_vary(reponse.headers)
+        return reponse
+
+    def _reponse_precompressee(self, chemin, requete, status_code):
+        accept_encoding = requete.get("accept-encoding")
+        restants = [encodage for encodage, _ in _ENCODAGES_PRECOMPRESSES]
+        while restants:
+            encodage = choisir_encodage(accept_encoding, restants)
+            if encodage is None:
+                return None
+            restants.remove(encodage)
+            chemin_compresse = chemin + dict(_ENCODAGES_PRECOMPRESSES)[encodage]
+            try:
+                stat_compresse = os.stat(chemin_compresse)
+            except OSError:
+                continue
+            # Type du fichier d'origine (pas application/gzip)
+            return FileResponse(
+                chemin_compresse, status_code=status_code, stat_result=stat_compresse,
+                media_type=mimetypes.guess_type(chemin)[0] or "text/plain",
+                headers={"Content-Encoding": encodage, "Vary": "Accept-Encoding"},
+            )
+        return None
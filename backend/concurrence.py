@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - POOL DE THREADS DES ROUTES
+Les routes sont déclarées en `def` : FastAPI les exécute dans le pool de
+threads d'anyio, et les appels SQLAlchemy (synchrones) ne bloquent plus la
+boucle d'événements. Une requête de rapport lente n'occupe qu'un thread, les
+autres caisses continuent d'être servies.
+
+Le pool est borné par un CapacityLimiter : au-delà, les requêtes attendent
+leur tour dans la boucle d'événements (sans délai d'expiration), plutôt que
+d'attendre une connexion du pool SQLAlchemy (erreur après pool_timeout).
+Cela suppose qu'une route n'utilise qu'une connexion à la fois : c'est le cas
+(la numérotation des documents passe par la session de la route, voir
+sequences.py). Une connexion reste hors du limiteur pour la sonde de santé
+(sante.py, son propre thread) et les tâches de démarrage.
+Vérification à saturation : bench_concurrence.py --asgi avec un petit pool.
+
+Variable d'environnement :
+- THREADPOOL_TAILLE : nombre de routes exécutées simultanément
+  (défaut: capacité du pool de connexions - 1, pool_size + max_overflow - 1)
+"""
+
+import os
+
+import anyio.to_thread
+
+from database_mysql import engine
+
+
+def capacite_pool_connexions():
+    """Nombre maximum de connexions ouvertes par le pool SQLAlchemy (None si illimité)"""
+    pool = engine.pool
+    if not hasattr(pool, 'size'):
+        return None
+    debordement = getattr(pool, '_max_overflow', 0)
+    if debordement < 0:
+        return None
+    return pool.size() + debordement
+
+
+def configurer_pool_threads():
+    """
+    Fixer la taille du pool de threads des routes (à appeler dans la boucle
+    d'événements, au démarrage). Retourne la taille retenue.
+    """
+    taille = os.getenv('THREADPOOL_TAILLE')
+    if taille:
+        taille = int(taille)
+    else:
+        capacite = capacite_pool_connexions()
+        # Une connexion réservée à la sonde de santé, hors des routes
+        taille = capacite - 1 if capacite else 40
+    limiteur = anyio.to_thread.current_default_thread_limiter()
+    limiteur.total_tokens = max(1, taille)
+    return limiteur.total_tokens
+
+
+def statistiques_pool_threads():
+    """Occupation du pool de threads des routes"""
+    stats = anyio.to_thread.current_default_thread_limiter().statistics()
+    return {
+        "taille": stats.total_tokens,
+        "occupes": stats.borrowed_tokens,
+        "en_attente": stats.tasks_waiting
+    }
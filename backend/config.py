@@ -6,10 +6,10 @@ Configuration pour développement et production
 """
 
 import os
-from dotenv import load_dotenv
+from environnement import charger_environnement
 
 # Charger les variables d'environnement
-load_dotenv()
+charger_environnement()
 
 # Environment (development ou production)
 ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
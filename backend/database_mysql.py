@@ -5,14 +5,15 @@ TECH INFO PLUS - CONFIGURATION MYSQL
 Modèles SQLAlchemy pour MySQL
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, Date, DateTime, Boolean, Text, ForeignKey, CheckConstraint, text
+from sqlalchemy import create_engine, Column, Integer, String, Float, Date, DateTime, Boolean, Text, ForeignKey, CheckConstraint, Index, text
 from sqlalchemy.orm import declarative_base, sessionmaker, relationship
 from datetime import datetime
 import os
-from dotenv import load_dotenv
+from environnement import charger_environnement
+from pool_connexions import options_pool
 
 # Charger les variables d'environnement
-load_dotenv('config.env')
+charger_environnement()
 
 # Configuration de la base de données
 MYSQL_HOST = os.getenv('MYSQL_HOST', 'localhost')
@@ -25,8 +26,8 @@ MYSQL_DATABASE = os.getenv('MYSQL_DATABASE', 'tech_info_plus')
 # Si DATABASE_URL est défini dans l'environnement, il sera utilisé (priorité pour PostgreSQL Supabase)
 DATABASE_URL = os.getenv('DATABASE_URL') or f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}?charset=utf8mb4"
 
-# Créer le moteur SQLAlchemy
-engine = create_engine(DATABASE_URL, echo=False, pool_pre_ping=True)
+# Créer le moteur SQLAlchemy (paramètres du pool: DB_POOL_* dans config.env, voir pool_connexions.py)
+engine = create_engine(DATABASE_URL, echo=False, **options_pool())
 
 # Créer la session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -106,6 +107,10 @@ class Fournisseur(Base):
 
 class Article(Base):
     __tablename__ = 'article'
+    __table_args__ = (
+        # Listes / recherche comptoir / statistiques du stock : actif, type, niveau de stock
+        Index('ix_article_actif_type_stock', 'actif', 'type_article', 'stock_actuel'),
+    )
     
     id_article = Column(Integer, primary_key=True, autoincrement=True)
     code_article = Column(String(50), unique=True)
@@ -134,6 +139,10 @@ class Article(Base):
 
 class Devis(Base):
     __tablename__ = 'devis'
+    __table_args__ = (
+        # Liste des devis (plus récents d'abord, pagination par curseur)
+        Index('ix_devis_created', 'created_at', 'id_devis'),
+    )
     
     id_devis = Column(Integer, primary_key=True, autoincrement=True)
     numero_devis = Column(String(20), unique=True, nullable=False)
@@ -190,6 +199,15 @@ class LigneDevis(Base):
 
 class Facture(Base):
     __tablename__ = 'facture'
+    __table_args__ = (
+        # Ventes du jour / statistiques : date_facture = ? AND type_facture IN (...) [AND statut ...]
+        Index('ix_facture_date_type_statut', 'date_facture', 'type_facture', 'statut'),
+        # Historique comptoir : type_facture IN (...) ORDER BY created_at DESC
+        Index('ix_facture_type_created', 'type_facture', 'created_at'),
+        # Factures d'un client (plus récentes d'abord)
+        Index('ix_facture_client_date', 'id_client', 'date_facture'),
+        Index('ix_facture_devis', 'id_devis'),
+    )
     
     id_facture = Column(Integer, primary_key=True, autoincrement=True)
     numero_facture = Column(String(20), unique=True, nullable=False)
@@ -236,6 +254,11 @@ class Facture(Base):
 
 class LigneFacture(Base):
     __tablename__ = 'ligne_facture'
+    __table_args__ = (
+        Index('ix_ligne_facture_facture', 'id_facture'),
+        # Ventes par article (rapports produits)
+        Index('ix_ligne_facture_article', 'id_article', 'id_facture'),
+    )
     
     id_ligne_facture = Column(Integer, primary_key=True, autoincrement=True, name='id_ligne')
     id_facture = Column(Integer, ForeignKey('facture.id_facture'), nullable=False)
@@ -268,6 +291,12 @@ class LigneFacture(Base):
 
 class Reglement(Base):
     __tablename__ = 'reglement'
+    __table_args__ = (
+        # Règlements d'une facture (plus récents d'abord)
+        Index('ix_reglement_facture_date', 'id_facture', 'date_reglement'),
+        # Liste / rapports par période (pagination par curseur)
+        Index('ix_reglement_date', 'date_reglement', 'id_reglement'),
+    )
     
     id_reglement = Column(Integer, primary_key=True, autoincrement=True)
     numero_reglement = Column(String(20), unique=True)
@@ -284,6 +313,11 @@ class Reglement(Base):
 
 class Avoir(Base):
     __tablename__ = 'avoir'
+    __table_args__ = (
+        Index('ix_avoir_facture', 'id_facture'),
+        # Liste des avoirs (plus récents d'abord, pagination par curseur)
+        Index('ix_avoir_created', 'created_at', 'id_avoir'),
+    )
     
     id_avoir = Column(Integer, primary_key=True, autoincrement=True)
     numero_avoir = Column(String(100), unique=True, nullable=False)
@@ -359,6 +393,12 @@ class Stock(Base):
 
 class MouvementStock(Base):
     __tablename__ = 'mouvement_stock'  # LA VRAIE TABLE DES MOUVEMENTS
+    __table_args__ = (
+        # Journal des mouvements (plus récents d'abord, pagination par curseur)
+        Index('ix_mouvement_date', 'date_mouvement', 'id_mouvement'),
+        # Historique d'un article
+        Index('ix_mouvement_article_date', 'id_article', 'date_mouvement'),
+    )
     
     id_mouvement = Column(Integer, primary_key=True, autoincrement=True)
     id_article = Column(Integer, ForeignKey('article.id_article'), nullable=False)
@@ -413,6 +453,43 @@ class LigneVente(Base):
     article = relationship("Article")
 
 
+class VenteJournaliere(Base):
+    __tablename__ = 'vente_journaliere'  # Agrégats de ventes par jour et par type (dashboard / rapports)
+    
+    date_vente = Column(Date, primary_key=True)
+    type_facture = Column(String(20), primary_key=True)  # NORMALE, COMPTOIR, RETOUR ('' si non renseigné)
+    nb_factures = Column(Integer, nullable=False, default=0)  # Factures non annulées
+    nb_annulees = Column(Integer, nullable=False, default=0)  # Factures annulées (ou sans statut)
+    total_ttc = Column(Float, nullable=False, default=0.0)  # Somme total_ttc des non annulées
+    montant_avance = Column(Float, nullable=False, default=0.0)  # Somme des avances > 0 des non annulées
+    montant_reste = Column(Float, nullable=False, default=0.0)  # Somme des restes > 0 des non annulées (créances)
+
+
+
+class SequenceDocument(Base):
+    __tablename__ = 'sequence_document'  # Compteurs de numérotation des documents (voir sequences.py)
+    
+    prefixe = Column(String(10), primary_key=True)  # FAC, DEV, CLI, FOUR, REG, AVO, ART, F (comptoir)
+    annee = Column(Integer, primary_key=True)  # 0 pour les séquences non annuelles (ART)
+    valeur = Column(Integer, nullable=False, default=0)  # Dernier numéro attribué
+
+
+class SchemaVersion(Base):
+    __tablename__ = 'schema_version'  # Empreinte du schéma appliqué (voir version_schema.py)
+    
+    id = Column(Integer, primary_key=True)  # Toujours 1
+    empreinte = Column(String(64), nullable=False)  # SHA-256 des tables/colonnes/index des modèles
+    appliquee_le = Column(DateTime, default=datetime.now)
+
+
+class VersionTable(Base):
+    __tablename__ = 'version_table'  # Compteur de modifications par table (ETag des listes, voir versions_tables.py)
+    
+    nom = Column(String(50), primary_key=True)  # Nom de la table suivie (article, client...)
+    version = Column(Integer, nullable=False, default=1)  # +1 à chaque transaction qui modifie la table
+    modifie_le = Column(DateTime, default=datetime.now)  # Last-Modified
+
+
 # ==================== FONCTIONS UTILITAIRES ====================
 
 def get_db():
@@ -513,10 +590,11 @@ def init_database():
     """
     print("🔧 Initialisation de la base de données MySQL...")
     
-    if test_connection():
-        if create_tables():
-            print("✅ Base de données prête !")
-            return True
+    # Une seule lecture de schema_version si le schéma est à jour (voir version_schema.py)
+    from version_schema import preparer_base
+    if preparer_base():
+        print("✅ Base de données prête !")
+        return True
     
     print("❌ Échec initialisation base de données")
     return False
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - INSERTIONS EN MASSE
+Lignes de facture et mouvements de stock écrits en INSERT multi-lignes
+(executemany / insertmanyvalues de SQLAlchemy 2) au lieu d'un INSERT par
+objet ORM ajouté avec db.add().
+
+Les valeurs par défaut des colonnes (created_at, ...) sont appliquées comme
+avec l'ORM. Les lignes insérées ne sont pas chargées dans la session.
+"""
+
+from sqlalchemy import insert
+
+
+def inserer_en_masse(db, modele, lignes):
+    """
+    Insérer une liste de dictionnaires {colonne: valeur} dans la table du modèle
+
+    Exemple :
+        inserer_en_masse(db, MouvementStock, [
+            {"id_article": 1, "type_mouvement": "SORTIE", "quantite": 2, ...},
+            ...
+        ])
+    """
+    if not lignes:
+        return
+    db.execute(insert(modele), lignes)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - VARIABLES D'ENVIRONNEMENT
+Chargement unique de config.env, le premier trouvé parmi :
+- le dossier de l'exécutable (version packagée PyInstaller : le code est
+  décompressé dans un dossier temporaire, config.env est à côté de l'exe)
+- le dossier courant (comportement historique : load_dotenv('config.env'))
+- le dossier de ce fichier (service Render, scripts lancés d'ailleurs)
+puis du fichier .env habituel (recherche de python-dotenv), comme avant.
+Les variables déjà définies dans l'environnement sont prioritaires.
+"""
+
+import os
+import sys
+
+from dotenv import load_dotenv, find_dotenv
+
+_charge = False
+
+
+def dossier_application():
+    """Dossier de l'application : celui de l'exécutable en version packagée, sinon celui du code"""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(os.path.abspath(sys.executable))
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def fichiers_config_candidats():
+    """Emplacements de config.env, par ordre de priorité (sans doublon)"""
+    dossiers = [os.getcwd(), os.path.dirname(os.path.abspath(__file__))]
+    if getattr(sys, 'frozen', False):
+        dossiers.insert(0, dossier_application())
+    candidats = []
+    for dossier in dossiers:
+        chemin = os.path.join(dossier, 'config.env')
+        if chemin not in candidats:
+            candidats.append(chemin)
+    return candidats
+
+
+def fichier_config():
+    """config.env utilisé (None si aucun)"""
+    for chemin in fichiers_config_candidats():
+        if os.path.isfile(chemin):
+            return chemin
+    return None
+
+
+def charger_environnement():
+    """Lire config.env puis .env une seule fois par processus"""
+    global _charge
+    if not _charge:
+        chemin = fichier_config()
+        if chemin:
+            load_dotenv(chemin)
+        load_dotenv(find_dotenv())
+        _charge = True
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - IMAGES DES ARTICLES
+Les images ne sont plus stockées en base64 dans article.image_path : le
+fichier est écrit sur disque sous le SHA-256 de son contenu, et image_path
+ne contient plus que son URL (/api/images/<sha256>.<ext>). Les listes et la
+recherche du comptoir ne transportent donc plus que quelques dizaines
+d'octets par article, et le navigateur garde l'image en cache : une URL
+désigne toujours le même contenu (une nouvelle image = une nouvelle URL).
+
+Miniatures : chaque image est décodée une fois par Pillow et réduite aux
+TAILLES_MINIATURES (grille du comptoir, liste des articles, fiche article),
+en WebP et en JPEG (repli pour les navigateurs sans WebP) :
+/api/images/<sha256>_<taille>.<webp|jpg>. Le travail d'image tourne dans un
+pool de processus borné (IMAGES_PROCESSUS), jamais dans les threads des
+routes : lancé à l'enregistrement, et à la demande si une miniature manque
+encore (images migrées, dossier restauré...) ; dans ce cas l'original est
+servi tout de suite, sans cache, et la requête suivante aura la miniature.
+
+Variables d'environnement :
+- IMAGES_DOSSIER : dossier des fichiers (défaut: images_articles à côté de
+  l'exécutable en version packagée, à côté du code sinon).
+  Sur Render, le pointer vers un disque persistant : le système de fichiers
+  de l'instance est effacé à chaque redéploiement.
+- IMAGES_PROCESSUS : processus de traitement d'image (défaut: 1)
+
+Tant que le dossier n'est pas persistant (stockage_persistant() : Render
+sans IMAGES_DOSSIER, dossier temporaire de l'exécutable PyInstaller), les
+images restent en base64 dans article.image_path, comme avant : rien n'est
+perdu, et migration_images.py refuse de s'exécuter.
+
+Migration des images base64 déjà en base : python migration_images.py
+"""
+
+import base64
+import binascii
+import hashlib
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from environnement import charger_environnement, dossier_application
+
+charger_environnement()
+
+_DOSSIER_CONFIGURE = os.getenv('IMAGES_DOSSIER')
+IMAGES_DOSSIER = _DOSSIER_CONFIGURE or os.path.join(dossier_application(), 'images_articles')
+PREFIXE_URL = "/api/images/"
+IMAGES_PROCESSUS = max(1, int(os.getenv('IMAGES_PROCESSUS', '1')))
+
+# Côté le plus long en pixels : grille du comptoir, liste des articles, fiche article
+TAILLES_MINIATURES = (128, 256, 768)
+FORMATS_MINIATURES = ("webp", "jpg")
+QUALITE_MINIATURES = {"webp": 80, "jpg": 82}
+
+EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "image/gif": "gif",
+}
+TYPES_MIME = {"jpg": "image/jpeg", "png": "image/png", "webp": "image/webp", "gif": "image/gif"}
+
+# Nom de fichier servi par GET /api/images/{nom} : original ou miniature
+MOTIF_NOM = re.compile(r"^(?P<empreinte>[0-9a-f]{64})(_(?P<taille>\d+))?\.(?P<extension>jpg|png|webp|gif)$")
+
+_MOTIF_DATA_URL = re.compile(r"^data:(image/[\w.+-]+);base64,", re.IGNORECASE)
+
+
+def decoder_data_url(valeur):
+    """'data:image/png;base64,...' -> (octets, type MIME), None si ce n'est pas une image base64"""
+    if not valeur:
+        return None
+    correspondance = _MOTIF_DATA_URL.match(valeur)
+    if not correspondance:
+        return None
+    type_mime = correspondance.group(1).lower()
+    if type_mime not in EXTENSIONS:
+        raise ValueError(f"Type d'image non supporté: {type_mime}")
+    try:
+        donnees = base64.b64decode(valeur[correspondance.end():], validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError("Image base64 illisible")
+    return donnees, type_mime
+
+
+def _dans(dossier, parent):
+    parent = os.path.realpath(parent)
+    return dossier == parent or dossier.startswith(parent + os.sep)
+
+
+def stockage_persistant():
+    """
+    Les fichiers de IMAGES_DOSSIER survivent-ils à un redéploiement et à la
+    fermeture de l'application ? Sinon les images restent en base64.
+    """
+    dossier = os.path.realpath(IMAGES_DOSSIER)
+    temporaire = getattr(sys, '_MEIPASS', None)  # exécutable PyInstaller : effacé à la sortie
+    if temporaire and _dans(dossier, temporaire):
+        return False
+    if _DOSSIER_CONFIGURE:
+        return True
+    # Render (variable RENDER) : sans disque, système de fichiers effacé à chaque déploiement
+    return not os.getenv('RENDER')
+
+
+def chemin_fichier(nom):
+    """Chemin sur disque d'un nom <sha256>.<ext> (sous-dossier des 2 premiers caractères)"""
+    return os.path.join(IMAGES_DOSSIER, nom[:2], nom)
+
+
+def _ecrire_atomique(chemin, ecrire):
+    """Écriture atomique : un lecteur ne voit jamais un fichier à moitié écrit"""
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    descripteur, temporaire = tempfile.mkstemp(dir=os.path.dirname(chemin), suffix=".tmp")
+    try:
+        with os.fdopen(descripteur, "wb") as fichier:
+            ecrire(fichier)
+        os.replace(temporaire, chemin)
+    except Exception:
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+        raise
+
+
+def enregistrer_image(donnees, type_mime):
+    """Écrire le fichier (si absent), lancer ses miniatures et retourner son nom <sha256>.<ext>"""
+    nom = f"{hashlib.sha256(donnees).hexdigest()}.{EXTENSIONS[type_mime]}"
+    chemin = chemin_fichier(nom)
+    if not os.path.exists(chemin):
+        _ecrire_atomique(chemin, lambda fichier: fichier.write(donnees))
+    try:
+        lancer_miniatures(nom)
+    except Exception as e:
+        # Les miniatures seront générées à la première demande (GET /api/images)
+        print(f"[WARNING] Miniatures de {nom} non lancées: {e}")
+    return nom
+
+
+def stocker_image_path(valeur):
+    """
+    Valeur reçue pour article.image_path -> valeur à enregistrer en base :
+    une image base64 est écrite sur disque et remplacée par son URL, tout le
+    reste (URL existante, vide, None) est conservé tel quel. Sans stockage
+    persistant, le base64 est conservé en base.
+    """
+    image = decoder_data_url(valeur)
+    if image is None or not stockage_persistant():
+        return valeur
+    return PREFIXE_URL + enregistrer_image(*image)
+
+
+# ==================== MINIATURES ====================
+
+def nom_miniature(empreinte, taille, extension):
+    return f"{empreinte}_{taille}.{extension}"
+
+
+def _generer_miniatures(chemin_original, empreinte):
+    """
+    Exécuté dans un processus du pool : décoder l'original une seule fois,
+    puis réduire de la plus grande taille à la plus petite (chaque réduction
+    part de la précédente, bien moins de pixels à traiter).
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(chemin_original) as original:
+        original.draft("RGB", (max(TAILLES_MINIATURES), max(TAILLES_MINIATURES)))  # JPEG : décodage réduit
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+
+    crees = []
+    for taille in sorted(TAILLES_MINIATURES, reverse=True):
+        image.thumbnail((taille, taille), Image.LANCZOS)
+        # JPEG sans transparence : fond blanc
+        if image.mode == "RGBA":
+            opaque = Image.new("RGB", image.size, (255, 255, 255))
+            opaque.paste(image, mask=image.getchannel("A"))
+        else:
+            opaque = image
+        for extension in FORMATS_MINIATURES:
+            nom = nom_miniature(empreinte, taille, extension)
+            source = image if extension == "webp" else opaque
+            options = {"quality": QUALITE_MINIATURES[extension]}
+            options.update({"method": 4} if extension == "webp" else {"optimize": True, "progressive": True})
+            _ecrire_atomique(
+                chemin_fichier(nom),
+                lambda fichier: source.save(fichier, "WEBP" if extension == "webp" else "JPEG", **options)
+            )
+            crees.append(nom)
+    return crees
+
+
+_pool = None
+_en_cours = {}  # empreinte -> Future (une seule génération à la fois par image)
+_verrou = threading.RLock()  # add_done_callback peut rappeler immédiatement sous le verrou
+
+
+def _pool_images():
+    """
+    Pool créé au premier usage ; 'spawn' : pas de fork d'un serveur multi-thread.
+    Chaque processus relance le programme principal : les points d'entrée
+    (serve_pack.py, start_server.py, app.py) appellent
+    multiprocessing.freeze_support() en premier, sans quoi l'exécutable
+    PyInstaller démarrerait un serveur de plus par processus.
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=IMAGES_PROCESSUS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def lancer_miniatures(nom):
+    """Générer les miniatures de l'original `nom` dans le pool, retourne le Future"""
+    empreinte = nom.split(".", 1)[0]
+    with _verrou:
+        futur = _en_cours.get(empreinte)
+        if futur is None:
+            try:
+                futur = _pool_images().submit(_generer_miniatures, chemin_fichier(nom), empreinte)
+            except BrokenProcessPool:
+                # Un processus est mort (mémoire, image piégée...) : repartir d'un pool neuf
+                arreter_pool_images()
+                futur = _pool_images().submit(_generer_miniatures, chemin_fichier(nom), empreinte)
+            _en_cours[empreinte] = futur
+            futur.add_done_callback(lambda fin: _retirer_en_cours(empreinte, fin))
+        return futur
+
+
+def _retirer_en_cours(empreinte, futur):
+    with _verrou:
+        _en_cours.pop(empreinte, None)
+    # Personne n'attend le résultat (GET /api/images sert l'original en attendant)
+    if not futur.cancelled() and futur.exception() is not None:
+        print(f"[WARNING] Miniatures de {empreinte} non générées: {futur.exception()}")
+
+
+def original_de(empreinte):
+    """Nom du fichier original d'une empreinte (extension inconnue), None s'il n'existe pas"""
+    for extension in TYPES_MIME:
+        nom = f"{empreinte}.{extension}"
+        if os.path.exists(chemin_fichier(nom)):
+            return nom
+    return None
+
+
+def arreter_pool_images():
+    global _pool
+    with _verrou:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - INSTRUMENTATION SQL
+Nombre de requêtes SQL et temps passé en base par requête HTTP. Le
+middleware des métriques ouvre une mesure (contextvar) au début de la
+requête. Les événements SQLAlchemy before/after_cursor_execute y ajoutent
+chaque requête SQL.
+
+La mesure est un objet mutable : la route tourne dans un thread du pool,
+qui reçoit une copie du contexte. Une nouvelle valeur de la contextvar
+serait perdue, alors que l'objet partagé est bien mis à jour.
+
+En plus :
+- requêtes lentes journalisées avec leurs paramètres (SQL_SEUIL_LENT_MS)
+- N+1 : une même requête (même texte SQL, paramètres différents) exécutée
+  SQL_SEUIL_N_PLUS_UN fois ou plus dans une requête HTTP est signalée
+- en-têtes X-DB-Queries / X-DB-Time sur les réponses si DEBUG_SQL=1
+- max_requetes() : garde-fou pour les scripts de vérification (budget_requetes.py)
+
+Variables d'environnement :
+- SQL_SEUIL_LENT_MS : durée au-delà de laquelle une requête est journalisée (défaut: 200, 0 désactive)
+- SQL_SEUIL_N_PLUS_UN : répétitions d'une même requête signalées comme N+1 (défaut: 5, 0 désactive)
+- DEBUG_SQL : 1 pour ajouter les en-têtes X-DB-Queries / X-DB-Time (défaut: 0)
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from journal import obtenir_journal, champs
+
+SQL_SEUIL_LENT_MS = float(os.getenv('SQL_SEUIL_LENT_MS', '200'))
+SQL_SEUIL_N_PLUS_UN = int(os.getenv('SQL_SEUIL_N_PLUS_UN', '5'))
+DEBUG_SQL = os.getenv('DEBUG_SQL', '0').strip().lower() in ('1', 'true', 'oui', 'yes', 'on')
+
+# Longueur maximale du SQL et des paramètres recopiés dans le journal
+_TAILLE_MAX_JOURNAL = 1000
+
+journal_sql = obtenir_journal("sql")
+
+
+class MesureSql:
+    """Cumul SQL d'une requête HTTP"""
+    __slots__ = ("duree", "requetes", "formes")
+
+    def __init__(self):
+        self.duree = 0.0
+        self.requetes = 0
+        self.formes = {}  # texte SQL -> nombre d'exécutions
+
+
+mesure_courante = ContextVar("mesure_sql", default=None)
+
+
+def demarrer_mesure():
+    """Ouvrir une mesure pour le contexte courant, retourne (mesure, jeton)"""
+    mesure = MesureSql()
+    return mesure, mesure_courante.set(mesure)
+
+
+def terminer_mesure(jeton, libelle=None):
+    """Fermer la mesure ; signaler les N+1 de la requête `libelle` (ex. "GET /api/devis")"""
+    mesure = mesure_courante.get()
+    mesure_courante.reset(jeton)
+    if mesure is None or not SQL_SEUIL_N_PLUS_UN:
+        return
+    for instruction, nombre in mesure.formes.items():
+        if nombre >= SQL_SEUIL_N_PLUS_UN:
+            journal_sql.warning("Requête répétée (N+1 probable)", extra=champs(
+                route=libelle, executions=nombre, requetes_total=mesure.requetes,
+                sql=_tronquer(instruction)
+            ))
+
+
+def entetes_debug(mesure):
+    """En-têtes X-DB-Queries / X-DB-Time (liste d'octets ASGI), vide si DEBUG_SQL n'est pas actif"""
+    if not DEBUG_SQL or mesure is None:
+        return []
+    return [
+        (b"x-db-queries", str(mesure.requetes).encode()),
+        (b"x-db-time", f"{mesure.duree * 1000:.1f}ms".encode()),
+    ]
+
+
+def _tronquer(valeur):
+    texte = str(valeur)
+    return texte if len(texte) <= _TAILLE_MAX_JOURNAL else texte[:_TAILLE_MAX_JOURNAL] + "..."
+
+
+def _avant_execution(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("debuts_sql", []).append(time.perf_counter())
+
+
+def _apres_execution(conn, cursor, statement, parameters, context, executemany):
+    debuts = conn.info.get("debuts_sql")
+    if not debuts:
+        return
+    duree = time.perf_counter() - debuts.pop()
+
+    mesure = mesure_courante.get()
+    if mesure is not None:
+        mesure.duree += duree
+        mesure.requetes += 1
+        mesure.formes[statement] = mesure.formes.get(statement, 0) + 1
+
+    if SQL_SEUIL_LENT_MS and duree * 1000 >= SQL_SEUIL_LENT_MS:
+        journal_sql.warning("Requête SQL lente", extra=champs(
+            duree_ms=round(duree * 1000, 1), sql=_tronquer(statement),
+            parametres=_tronquer(parameters), executemany=executemany
+        ))
+
+
+def _erreur_execution(contexte):
+    # after_cursor_execute n'est pas appelé en cas d'erreur : dépiler le début
+    if contexte.connection is not None:
+        debuts = contexte.connection.info.get("debuts_sql")
+        if debuts:
+            debuts.pop()
+
+
+def installer_instrumentation(engine):
+    """Brancher les événements de mesure sur le moteur (une seule fois)"""
+    if not event.contains(engine, "before_cursor_execute", _avant_execution):
+        event.listen(engine, "before_cursor_execute", _avant_execution)
+        event.listen(engine, "after_cursor_execute", _apres_execution)
+        event.listen(engine, "handle_error", _erreur_execution)
+
+
+class TropDeRequetes(AssertionError):
+    """Budget de requêtes SQL dépassé (voir max_requetes)"""
+
+
+@contextmanager
+def max_requetes(engine, maximum):
+    """
+    Compter toutes les requêtes SQL exécutées sur le moteur dans le bloc et
+    lever TropDeRequetes au-delà de `maximum`. Compte tous les threads :
+    à utiliser hors trafic (scripts de vérification, TestClient).
+
+        with max_requetes(engine, 3) as compteur:
+            client.get("/api/devis")
+        print(compteur["requetes"], compteur["sql"])
+    """
+    compteur = {"requetes": 0, "sql": []}
+
+    def compter(conn, cursor, statement, parameters, context, executemany):
+        compteur["requetes"] += 1
+        compteur["sql"].append(statement)
+
+    event.listen(engine, "after_cursor_execute", compter)
+    try:
+        yield compteur
+    finally:
+        event.remove(engine, "after_cursor_execute", compter)
+
+    if compteur["requetes"] > maximum:
+        formes = {}
+        for sql in compteur["sql"]:
+            formes[sql] = formes.get(sql, 0) + 1
+        detail = "\n".join(
+            f"  x{nombre:<3} {' '.join(sql.split())[:200]}"
+            for sql, nombre in sorted(formes.items(), key=lambda forme: -forme[1])
+        )
+        raise TropDeRequetes(f"{compteur['requetes']} requête(s) SQL pour un budget de {maximum}:\n{detail}")
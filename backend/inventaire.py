@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - VALIDATION D'INVENTAIRE ENSEMBLISTE
+Les ajustements sont appliqués par lots :
+- une requête IN (...) pour charger les articles du lot
+- calcul des écarts en mémoire
+- un UPDATE groupé (executemany par clé primaire) pour le stock
+- un INSERT multi-lignes pour les mouvements AJUSTEMENT
+
+Les grandes feuilles de comptage (inventaire annuel complet) peuvent être
+envoyées en flux NDJSON ou CSV et sont traitées au fil de l'eau, un commit
+par lot (voir lire_feuille_comptage).
+
+Champs absents :
+- POST /api/inventaire/valider garde son contrat historique
+  (DEFAUTS_VALIDATION) : quantite_reelle et stock_systeme absents valent 0
+- les feuilles importées (POST /api/inventaire/import) exigent
+  quantite_reelle, et un stock_systeme absent est lu en base
+"""
+
+import csv
+import json
+from datetime import datetime
+
+from sqlalchemy import or_, update
+
+from database_mysql import Article, MouvementStock
+from ecriture_masse import inserer_en_masse
+
+TAILLE_LOT_INVENTAIRE = 500
+MAX_ERREURS_DETAILLEES = 50
+
+# Valeurs implicites de POST /api/inventaire/valider (comme avant le traitement par lots)
+DEFAUTS_VALIDATION = {"quantite_reelle": 0, "stock_systeme": 0}
+
+
+def _entier(valeur):
+    if valeur is None or valeur == '':
+        return None
+    return int(float(valeur))
+
+
+def normaliser_ligne(donnees, defauts=None):
+    """
+    Ligne de comptage -> {"id_article"|"code_article", "quantite_reelle", "stock_systeme"}
+    defauts : valeurs des champs absents (DEFAUTS_VALIDATION). Sans défaut,
+    quantite_reelle est requise et un stock_systeme absent est lu en base.
+    """
+    defauts = defauts or {}
+    id_article = _entier(donnees.get('id_article'))
+    code_article = (donnees.get('code_article') or '').strip() or None
+    if id_article is None and code_article is None:
+        raise ValueError("id_article ou code_article requis")
+
+    quantite_reelle = _entier(donnees.get('quantite_reelle'))
+    if quantite_reelle is None:
+        quantite_reelle = defauts.get('quantite_reelle')
+    if quantite_reelle is None:
+        raise ValueError("quantite_reelle requise")
+
+    stock_systeme = _entier(donnees.get('stock_systeme'))
+    if stock_systeme is None:
+        stock_systeme = defauts.get('stock_systeme')
+
+    return {
+        "id_article": id_article,
+        "code_article": code_article,
+        "quantite_reelle": quantite_reelle,
+        "stock_systeme": stock_systeme
+    }
+
+
+def appliquer_ajustements(db, lignes):
+    """
+    Appliquer un lot de lignes normalisées (sans commit)
+
+    Retourne {"ajustements", "sans_ecart", "inconnus"}.
+    Si un article apparaît plusieurs fois, la dernière ligne l'emporte.
+    """
+    resultat = {"ajustements": 0, "sans_ecart": 0, "inconnus": 0}
+    if not lignes:
+        return resultat
+
+    ids = {ligne["id_article"] for ligne in lignes if ligne["id_article"] is not None}
+    codes = {ligne["code_article"] for ligne in lignes if ligne["id_article"] is None}
+
+    # Une seule requête pour tous les articles du lot
+    conditions = []
+    if ids:
+        conditions.append(Article.id_article.in_(ids))
+    if codes:
+        conditions.append(Article.code_article.in_(codes))
+    articles = db.query(Article.id_article, Article.code_article, Article.stock_actuel).filter(or_(*conditions)).all()
+    par_id = {a.id_article: a for a in articles}
+    par_code = {a.code_article: a for a in articles if a.code_article}
+
+    comptes = {}
+    for ligne in lignes:
+        article = par_id.get(ligne["id_article"]) if ligne["id_article"] is not None else par_code.get(ligne["code_article"])
+        if article is None:
+            resultat["inconnus"] += 1
+            continue
+        comptes[article.id_article] = (article, ligne)
+
+    maj_stock = []
+    mouvements = []
+    reference = f"Inventaire du {datetime.now().strftime('%d/%m/%Y')}"
+    for id_article, (article, ligne) in comptes.items():
+        stock_systeme = ligne["stock_systeme"]
+        if stock_systeme is None:
+            stock_systeme = article.stock_actuel or 0
+        ecart = ligne["quantite_reelle"] - stock_systeme
+
+        if ecart == 0:  # Pas d'écart, on passe
+            resultat["sans_ecart"] += 1
+            continue
+
+        maj_stock.append({"id_article": id_article, "stock_actuel": ligne["quantite_reelle"]})
+        mouvements.append({
+            "id_article": id_article,
+            "type_mouvement": 'AJUSTEMENT',
+            "quantite": abs(ecart),
+            "reference": reference,
+            "date_mouvement": datetime.now()
+        })
+
+    if maj_stock:
+        # UPDATE ... WHERE id_article = ? en executemany (mise à jour groupée par clé primaire)
+        db.execute(update(Article), maj_stock)
+        inserer_en_masse(db, MouvementStock, mouvements)
+
+    resultat["ajustements"] = len(maj_stock)
+    return resultat
+
+
+async def _lignes_texte(flux):
+    """Découper un flux d'octets (request.stream()) en lignes de texte"""
+    reste = b''
+    async for morceau in flux:
+        reste += morceau
+        *lignes, reste = reste.split(b'\n')
+        for ligne in lignes:
+            yield ligne.decode('utf-8-sig').rstrip('\r')
+    if reste:
+        yield reste.decode('utf-8-sig').rstrip('\r')
+
+
+async def lire_feuille_comptage(flux, format_feuille, erreurs):
+    """
+    Lire une feuille de comptage en flux et produire les lignes normalisées
+
+    format_feuille : 'ndjson' (un objet JSON par ligne) ou 'csv' (en-tête
+    obligatoire, séparateur ',' ou ';'). Les lignes invalides sont ajoutées
+    à `erreurs` sous la forme (numéro de ligne, message) et ignorées.
+    """
+    entetes = None
+    separateur = ','
+    numero = 0
+    async for texte in _lignes_texte(flux):
+        numero += 1
+        if not texte.strip():
+            continue
+        try:
+            if format_feuille == 'csv':
+                if entetes is None:
+                    separateur = ';' if texte.count(';') > texte.count(',') else ','
+                    entetes = [e.strip().lower() for e in next(csv.reader([texte], delimiter=separateur))]
+                    continue
+                valeurs = next(csv.reader([texte], delimiter=separateur))
+                donnees = dict(zip(entetes, (v.strip() for v in valeurs)))
+            else:
+                donnees = json.loads(texte)
+            yield normaliser_ligne(donnees)
+        except (ValueError, TypeError, AttributeError, csv.Error) as e:
+            erreurs.append((numero, str(e)))
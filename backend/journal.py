@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - JOURNALISATION STRUCTURÉE
+Les routes n'écrivent plus sur stdout : chaque message est déposé dans une
+file (QueueHandler) et un thread de fond (QueueListener) se charge de
+l'écriture. Une écriture lente sur stdout (Render, conteneurs) ne ralentit
+plus les requêtes.
+
+Sortie : une ligne JSON par message (LOG_FORMAT=json) ou texte lisible
+(LOG_FORMAT=texte, pratique en développement).
+
+    journal = obtenir_journal("factures")
+    journal.info("Facture créée", extra=champs(numero="FAC-2025-0001", total_ttc=15000))
+    debug_echantillonne(journal, "Données reçues", nb_lignes=12)
+
+Variables d'environnement :
+- LOG_LEVEL : DEBUG, INFO, WARNING, ERROR (défaut: INFO, donc pas de debug par requête)
+- LOG_FORMAT : json ou texte (défaut: json)
+- LOG_ECHANTILLON_DEBUG : part des messages debug par requête conservés quand
+  LOG_LEVEL=DEBUG, entre 0 et 1 (défaut: 0.1)
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').lower()
+LOG_ECHANTILLON_DEBUG = min(1.0, max(0.0, float(os.getenv('LOG_ECHANTILLON_DEBUG', '0.1'))))
+
+RACINE = "techinfo"
+
+_verrou = threading.Lock()
+_ecouteur = None
+
+
+class FormatJson(logging.Formatter):
+    """Un objet JSON par ligne : horodatage, niveau, journal, message et champs"""
+
+    def format(self, record):
+        ligne = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            "niveau": record.levelname,
+            "journal": record.name,
+            "message": record.getMessage(),
+        }
+        ligne.update(getattr(record, 'champs', None) or {})
+        exception = _texte_exception(self, record)
+        if exception:
+            ligne["exception"] = exception
+        return json.dumps(ligne, ensure_ascii=False, default=str)
+
+
+class FormatTexte(logging.Formatter):
+    """Format lisible pour le développement : message suivi des champs cle=valeur"""
+
+    def format(self, record):
+        texte = f"{datetime.fromtimestamp(record.created):%H:%M:%S} {record.levelname:<7} {record.name}: {record.getMessage()}"
+        details = getattr(record, 'champs', None)
+        if details:
+            texte += " " + " ".join(f"{cle}={valeur}" for cle, valeur in details.items())
+        exception = _texte_exception(self, record)
+        if exception:
+            texte += "\n" + exception
+        return texte
+
+
+def _texte_exception(formateur, record):
+    """Traceback du message : déjà mis en texte par FileMessages, ou à formater"""
+    if record.exc_text:
+        return record.exc_text
+    if record.exc_info:
+        return formateur.formatException(record.exc_info)
+    return None
+
+
+class FileMessages(logging.handlers.QueueHandler):
+    """
+    QueueHandler qui garde le traceback à part : celui de la bibliothèque
+    standard le colle au message (et vide exc_info), le champ "exception"
+    de FormatJson ne serait jamais rempli.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            # En texte dès maintenant : la pile et ses variables ne restent pas en mémoire dans la file
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configurer_journal():
+    """Installer la file et le thread d'écriture (une seule fois par processus)"""
+    global _ecouteur
+    with _verrou:
+        if _ecouteur is not None:
+            return
+        sortie = logging.StreamHandler(sys.stdout)
+        sortie.setFormatter(FormatTexte() if LOG_FORMAT == 'texte' else FormatJson())
+
+        file_messages = queue.SimpleQueue()
+        racine = logging.getLogger(RACINE)
+        racine.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+        racine.addHandler(FileMessages(file_messages))
+        racine.propagate = False
+
+        _ecouteur = logging.handlers.QueueListener(file_messages, sortie, respect_handler_level=True)
+        _ecouteur.start()
+        # Vider la file avant la sortie du processus
+        atexit.register(_ecouteur.stop)
+
+
+def obtenir_journal(nom):
+    """Journal nommé techinfo.<nom>"""
+    configurer_journal()
+    return logging.getLogger(f"{RACINE}.{nom}")
+
+
+def champs(**valeurs):
+    """Champs structurés d'un message : journal.info("...", extra=champs(cle=valeur))"""
+    return {"champs": valeurs}
+
+
+def debug_echantillonne(journal, message, **valeurs):
+    """
+    Message debug par requête : rien si le niveau DEBUG n'est pas actif,
+    sinon seule une fraction LOG_ECHANTILLON_DEBUG des appels est écrite.
+    """
+    if journal.isEnabledFor(logging.DEBUG) and random.random() < LOG_ECHANTILLON_DEBUG:
+        journal.debug(message, extra=champs(**valeurs))
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - MÉTRIQUES HTTP (FORMAT PROMETHEUS)
+Middleware ASGI qui compte les requêtes par route (modèle de chemin,
+ex. /api/factures/{facture_id}) et par statut. Il tient des histogrammes de
+latence totale et de temps passé en base (voir instrumentation_sql.py,
+qui ajoute aussi les en-têtes X-DB-* et signale les N+1).
+GET /metrics les expose au format texte de Prometheus.
+
+Sans verrou : les compteurs ne sont modifiés et lus que depuis la boucle
+d'événements (middleware et route /metrics async). Les threads des routes
+n'écrivent que dans leur propre MesureSql.
+"""
+
+import time
+from bisect import bisect_left
+
+from instrumentation_sql import demarrer_mesure, terminer_mesure, entetes_debug
+
+# Bornes des histogrammes (secondes)
+BORNES = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+ROUTE_INCONNUE = "inconnue"
+
+
+class Histogramme:
+    __slots__ = ("compteurs", "somme", "nombre")
+
+    def __init__(self):
+        self.compteurs = [0] * (len(BORNES) + 1)  # dernier: +Inf
+        self.somme = 0.0
+        self.nombre = 0
+
+    def observer(self, valeur):
+        self.compteurs[bisect_left(BORNES, valeur)] += 1
+        self.somme += valeur
+        self.nombre += 1
+
+
+class SerieRoute:
+    __slots__ = ("statuts", "duree", "duree_sql")
+
+    def __init__(self):
+        self.statuts = {}
+        self.duree = Histogramme()
+        self.duree_sql = Histogramme()
+
+
+# (méthode, route) -> SerieRoute
+_series = {}
+
+
+def _route(scope):
+    route = scope.get("route")
+    chemin = getattr(route, "path", None)
+    if chemin is None:
+        return ROUTE_INCONNUE
+    return chemin or "/"
+
+
+class MiddlewareMetriques:
+    """Middleware ASGI pur (pas de BaseHTTPMiddleware : pas de tâche supplémentaire par requête)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        statut = 500
+        debut = time.perf_counter()
+        mesure, jeton = demarrer_mesure()
+
+        async def envoyer(message):
+            nonlocal statut
+            if message["type"] == "http.response.start":
+                statut = message["status"]
+                entetes = entetes_debug(mesure)
+                if entetes:
+                    message["headers"] = list(message.get("headers", [])) + entetes
+            await send(message)
+
+        try:
+            await self.app(scope, receive, envoyer)
+        finally:
+            cle = (scope["method"], _route(scope))
+            terminer_mesure(jeton, f"{cle[0]} {cle[1]}")
+            serie = _series.get(cle)
+            if serie is None:
+                serie = _series[cle] = SerieRoute()
+            serie.statuts[statut] = serie.statuts.get(statut, 0) + 1
+            serie.duree.observer(time.perf_counter() - debut)
+            serie.duree_sql.observer(mesure.duree)
+
+
+def _etiquette(valeur):
+    return str(valeur).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogramme(lignes, nom, etiquettes, histogramme):
+    cumul = 0
+    for borne, compteur in zip(BORNES + ("+Inf",), histogramme.compteurs):
+        cumul += compteur
+        lignes.append(f'{nom}_bucket{{{etiquettes},le="{borne}"}} {cumul}')
+    lignes.append(f"{nom}_sum{{{etiquettes}}} {histogramme.somme:.6f}")
+    lignes.append(f"{nom}_count{{{etiquettes}}} {histogramme.nombre}")
+
+
+def exposition_prometheus():
+    """Toutes les séries au format texte de Prometheus (version 0.0.4)"""
+    series = sorted(_series.items())
+    lignes = [
+        "# HELP techinfo_http_requetes_total Requêtes HTTP par route et statut",
+        "# TYPE techinfo_http_requetes_total counter",
+    ]
+    for (methode, route), serie in series:
+        for statut, nombre in sorted(serie.statuts.items()):
+            lignes.append(
+                f'techinfo_http_requetes_total{{methode="{methode}",route="{_etiquette(route)}",statut="{statut}"}} {nombre}'
+            )
+
+    lignes += [
+        "# HELP techinfo_http_duree_secondes Durée de traitement des requêtes HTTP",
+        "# TYPE techinfo_http_duree_secondes histogram",
+    ]
+    for (methode, route), serie in series:
+        _histogramme(lignes, "techinfo_http_duree_secondes", f'methode="{methode}",route="{_etiquette(route)}"', serie.duree)
+
+    lignes += [
+        "# HELP techinfo_sql_duree_secondes Temps passé en base par requête HTTP",
+        "# TYPE techinfo_sql_duree_secondes histogram",
+    ]
+    for (methode, route), serie in series:
+        _histogramme(lignes, "techinfo_sql_duree_secondes", f'methode="{methode}",route="{_etiquette(route)}"', serie.duree_sql)
+
+    return "\n".join(lignes) + "\n"
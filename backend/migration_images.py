@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Migration des images base64 de article.image_path vers des fichiers
+
+Chaque image base64 est écrite dans IMAGES_DOSSIER sous le SHA-256 de son
+contenu (voir images_articles.py) et la colonne reçoit son URL
+(/api/images/<sha256>.<ext>). Idempotent : seuls les articles dont
+image_path commence encore par 'data:' sont traités, le script peut être
+relancé après une interruption.
+
+    python migration_images.py              # migrer
+    python migration_images.py --dry-run    # compter les images et leur taille, sans rien modifier
+
+Sur Render, IMAGES_DOSSIER doit pointer vers un disque persistant AVANT de
+lancer la migration (sinon les fichiers disparaissent au redéploiement) : le
+script refuse de migrer tant que stockage_persistant() est faux.
+"""
+
+import argparse
+import sys
+import time
+
+from sqlalchemy import select, update
+
+from database_mysql import SessionLocal, Article
+from images_articles import IMAGES_DOSSIER, decoder_data_url, enregistrer_image, stockage_persistant, PREFIXE_URL
+from cache_stats import invalider_cache
+from versions_tables import initialiser_versions
+
+
+def migrer(dry_run=False, lot=50):
+    if not dry_run and not stockage_persistant():
+        # Le base64 est la seule copie : ne pas la remplacer par un fichier voué à disparaître
+        print(f"ERREUR: {IMAGES_DOSSIER} n'est pas un stockage persistant. Définir IMAGES_DOSSIER "
+              f"sur un disque persistant (Render : disque monté, voir render.yaml) avant de migrer.")
+        return False
+    initialiser_versions()  # les articles migrés changent l'ETag de /api/articles
+    db = SessionLocal()
+    migrees, erreurs, octets = 0, 0, 0
+    debut = time.perf_counter()
+    try:
+        # Les identifiants d'abord : une seule image base64 en mémoire à la fois
+        ids = db.execute(
+            select(Article.id_article).where(Article.image_path.like('data:%')).order_by(Article.id_article)
+        ).scalars().all()
+        print(f"Migration des images ({len(ids)} article(s) avec une image base64) vers {IMAGES_DOSSIER}")
+
+        for position, id_article in enumerate(ids, start=1):
+            valeur = db.execute(select(Article.image_path).where(Article.id_article == id_article)).scalar()
+            try:
+                image = decoder_data_url(valeur)
+            except ValueError as e:
+                erreurs += 1
+                print(f"  ERREUR article {id_article}: {e}")
+                continue
+            if image is None:
+                continue
+
+            octets += len(valeur)
+            if not dry_run:
+                nom = enregistrer_image(*image)
+                db.execute(
+                    update(Article).where(Article.id_article == id_article).values(image_path=PREFIXE_URL + nom)
+                )
+            migrees += 1
+            if not dry_run and position % lot == 0:
+                db.commit()
+                print(f"  {position}/{len(ids)}")
+
+        if not dry_run:
+            db.commit()
+            invalider_cache('articles')
+    except Exception as e:
+        db.rollback()
+        print(f"ERREUR migration: {e}")
+        return False
+    finally:
+        db.close()
+
+    action = "à migrer" if dry_run else "migrée(s)"
+    print(f"Terminé : {migrees} image(s) {action}, {octets / 1024 / 1024:.1f} Mo de base64 "
+          f"{'dans' if dry_run else 'retirés de'} la table article, {erreurs} erreur(s), {time.perf_counter() - debut:.1f}s")
+    return erreurs == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sortir les images base64 de la table article")
+    parser.add_argument("--dry-run", action="store_true", help="Compter sans rien modifier")
+    parser.add_argument("--lot", type=int, default=50, help="Articles par transaction")
+    args = parser.parse_args()
+    return 0 if migrer(args.dry_run, args.lot) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
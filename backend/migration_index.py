@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Migration des index secondaires (MySQL et PostgreSQL)
+
+Les index sont déclarés dans les modèles (__table_args__ de database_mysql.py).
+create_all() ne les crée que pour les nouvelles tables : ce script les ajoute
+aux tables existantes. Idempotent : un index déjà présent (même nom) est ignoré,
+le script peut être relancé sans risque.
+
+    python migration_index.py              # créer les index manquants
+    python migration_index.py --dry-run    # afficher le SQL sans rien modifier
+    python migration_index.py --concurrent # PostgreSQL : CREATE INDEX CONCURRENTLY (sans verrou d'écriture)
+
+MySQL (InnoDB) crée les index en ligne : les écritures continuent pendant la création.
+"""
+
+import argparse
+import sys
+import time
+
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateIndex
+
+from database_mysql import Base, engine
+
+
+def index_declares():
+    """Tous les index des modèles, par table"""
+    for table in Base.metadata.sorted_tables:
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            yield table, index
+
+
+def index_existants(inspecteur, table):
+    if not inspecteur.has_table(table.name):
+        return None
+    return {index["name"] for index in inspecteur.get_indexes(table.name)}
+
+
+def migrer(dry_run=False, concurrent=False):
+    postgres = engine.dialect.name == "postgresql"
+    inspecteur = inspect(engine)
+    crees, presents, manquants = 0, 0, 0
+
+    print(f"Migration des index ({engine.dialect.name})...")
+    for table, index in index_declares():
+        existants = index_existants(inspecteur, table)
+        if existants is None:
+            print(f"  INFO Table '{table.name}' absente (créée avec ses index au démarrage)")
+            manquants += 1
+            continue
+        if index.name in existants:
+            presents += 1
+            continue
+
+        ddl = str(CreateIndex(index).compile(dialect=engine.dialect))
+        if postgres and concurrent:
+            ddl = ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)
+        if dry_run:
+            print(f"  {ddl};")
+            continue
+
+        debut = time.perf_counter()
+        try:
+            if postgres and concurrent:
+                # CONCURRENTLY est interdit dans une transaction
+                with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connexion:
+                    connexion.exec_driver_sql(ddl)
+            else:
+                with engine.begin() as connexion:
+                    connexion.exec_driver_sql(ddl)
+            crees += 1
+            print(f"  OK {index.name} sur {table.name}({', '.join(c.name for c in index.columns)}) "
+                  f"en {time.perf_counter() - debut:.2f}s")
+        except Exception as e:
+            print(f"  ERREUR {index.name}: {e}")
+            return False
+
+    print(f"Terminé : {crees} index créé(s), {presents} déjà présent(s)"
+          + (f", {manquants} table(s) absente(s)" if manquants else ""))
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Créer les index secondaires manquants")
+    parser.add_argument("--dry-run", action="store_true", help="Afficher le SQL sans l'exécuter")
+    parser.add_argument("--concurrent", action="store_true", help="PostgreSQL : CREATE INDEX CONCURRENTLY")
+    args = parser.parse_args()
+    return 0 if migrer(args.dry_run, args.concurrent) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - HACHAGE DES MOTS DE PASSE (BCRYPT)
+bcrypt coûte volontairement 100 à 300 ms de CPU. Le hachage et la
+vérification tournent dans un pool de threads dédié et borné (bcrypt libère
+le GIL pendant le calcul) : une rafale de connexions ne mobilise jamais plus
+de BCRYPT_CONCURRENCE cœurs, et les threads des routes (pool de FastAPI)
+restent disponibles pour les autres requêtes.
+
+Variables d'environnement :
+- BCRYPT_CONCURRENCE : nombre de calculs bcrypt simultanés (défaut: min(4, nb CPU))
+- BCRYPT_CIBLE_MS : durée visée pour un hachage, le coût est calibré au démarrage (défaut: 250)
+- BCRYPT_ROUNDS : coût fixe (désactive la calibration)
+
+passlib n'est importé qu'au premier hachage (voir _bcrypt) et la calibration
+tourne en tâche de fond (lancer_calibration) : ni l'un ni l'autre ne retarde
+la première requête servie après un démarrage à froid.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BCRYPT_CONCURRENCE = max(1, int(os.getenv('BCRYPT_CONCURRENCE', str(min(4, os.cpu_count() or 1)))))
+BCRYPT_CIBLE_MS = float(os.getenv('BCRYPT_CIBLE_MS', '250'))
+BCRYPT_ROUNDS_MIN = 10
+BCRYPT_ROUNDS_MAX = 14
+
+_pool = ThreadPoolExecutor(max_workers=BCRYPT_CONCURRENCE, thread_name_prefix="bcrypt")
+_rounds = int(os.getenv('BCRYPT_ROUNDS', '12'))
+
+
+def _bcrypt():
+    """passlib.hash.bcrypt, importé au premier usage (~30 ms d'import évités au démarrage)"""
+    from passlib.hash import bcrypt
+    return bcrypt
+
+
+def calibrer_cout_bcrypt():
+    """
+    Choisir le coût le plus élevé dont le hachage reste sous BCRYPT_CIBLE_MS
+    sur cette machine (jamais moins de BCRYPT_ROUNDS_MIN). En attendant le
+    résultat, les hachages utilisent BCRYPT_ROUNDS (12 par défaut).
+    """
+    global _rounds
+    if os.getenv('BCRYPT_ROUNDS'):
+        return _rounds
+
+    bcrypt = _bcrypt()
+    choisi = BCRYPT_ROUNDS_MIN
+    for rounds in range(BCRYPT_ROUNDS_MIN, BCRYPT_ROUNDS_MAX + 1):
+        debut = time.perf_counter()
+        bcrypt.using(rounds=rounds).hash("calibration")
+        duree_ms = (time.perf_counter() - debut) * 1000
+        if duree_ms > BCRYPT_CIBLE_MS:
+            break
+        choisi = rounds
+        # Chaque cran double la durée : inutile de mesurer le suivant s'il dépassera la cible
+        if duree_ms * 2 > BCRYPT_CIBLE_MS:
+            break
+    _rounds = choisi
+    return _rounds
+
+
+def lancer_calibration():
+    """Calibrer dans le pool bcrypt sans bloquer le démarrage, retourne le Future"""
+    return _pool.submit(calibrer_cout_bcrypt)
+
+
+def _verifier(mot_de_passe, hash_stocke):
+    try:
+        return _bcrypt().verify(mot_de_passe, hash_stocke)
+    except ValueError:
+        # Hash illisible (ancien format, champ vide...)
+        return False
+
+
+def _hacher(mot_de_passe):
+    return _bcrypt().using(rounds=_rounds).hash(mot_de_passe)
+
+
+def doit_rehacher(hash_stocke):
+    """
+    Le hash a un coût inférieur au coût calibré (à re-hacher à la prochaine connexion)
+    Jamais vers le bas : plusieurs serveurs calibrés différemment ne se contredisent pas.
+    """
+    try:
+        return _bcrypt().from_string(hash_stocke).rounds < _rounds
+    except (ValueError, TypeError):
+        return False
+
+
+def verifier_mot_de_passe(mot_de_passe, hash_stocke):
+    """Vérifier un mot de passe dans le pool bcrypt (à appeler depuis une route def)"""
+    return _pool.submit(_verifier, mot_de_passe, hash_stocke).result()
+
+
+def hacher_mot_de_passe(mot_de_passe):
+    """Hacher un mot de passe (coût calibré) dans le pool bcrypt (à appeler depuis une route def)"""
+    return _pool.submit(_hacher, mot_de_passe).result()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - PAGINATION PAR CURSEUR (KEYSET)
+Alternative à offset/limit pour les listes volumineuses
+
+Tri et prédicat portent sur les colonnes brutes : l'index (date, id) de la
+table sert à chaque page (voir verifier_index.py). Quand la première colonne
+est nullable (Devis.created_at, Avoir.created_at,
+MouvementStock.date_mouvement), les lignes sans date sont parcourues à la
+suite des autres, triées sur la clé primaire (branche "IS NULL") : elles ne
+sont ni sautées par le prédicat ni placées différemment selon la base
+(NULLS FIRST/LAST). Leur curseur est ",<id>".
+"""
+
+from datetime import date, datetime
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+
+def _nullable(colonne):
+    return bool(colonne.nullable) and not colonne.primary_key
+
+
+def _convertir_valeur(colonne, brute):
+    """Convertir une valeur de curseur (texte) vers le type Python de la colonne"""
+    type_python = colonne.type.python_type
+    if type_python is datetime:
+        return datetime.fromisoformat(brute)
+    if type_python is date:
+        return date.fromisoformat(brute)
+    return type_python(brute)
+
+
+def decoder_curseur(after, colonnes):
+    """
+    Décoder le paramètre ?after=
+    - "" (vide) : première page en mode curseur
+    - "<id>" pour un tri sur la clé primaire
+    - "<date>,<id>" pour un tri sur (date, clé primaire)
+    """
+    if not after:
+        return None
+
+    morceaux = after.split(',')
+    if len(morceaux) != len(colonnes):
+        raise HTTPException(status_code=400, detail=f"Curseur invalide: {after}")
+
+    try:
+        return [
+            None if not val.strip() and _nullable(col) else _convertir_valeur(col, val.strip())
+            for col, val in zip(colonnes, morceaux)
+        ]
+    except (ValueError, TypeError, NotImplementedError):
+        raise HTTPException(status_code=400, detail=f"Curseur invalide: {after}")
+
+
+def encoder_curseur(ligne, colonnes):
+    """Construire le curseur de la page suivante à partir de la dernière ligne renvoyée"""
+    valeurs = []
+    for colonne in colonnes:
+        if not hasattr(ligne, '_mapping'):
+            valeur = getattr(ligne, colonne.key)
+        elif colonne.key in ligne._mapping:
+            # Projection de colonnes (voir projections.py)
+            valeur = ligne._mapping[colonne.key]
+        else:
+            # Requête multi-entités : l'entité paginée est en première position
+            valeur = getattr(ligne[0], colonne.key)
+        if valeur is None:
+            valeurs.append('')
+        else:
+            valeurs.append(valeur.isoformat() if isinstance(valeur, (date, datetime)) else str(valeur))
+    return ','.join(valeurs)
+
+
+def _predicat_apres(colonnes, valeurs, descendant):
+    """(c1, c2) > (v1, v2) écrit sans comparaison de tuples (portable MySQL/PostgreSQL/SQLite)"""
+    conditions = []
+    for i, colonne in enumerate(colonnes):
+        egalites = [colonnes[j] == valeurs[j] for j in range(i)]
+        comparaison = colonne < valeurs[i] if descendant else colonne > valeurs[i]
+        conditions.append(and_(*egalites, comparaison))
+    return or_(*conditions)
+
+
+def _ordonner(query, colonnes, descendant):
+    return query.order_by(None).order_by(*[col.desc() if descendant else col.asc() for col in colonnes])
+
+
+def requetes_curseur(query, colonnes, valeurs=None, descendant=False):
+    """
+    Requêtes (Query ORM ou select()) qui lisent, dans l'ordre, la suite de la
+    liste après `valeurs` (None : depuis le début), sans limite :
+    - lignes datées : colonnes brutes, servies par l'index
+    - puis, si la première colonne est nullable, lignes sans date triées sur
+      les colonnes suivantes
+    Seule la première colonne peut être nullable.
+    """
+    tete, suite = colonnes[0], colonnes[1:]
+    if not _nullable(tete):
+        if valeurs is not None:
+            query = query.filter(_predicat_apres(colonnes, valeurs, descendant))
+        return [_ordonner(query, colonnes, descendant)]
+
+    requetes = []
+    if valeurs is None or valeurs[0] is not None:
+        datees = query.filter(tete.isnot(None))
+        if valeurs is not None:
+            datees = datees.filter(_predicat_apres(colonnes, valeurs, descendant))
+        requetes.append(_ordonner(datees, colonnes, descendant))
+
+    sans_date = query.filter(tete.is_(None))
+    if valeurs is not None and valeurs[0] is None:
+        sans_date = sans_date.filter(_predicat_apres(suite, valeurs[1:], descendant))
+    requetes.append(_ordonner(sans_date, suite, descendant))
+    return requetes
+
+
+def paginer_par_curseur(query, colonnes, after, limit, descendant=False):
+    """
+    Appliquer la pagination par curseur à une requête
+
+    Le tri se fait sur `colonnes` (la dernière doit être la clé primaire pour
+    garantir l'unicité). Retourne (lignes, next_cursor) ; next_cursor vaut None
+    sur la dernière page.
+    """
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit doit être supérieur ou égal à 1")
+
+    valeurs = decoder_curseur(after, colonnes)
+
+    # Lire une ligne de plus pour savoir s'il existe une page suivante ;
+    # les lignes sans date ne sont lues que si les lignes datées ne suffisent pas
+    lignes = []
+    for requete in requetes_curseur(query, colonnes, valeurs, descendant):
+        lignes += requete.limit(limit + 1 - len(lignes)).all()
+        if len(lignes) > limit:
+            break
+
+    next_cursor = None
+    if len(lignes) > limit:
+        lignes = lignes[:limit]
+        next_cursor = encoder_curseur(lignes[-1], colonnes)
+
+    return lignes, next_cursor
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - POOL DE CONNEXIONS INSTRUMENTÉ
+Paramètres du pool SQLAlchemy lus dans l'environnement (config.env) et
+compteurs d'attente exposés par GET /api/admin/pool : une saturation du pool
+(rush de midi) se voit au lieu de se traduire par des caisses lentes.
+
+Variables d'environnement :
+- DB_POOL_SIZE : connexions gardées ouvertes (défaut: 5)
+- DB_MAX_OVERFLOW : connexions supplémentaires en pointe (défaut: 10)
+- DB_POOL_TIMEOUT : attente maximale d'une connexion libre, en secondes (défaut: 30)
+- DB_POOL_RECYCLE : âge maximal d'une connexion, en secondes (défaut: 1800).
+  Doit rester inférieur au wait_timeout de MySQL / au délai d'inactivité du pooler.
+- DB_POOL_PRE_PING : 1 pour tester chaque connexion avant usage (un aller-retour
+  de plus par requête ; défaut: 0, la péremption est gérée par DB_POOL_RECYCLE)
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+
+def _booleen(valeur):
+    return str(valeur).strip().lower() in ('1', 'true', 'oui', 'yes', 'on')
+
+
+def options_pool():
+    """Arguments de create_engine() pour le pool, d'après l'environnement"""
+    return {
+        "poolclass": PoolInstrumente,
+        "pool_size": int(os.getenv('DB_POOL_SIZE', '5')),
+        "max_overflow": int(os.getenv('DB_MAX_OVERFLOW', '10')),
+        "pool_timeout": float(os.getenv('DB_POOL_TIMEOUT', '30')),
+        "pool_recycle": int(os.getenv('DB_POOL_RECYCLE', '1800')),
+        "pool_pre_ping": _booleen(os.getenv('DB_POOL_PRE_PING', '0')),
+    }
+
+
+# Compteurs au niveau du module : le pool est recréé (recreate) après une
+# coupure de la base, les statistiques doivent survivre.
+_verrou = threading.Lock()
+_compteurs = {
+    "obtentions": 0,
+    "attentes": 0,
+    "expirations": 0,
+    "attente_totale": 0.0,
+    "attente_max": 0.0,
+}
+_depuis = datetime.now()
+
+
+class PoolInstrumente(QueuePool):
+    """QueuePool qui mesure le temps passé à attendre une connexion libre"""
+
+    def _do_get(self):
+        # Pool plein (taille + débordement atteints, aucune connexion libre) : on va attendre
+        sature = (
+            self._max_overflow > -1
+            and self._overflow >= self._max_overflow
+            and self._pool.qsize() == 0
+        )
+        debut = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with _verrou:
+                _compteurs["expirations"] += 1
+            raise
+        finally:
+            duree = time.perf_counter() - debut
+            with _verrou:
+                _compteurs["obtentions"] += 1
+                if sature:
+                    _compteurs["attentes"] += 1
+                    _compteurs["attente_totale"] += duree
+                    _compteurs["attente_max"] = max(_compteurs["attente_max"], duree)
+
+
+def statistiques_pool(engine):
+    """Occupation instantanée du pool et attentes cumulées depuis le démarrage"""
+    pool = engine.pool
+    with _verrou:
+        compteurs = dict(_compteurs)
+
+    etat = {"classe": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        etat.update({
+            "taille": pool.size(),
+            "debordement_max": pool._max_overflow,
+            "timeout_s": pool.timeout(),
+            "recycle_s": pool._recycle,
+            "pre_ping": pool._pre_ping,
+            "utilisees": pool.checkedout(),
+            "libres": pool.checkedin(),
+            "debordement": max(0, pool.overflow()),
+        })
+
+    attentes = compteurs["attentes"]
+    etat.update({
+        "depuis": _depuis.isoformat(),
+        "obtentions": compteurs["obtentions"],
+        "attentes": attentes,
+        "expirations": compteurs["expirations"],
+        "attente_moyenne_ms": round(compteurs["attente_totale"] / attentes * 1000, 2) if attentes else 0.0,
+        "attente_max_ms": round(compteurs["attente_max"] * 1000, 2),
+    })
+    return etat
+
+
+def reinitialiser_statistiques_pool():
+    """Remettre à zéro les compteurs d'attente"""
+    global _depuis
+    with _verrou:
+        for cle in _compteurs:
+            _compteurs[cle] = 0.0 if isinstance(_compteurs[cle], float) else 0
+        _depuis = datetime.now()
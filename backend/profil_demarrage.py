@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - PROFIL DU DÉMARRAGE À FROID
+Mesure, dans des processus Python neufs, ce que coûte le démarrage du backend
+avant de pouvoir servir la première requête :
+
+1. import de app.py, module par module (python -X importtime)
+2. temps jusqu'à la première réponse : import + événements de démarrage
+   (schéma, pool, bcrypt, santé) + GET /health/live
+
+--sans-cache recompile les sources du backend à chaque lancement (copie dans
+un dossier temporaire, sans __pycache__) ; les dépendances gardent leurs .pyc
+comme après un pip install. C'est le cas d'une instance Render dont le build
+n'a pas précompilé le backend, ou du premier lancement de la version packagée.
+
+Utilise la base configurée (config.env / DATABASE_URL) :
+    python profil_demarrage.py
+    python profil_demarrage.py --repetitions 10 --top 40
+    python profil_demarrage.py --sans-cache
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DOSSIER_BACKEND = os.path.dirname(os.path.abspath(__file__))
+
+# Exécuté dans le processus mesuré : une seule ligne PROFIL {...} sur stdout
+_PREMIERE_REQUETE = """
+import json, time
+debut = time.perf_counter()
+import app
+apres_import = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.app) as client:
+    apres_demarrage = time.perf_counter()
+    statut = client.get("/health/live").status_code
+    fin = time.perf_counter()
+print("PROFIL " + json.dumps({
+    "import_ms": (apres_import - debut) * 1000,
+    "demarrage_ms": (apres_demarrage - apres_import) * 1000,
+    "premiere_requete_ms": (fin - apres_demarrage) * 1000,
+    "statut": statut,
+}))
+"""
+
+
+def _copie_sans_pyc():
+    """Copie des sources du backend (et de config.env) sans aucun .pyc"""
+    dossier = os.path.join(tempfile.mkdtemp(prefix="profil_demarrage_"), "backend")
+    shutil.copytree(DOSSIER_BACKEND, dossier, ignore=shutil.ignore_patterns("__pycache__", "*.pyc"))
+    return dossier
+
+
+def _lancer(arguments, sans_cache):
+    env = dict(os.environ)
+    if sans_cache:
+        dossier = _copie_sans_pyc()
+        env["PYTHONDONTWRITEBYTECODE"] = "1"
+    else:
+        dossier = DOSSIER_BACKEND
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+    try:
+        debut = time.perf_counter()
+        resultat = subprocess.run([sys.executable] + arguments, cwd=dossier, env=env, capture_output=True, text=True)
+        return resultat, (time.perf_counter() - debut) * 1000
+    finally:
+        if sans_cache:
+            shutil.rmtree(os.path.dirname(dossier), ignore_errors=True)
+
+
+def lire_importtime(sortie):
+    """Lignes de -X importtime -> liste de (module, profondeur, propre_us, cumul_us)"""
+    modules = []
+    for ligne in sortie.splitlines():
+        if not ligne.startswith("import time:") or "self [us]" in ligne:
+            continue
+        propre, cumul, nom = ligne[len("import time:"):].split("|")
+        profondeur = (len(nom) - len(nom.lstrip())) // 2
+        modules.append((nom.strip(), profondeur, int(propre), int(cumul)))
+    return modules
+
+
+def profil_imports(repetitions, sans_cache):
+    """Médiane par module de la durée propre et cumulée (ms) sur plusieurs imports de app"""
+    propres, cumuls, directs = {}, {}, set()
+    for _ in range(repetitions):
+        resultat, _ = _lancer(["-X", "importtime", "-c", "import app"], sans_cache)
+        if resultat.returncode != 0:
+            raise RuntimeError(f"import app impossible:\n{resultat.stderr[-2000:]}")
+        # importtime affiche les enfants avant leur parent
+        en_attente = []
+        for nom, profondeur, propre, cumul in lire_importtime(resultat.stderr):
+            propres.setdefault(nom, []).append(propre / 1000)
+            cumuls.setdefault(nom, []).append(cumul / 1000)
+            if profondeur == 1:
+                en_attente.append(nom)
+            elif profondeur == 0:
+                if nom == "app":
+                    directs.update(en_attente)
+                en_attente = []
+    return (
+        {nom: statistics.median(v) for nom, v in propres.items()},
+        {nom: statistics.median(v) for nom, v in cumuls.items()},
+        directs,
+    )
+
+
+def profil_premiere_requete(repetitions, sans_cache):
+    mesures = []
+    for _ in range(repetitions):
+        resultat, total_ms = _lancer(["-c", _PREMIERE_REQUETE], sans_cache)
+        lignes = [l for l in resultat.stdout.splitlines() if l.startswith("PROFIL ")]
+        if resultat.returncode != 0 or not lignes:
+            raise RuntimeError(f"démarrage impossible:\n{resultat.stderr[-2000:]}")
+        mesure = json.loads(lignes[-1][len("PROFIL "):])
+        mesure["processus_ms"] = total_ms
+        mesures.append(mesure)
+    return {cle: statistics.median(m[cle] for m in mesures)
+            for cle in ("import_ms", "demarrage_ms", "premiere_requete_ms", "processus_ms")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profil du démarrage à froid du backend")
+    parser.add_argument("--repetitions", type=int, default=5, help="Processus lancés par mesure (médiane)")
+    parser.add_argument("--top", type=int, default=25, help="Nombre de modules affichés")
+    parser.add_argument("--sans-cache", action="store_true", help="Recompiler les sources du backend à chaque lancement")
+    parser.add_argument("--imports-seulement", action="store_true", help="Ne pas mesurer la première requête")
+    args = parser.parse_args()
+
+    mode = "backend sans .pyc" if args.sans_cache else "avec cache .pyc"
+    print(f"⏱️  Démarrage à froid ({mode}, médiane de {args.repetitions} processus)")
+
+    try:
+        propres, cumuls, directs = profil_imports(args.repetitions, args.sans_cache)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+
+    total = cumuls.get("app", 0.0)
+    print(f"\n📦 import app : {total:.0f} ms (dont {propres.get('app', 0.0):.0f} ms dans le corps de app.py)")
+
+    print(f"\n  Imports directs de app.py (cumulé) :")
+    for nom in sorted(directs, key=lambda n: -cumuls[n])[:args.top]:
+        print(f"    {cumuls[nom]:8.1f} ms  {nom}")
+
+    print(f"\n  Modules les plus coûteux (durée propre) :")
+    for nom in sorted(propres, key=lambda n: -propres[n])[:args.top]:
+        print(f"    {propres[nom]:8.1f} ms  {nom}")
+
+    if not args.imports_seulement:
+        try:
+            mesure = profil_premiere_requete(args.repetitions, args.sans_cache)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"\n🚀 Jusqu'à la première réponse :")
+        print(f"    {mesure['import_ms']:8.0f} ms  import app")
+        print(f"    {mesure['demarrage_ms']:8.0f} ms  événements de démarrage (schéma, pool, bcrypt, santé)")
+        print(f"    {mesure['premiere_requete_ms']:8.0f} ms  GET /health/live")
+        print(f"    {mesure['processus_ms']:8.0f} ms  processus complet (interpréteur compris)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - PROJECTIONS DE COLONNES POUR LES LISTES
+Les listes et recherches lisent des colonnes explicites (db.query(Article.id_article,
+Article.designation, ...)) au lieu d'entités complètes : pas d'objets ORM ni
+d'identity map, des lignes légères converties directement en dict.
+
+?fields=a,b,c (sparse fieldset) limite la réponse aux colonnes demandées ;
+la clé primaire est toujours incluse. Les colonnes Text (description,
+adresse, motif...) ne sont lues que si l'endpoint ou l'appelant les demande.
+"""
+
+from fastapi import HTTPException
+from sqlalchemy import inspect
+
+
+def champs_du_modele(modele, sauf=()):
+    """Noms des attributs colonnes du modèle, dans l'ordre de déclaration"""
+    return [attribut.key for attribut in inspect(modele).column_attrs if attribut.key not in sauf]
+
+
+def colonnes_demandees(modele, fields, par_defaut):
+    """
+    ?fields= -> attributs de colonnes à lire (par_defaut si absent).
+    Champ inconnu : 400 avec la liste des champs disponibles.
+    """
+    mapper = inspect(modele)
+    disponibles = champs_du_modele(modele)
+
+    if fields is None:
+        noms = list(par_defaut)
+    else:
+        noms = [nom.strip() for nom in fields.split(',') if nom.strip()]
+        inconnus = [nom for nom in noms if nom not in disponibles]
+        if inconnus:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Champ(s) inconnu(s): {', '.join(inconnus)} (disponibles: {', '.join(disponibles)})"
+            )
+
+    # Clé primaire toujours présente (identification côté client, curseur de pagination)
+    cle = mapper.get_property_by_column(mapper.primary_key[0]).key
+    if cle not in noms:
+        noms.insert(0, cle)
+    return [getattr(modele, nom) for nom in dict.fromkeys(noms)]
+
+
+def en_dicts(lignes):
+    """Lignes de projection -> liste de dict {champ: valeur}"""
+    return [ligne._asdict() for ligne in lignes]
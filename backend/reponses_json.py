@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - RÉPONSES JSON RAPIDES (ORJSON)
+ReponseJSON est la classe de réponse par défaut de l'application : orjson
+sérialise les dict/listes ~7x plus vite que json de la bibliothèque standard
+et gère nativement datetime, date, time et UUID (même texte que isoformat()).
+
+Une route qui retourne un dict ou une liste passe d'abord par
+jsonable_encoder de FastAPI, qui recopie tout le résultat en Python pur : sur
+les grandes listes, c'est la plus grosse part du coût de sérialisation. Les
+routes de liste retournent donc directement ReponseJSON(resultat), sans cette
+copie (voir bench_json.py pour la mesure).
+
+orjson est optionnel : sans lui, même classe, sérialisée par le module json.
+"""
+
+import json
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _par_defaut(objet):
+    """Types qu'orjson ne connaît pas : mêmes règles que jsonable_encoder"""
+    if isinstance(objet, Decimal):
+        return int(objet) if objet.as_tuple().exponent >= 0 else float(objet)
+    return jsonable_encoder(objet)
+
+
+def _par_defaut_json(objet):
+    """Repli sans orjson : json ne connaît pas non plus les dates"""
+    if hasattr(objet, "isoformat"):
+        return objet.isoformat()
+    return _par_defaut(objet)
+
+
+class ReponseJSON(JSONResponse):
+    """JSONResponse sérialisée par orjson (repli sur json si orjson est absent)"""
+
+    def render(self, content):
+        if orjson is not None:
+            return orjson.dumps(content, default=_par_defaut, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_par_defaut_json
+        ).encode("utf-8")
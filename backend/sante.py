@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - SONDES DE SANTÉ
+Le répartiteur de charge et la supervision interrogent l'API toutes les
+quelques secondes. Plutôt qu'un SELECT 1 (et une connexion du pool) par
+appel, une tâche de fond vérifie périodiquement :
+- que la base répond
+- que le pool de connexions n'est pas saturé
+- le retard de la boucle d'événements (une route qui la bloque)
+et /health/ready se contente de lire le dernier résultat.
+
+Variables d'environnement :
+- SANTE_INTERVALLE : secondes entre deux vérifications (défaut: 10)
+- SANTE_RETARD_MAX_MS : retard de boucle au-delà duquel l'API n'est plus prête (défaut: 500)
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+
+import anyio.to_thread
+from sqlalchemy import text
+
+from database_mysql import engine
+from pool_connexions import statistiques_pool
+
+SANTE_INTERVALLE = float(os.getenv('SANTE_INTERVALLE', '10'))
+SANTE_RETARD_MAX_MS = float(os.getenv('SANTE_RETARD_MAX_MS', '500'))
+
+# Pas de 50 ms pour mesurer le retard de la boucle
+_PAS_MESURE = 0.05
+
+_etat = {
+    "pret": False,
+    "base": None,
+    "pool_sature": None,
+    "retard_boucle_ms": None,
+    "verifie_le": None,
+    "erreur": "Première vérification en cours"
+}
+_derniere_verification = None
+_tache = None
+# Thread réservé à la sonde : elle ne fait pas la queue derrière les routes
+_limiteur_sonde = None
+
+
+def _sonder_base():
+    """SELECT 1 sur une connexion du pool (exécuté dans un thread)"""
+    with engine.connect() as connexion:
+        connexion.execute(text("SELECT 1"))
+
+
+async def verifier():
+    """Une vérification complète, résultat mis en cache dans _etat"""
+    global _derniere_verification, _limiteur_sonde
+    if _limiteur_sonde is None:
+        _limiteur_sonde = anyio.CapacityLimiter(1)
+
+    # Retard de la boucle : un sommeil de 50 ms qui dure plus longtemps
+    debut = time.perf_counter()
+    await asyncio.sleep(_PAS_MESURE)
+    retard_ms = max(0.0, (time.perf_counter() - debut - _PAS_MESURE) * 1000)
+
+    pool = statistiques_pool(engine)
+    capacite = pool.get("taille", 0) + pool.get("debordement_max", 0)
+    pool_sature = bool(capacite) and pool.get("utilisees", 0) >= capacite and pool.get("debordement_max", 0) >= 0
+
+    erreur = None
+    base = _etat["base"]
+    if pool_sature:
+        # Ne pas attendre une connexion (pool_timeout) : on garde le dernier état connu de la base
+        erreur = "Pool de connexions saturé"
+    else:
+        try:
+            await anyio.to_thread.run_sync(_sonder_base, limiter=_limiteur_sonde)
+            base = True
+        except Exception as e:
+            base = False
+            erreur = f"Base de données injoignable: {e}"
+
+    if erreur is None and retard_ms > SANTE_RETARD_MAX_MS:
+        erreur = f"Boucle d'événements en retard de {retard_ms:.0f} ms"
+
+    _etat.update({
+        "pret": erreur is None,
+        "base": base,
+        "pool_sature": pool_sature,
+        "retard_boucle_ms": round(retard_ms, 1),
+        "verifie_le": datetime.now().isoformat(),
+        "erreur": erreur
+    })
+    _derniere_verification = time.monotonic()
+
+
+async def _boucle(intervalle):
+    while True:
+        try:
+            await verifier()
+        except Exception as e:
+            print(f"  ⚠️ Erreur vérification santé: {e}")
+        await asyncio.sleep(intervalle)
+
+
+def demarrer_surveillance(intervalle=None):
+    """Lancer la tâche de fond (au démarrage, dans la boucle d'événements)"""
+    global _tache
+    if _tache is None or _tache.done():
+        _tache = asyncio.create_task(_boucle(intervalle or SANTE_INTERVALLE))
+    return _tache
+
+
+def arreter_surveillance():
+    global _tache
+    if _tache is not None:
+        _tache.cancel()
+        _tache = None
+
+
+def etat_sante():
+    """
+    Dernier résultat de la vérification (aucune entrée/sortie)
+    Un résultat trop ancien (tâche de fond arrêtée) rend l'API non prête.
+    """
+    etat = dict(_etat)
+    if _derniere_verification is None:
+        return etat
+    age = time.monotonic() - _derniere_verification
+    etat["age_s"] = round(age, 1)
+    if age > 3 * SANTE_INTERVALLE + 1:
+        etat["pret"] = False
+        etat["erreur"] = f"Dernière vérification il y a {age:.0f}s"
+    return etat
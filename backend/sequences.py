@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - NUMÉROTATION DES DOCUMENTS
+Compteurs par (préfixe, année) dans la table sequence_document, incrémentés
+atomiquement (UPDATE ... SET valeur = valeur + 1, verrou de ligne) dans la
+transaction de la route appelante, sur sa propre connexion :
+
+- une route n'utilise jamais plus d'une connexion du pool (pas d'attente
+  d'une seconde connexion quand le pool est saturé, voir concurrence.py)
+- le verrou de ligne est tenu jusqu'au commit de la route : deux documents
+  du même type sont numérotés l'un après l'autre, sans doublon
+- un rollback de la route rend le numéro : pas de trou dans la numérotation
+  des factures, devis et avoirs
+
+Remplace le calcul "dernier id + 1" (une requête de plus et des doublons
+quand deux ventes sont enregistrées en même temps).
+
+- prochain_numero('FAC', db) -> "FAC-2026-042" (attribué)
+- apercu_numero('FAC', db)   -> numéro probable, rien n'est réservé
+  (affiché à l'ouverture d'un formulaire)
+"""
+
+import re
+from datetime import datetime
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+
+from database_mysql import (
+    SequenceDocument, Facture, Devis, Client, Fournisseur, Reglement, Avoir, Article
+)
+
+# préfixe -> (format du numéro, colonne numéro, colonne id)
+# Les colonnes servent uniquement à amorcer un compteur sur une base existante
+SEQUENCES = {
+    'FAC': ('FAC-{annee}-{n:03d}', Facture.numero_facture, Facture.id_facture),
+    'F': ('F{annee}-{n:06d}', Facture.numero_facture, Facture.id_facture),  # Ventes comptoir
+    'DEV': ('DEV-{annee}-{n:03d}', Devis.numero_devis, Devis.id_devis),
+    'CLI': ('CLI-{annee}-{n:03d}', Client.numero_client, Client.id_client),
+    'FOUR': ('FOUR-{annee}-{n:03d}', Fournisseur.numero_fournisseur, Fournisseur.id_fournisseur),
+    'REG': ('REG-{annee}-{n:03d}', Reglement.numero_reglement, Reglement.id_reglement),
+    'AVO': ('AVO-{annee}-{n:03d}', Avoir.numero_avoir, Avoir.id_avoir),
+    'ART': ('ART-{n:04d}', Article.code_article, Article.id_article),
+}
+
+
+def _motif(format_numero):
+    """'DEV-{annee}-{n:03d}' -> expression qui reconnaît les numéros de la séquence"""
+    morceaux = re.split(r"(\{annee\}|\{n[^}]*\})", format_numero)
+    return re.compile("^" + "".join(
+        r"\d{4}" if m == "{annee}" else r"\d+" if m.startswith("{n") else re.escape(m) for m in morceaux
+    ) + "$")
+
+
+MOTIFS = {prefixe: _motif(sequence[0]) for prefixe, sequence in SEQUENCES.items()}
+
+
+def _amorce(session, prefixe, annee):
+    """
+    Valeur de départ d'un nouveau compteur
+
+    Les anciens numéros étaient "dernier id + 1" : si des documents de cette
+    année existent déjà, repartir du plus grand id garantit l'absence de doublon.
+    """
+    format_numero, colonne_numero, colonne_id = SEQUENCES[prefixe]
+    debut = format_numero.split('{n')[0].format(annee=annee)
+    if session.query(colonne_id).filter(colonne_numero.like(f"{debut}%")).first() is None:
+        return 0
+    return session.query(func.max(colonne_id)).scalar() or 0
+
+
+def _annee(prefixe):
+    return datetime.now().year if '{annee}' in SEQUENCES[prefixe][0] else 0
+
+
+def _filtre(prefixe, annee):
+    return (SequenceDocument.prefixe == prefixe) & (SequenceDocument.annee == annee)
+
+
+def prochain_numero(prefixe, session):
+    """
+    Attribuer le prochain numéro de document pour ce préfixe (voir SEQUENCES),
+    dans la transaction de `session` : définitif au commit de la route
+    """
+    format_numero = SEQUENCES[prefixe][0]
+    annee = _annee(prefixe)
+    filtre = _filtre(prefixe, annee)
+    for _ in range(3):
+        # L'UPDATE pose le verrou de ligne jusqu'au commit : la lecture qui suit est cohérente
+        maj = update(SequenceDocument).where(filtre).values(valeur=SequenceDocument.valeur + 1)
+        if session.execute(maj).rowcount:
+            valeur = session.query(SequenceDocument.valeur).filter(filtre).scalar()
+            return format_numero.format(annee=annee, n=valeur)
+
+        # Première utilisation du compteur (nouvelle année, nouvelle base)
+        valeur = _amorce(session, prefixe, annee) + 1
+        try:
+            # Savepoint : un doublon n'annule pas la transaction de la route
+            with session.begin_nested():
+                session.add(SequenceDocument(prefixe=prefixe, annee=annee, valeur=valeur))
+            return format_numero.format(annee=annee, n=valeur)
+        except IntegrityError:
+            # Créé en parallèle par une autre transaction : refaire l'UPDATE
+            continue
+    raise RuntimeError(f"Impossible d'allouer un numéro pour la séquence {prefixe}-{annee}")
+
+
+def apercu_numero(prefixe, session):
+    """
+    Numéro que recevra probablement le prochain document (ouverture d'un
+    formulaire) : simple lecture, rien n'est réservé ni écrit
+    """
+    annee = _annee(prefixe)
+    valeur = session.query(SequenceDocument.valeur).filter(_filtre(prefixe, annee)).scalar()
+    if valeur is None:
+        valeur = _amorce(session, prefixe, annee)
+    return SEQUENCES[prefixe][0].format(annee=annee, n=valeur + 1)
+
+
+def numero_document(prefixe, fourni, session):
+    """
+    Numéro à enregistrer à la création : un numéro saisi à la main est
+    conservé, un numéro vide ou au format de la séquence (l'aperçu affiché
+    par le formulaire) est attribué maintenant par prochain_numero
+    """
+    if fourni and not MOTIFS[prefixe].match(fourni):
+        return fourni
+    return prochain_numero(prefixe, session)
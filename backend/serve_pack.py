@@ -4,10 +4,11 @@
 Serveur d'exécution pour packaging (PyInstaller)
 Ce fichier démarre l'application sans reload (compatible avec un exécutable unique).
 """
+import multiprocessing
 import os
 import sys
 from database_mysql import init_database, SessionLocal, Utilisateur
-from passlib.hash import bcrypt
+from mots_de_passe import hacher_mot_de_passe
 
 
 def create_admin_user():
@@ -16,7 +17,7 @@ def create_admin_user():
         admin = db.query(Utilisateur).filter(Utilisateur.nom_utilisateur == "admin").first()
         if not admin:
             print("📝 Création de l'utilisateur admin...")
-            hashed_password = bcrypt.hash("admin123")
+            hashed_password = hacher_mot_de_passe("admin123")
             admin = Utilisateur(
                 nom_utilisateur="admin",
                 mot_de_passe=hashed_password,
@@ -70,4 +71,7 @@ def main():
 
 
 if __name__ == "__main__":
+    # Exécutable PyInstaller : les processus de miniatures (images_articles.py, 'spawn')
+    # relancent l'exe ; freeze_support() les aiguille vers leur tâche au lieu de main()
+    multiprocessing.freeze_support()
     main()
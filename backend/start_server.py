@@ -4,10 +4,11 @@
 Script de lancement du serveur FastAPI
 """
 
+import multiprocessing
 import os
 import sys
 from database_mysql import init_database, SessionLocal, Utilisateur
-from passlib.hash import bcrypt
+from mots_de_passe import hacher_mot_de_passe
 
 def create_admin_user():
     """
@@ -23,7 +24,7 @@ def create_admin_user():
             print("📝 Création de l'utilisateur admin...")
             
             # Créer admin
-            hashed_password = bcrypt.hash("admin123")
+            hashed_password = hacher_mot_de_passe("admin123")
             admin = Utilisateur(
                 nom_utilisateur="admin",
                 mot_de_passe=hashed_password,
@@ -84,5 +85,8 @@ def main():
 
 
 if __name__ == "__main__":
+    # Exécutable PyInstaller : les processus de miniatures (images_articles.py, 'spawn')
+    # relancent l'exe ; freeze_support() les aiguille vers leur tâche au lieu de main()
+    multiprocessing.freeze_support()
     main()
 
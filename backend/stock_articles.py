@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - MISES À JOUR ATOMIQUES DU STOCK
+Le stock n'est plus recalculé en Python (lecture puis écriture de
+stock_actuel) mais modifié par un UPDATE relatif :
+
+    UPDATE article SET stock_actuel = stock_actuel - :q
+    WHERE id_article = :id AND stock_actuel >= :q
+
+Deux caisses qui vendent le même article en même temps ne peuvent donc plus
+passer toutes les deux la vérification et survendre. Les articles sont
+toujours modifiés par id croissant : les verrous de ligne sont pris dans le
+même ordre par toutes les transactions (pas d'interblocage).
+"""
+
+from fastapi import HTTPException
+from sqlalchemy import func, or_, update
+
+from database_mysql import Article
+
+
+def _regrouper(quantites):
+    """[(id_article, quantite), ...] -> [(id_article, total)] trié par id (ordre des verrous)"""
+    totaux = {}
+    for id_article, quantite in quantites:
+        if id_article is None:
+            continue
+        totaux[id_article] = totaux.get(id_article, 0) + abs(quantite or 0)
+    return sorted(totaux.items())
+
+
+def _expirer(db, ids_articles):
+    """Les objets Article déjà chargés dans la session doivent relire stock_actuel"""
+    for objet in list(db.identity_map.values()):
+        if isinstance(objet, Article) and objet.id_article in ids_articles:
+            db.expire(objet, ['stock_actuel'])
+
+
+def retirer_stock(db, quantites):
+    """
+    Sortie de stock atomique pour une vente / facture payée
+
+    Pour les PRODUITS la ligne n'est modifiée que si le stock est suffisant,
+    sinon HTTPException 400 (la transaction de l'appelant doit être annulée).
+    Les autres types d'articles sont décrémentés sans condition (comportement
+    historique des factures). Un article inexistant est ignoré.
+    """
+    lignes = _regrouper(quantites)
+    for id_article, quantite in lignes:
+        resultat = db.execute(
+            update(Article)
+            .where(
+                Article.id_article == id_article,
+                or_(Article.type_article != 'PRODUIT', func.coalesce(Article.stock_actuel, 0) >= quantite)
+            )
+            .values(stock_actuel=func.coalesce(Article.stock_actuel, 0) - quantite)
+            .execution_options(synchronize_session=False)
+        )
+        if resultat.rowcount:
+            continue
+
+        article = db.query(Article.designation, Article.stock_actuel).filter(Article.id_article == id_article).first()
+        if article is None:
+            continue
+        raise HTTPException(
+            status_code=400,
+            detail=f"❌ Stock insuffisant pour '{article.designation}'. Stock disponible: {article.stock_actuel or 0}, Quantité demandée: {quantite}"
+        )
+    _expirer(db, {id_article for id_article, _ in lignes})
+
+
+def remettre_stock(db, quantites):
+    """Entrée de stock atomique (retour, annulation, suppression, avoir)"""
+    lignes = _regrouper(quantites)
+    for id_article, quantite in lignes:
+        db.execute(
+            update(Article)
+            .where(Article.id_article == id_article)
+            .values(stock_actuel=func.coalesce(Article.stock_actuel, 0) + quantite)
+            .execution_options(synchronize_session=False)
+        )
+    _expirer(db, {id_article for id_article, _ in lignes})
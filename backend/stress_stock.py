@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - TEST DE CHARGE : SURVENTE AU COMPTOIR
+Plusieurs caisses (threads) vendent en même temps le même article à stock
+limité via POST /api/comptoir/vente. Vérifie qu'aucune vente ne passe au-delà
+du stock (stock final >= 0 et ventes acceptées = stock initial - stock final).
+
+À lancer sur la base configurée (MySQL / PostgreSQL) :
+    python stress_stock.py                       # application chargée en mémoire
+    python stress_stock.py --url http://localhost:8000 --threads 32 --stock 50
+
+Un article temporaire est créé puis supprimé avec ses ventes (sauf --garder).
+"""
+
+import argparse
+import sys
+import threading
+import time
+from datetime import datetime
+
+import httpx
+
+from database_mysql import SessionLocal, Article, MouvementStock
+
+
+def creer_article(stock):
+    db = SessionLocal()
+    try:
+        article = Article(
+            code_article=f"STRESS-{datetime.now().strftime('%H%M%S%f')}",
+            designation="Article test de charge",
+            type_article='PRODUIT',
+            prix_vente=100,
+            prix_achat=50,
+            stock_actuel=stock,
+            actif=True
+        )
+        db.add(article)
+        db.commit()
+        return article.id_article, article.code_article
+    finally:
+        db.close()
+
+
+def lire_stock(id_article):
+    db = SessionLocal()
+    try:
+        stock = db.query(Article.stock_actuel).filter(Article.id_article == id_article).scalar()
+        sorties = db.query(MouvementStock).filter(
+            MouvementStock.id_article == id_article,
+            MouvementStock.type_mouvement == 'SORTIE'
+        ).count()
+        return stock, sorties
+    finally:
+        db.close()
+
+
+def nouveau_client(url):
+    headers = {"Authorization": "Bearer token_1_stress"}
+    if url:
+        return httpx.Client(base_url=url, headers=headers, timeout=60)
+    from fastapi.testclient import TestClient
+    from app import app
+    return TestClient(app, headers=headers)
+
+
+def caisse(url, id_article, nb_ventes, depart, resultats, verrou):
+    client = nouveau_client(url)
+    acceptees, refusees, erreurs = [], 0, 0
+    depart.wait()
+    for _ in range(nb_ventes):
+        reponse = client.post("/api/comptoir/vente", json={
+            "articles": [{"id_article": id_article, "quantite": 1, "prix_unitaire": 100}],
+            "montant_recu": 100
+        })
+        if reponse.status_code == 200:
+            acceptees.append(reponse.json()["facture_id"])
+        elif reponse.status_code == 400:
+            refusees += 1
+        else:
+            erreurs += 1
+            print(f"  ⚠️ HTTP {reponse.status_code}: {reponse.text[:200]}")
+    with verrou:
+        resultats["acceptees"].extend(acceptees)
+        resultats["refusees"] += refusees
+        resultats["erreurs"] += erreurs
+
+
+def nettoyer(url, id_article, factures):
+    client = nouveau_client(url)
+    for id_facture in factures:
+        client.delete(f"/api/comptoir/ventes/{id_facture}")
+    db = SessionLocal()
+    try:
+        db.query(MouvementStock).filter(MouvementStock.id_article == id_article).delete()
+        db.query(Article).filter(Article.id_article == id_article).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de survente au comptoir sous forte concurrence")
+    parser.add_argument("--url", help="URL d'un serveur lancé (défaut: application en mémoire)")
+    parser.add_argument("--threads", type=int, default=16, help="Nombre de caisses simultanées")
+    parser.add_argument("--ventes", type=int, default=10, help="Ventes tentées par caisse")
+    parser.add_argument("--stock", type=int, default=40, help="Stock initial de l'article")
+    parser.add_argument("--garder", action="store_true", help="Ne pas supprimer l'article et les ventes")
+    args = parser.parse_args()
+
+    id_article, code = creer_article(args.stock)
+    print(f"📦 Article {code} (id {id_article}) : stock initial {args.stock}")
+    print(f"🔥 {args.threads} caisses x {args.ventes} ventes de 1 unité")
+
+    resultats = {"acceptees": [], "refusees": 0, "erreurs": 0}
+    verrou = threading.Lock()
+    depart = threading.Barrier(args.threads)
+    caisses = [
+        threading.Thread(target=caisse, args=(args.url, id_article, args.ventes, depart, resultats, verrou))
+        for _ in range(args.threads)
+    ]
+
+    debut = time.perf_counter()
+    for t in caisses:
+        t.start()
+    for t in caisses:
+        t.join()
+    duree = time.perf_counter() - debut
+
+    stock_final, sorties = lire_stock(id_article)
+    nb_acceptees = len(resultats["acceptees"])
+    print(f"⏱  {duree:.2f}s - acceptées: {nb_acceptees}, refusées (stock): {resultats['refusees']}, erreurs: {resultats['erreurs']}")
+    print(f"📊 Stock final: {stock_final}, mouvements SORTIE: {sorties}")
+
+    ok = (
+        stock_final >= 0
+        and nb_acceptees <= args.stock
+        and nb_acceptees == args.stock - stock_final
+        and sorties == nb_acceptees
+        and resultats["erreurs"] == 0
+    )
+
+    if not args.garder:
+        nettoyer(args.url, id_article, resultats["acceptees"])
+
+    if ok:
+        print("✅ Aucune survente")
+        return 0
+    print("❌ Incohérence de stock détectée")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
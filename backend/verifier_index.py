@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - VÉRIFICATION DES PLANS D'EXÉCUTION (EXPLAIN)
+Lance EXPLAIN sur les requêtes chaudes enregistrées dans requetes_chaudes()
+et échoue (code de sortie 1) si l'une d'elles parcourt une table entière
+au lieu d'utiliser un index. Cela arrive quand un index de
+database_mysql.py est supprimé ou qu'une requête change de forme.
+
+- MySQL : type ALL sans index candidat (possible_keys vide)
+- PostgreSQL : nœud "Seq Scan" avec enable_seqscan désactivé (sur une petite
+  base de test, le planificateur préférerait sinon toujours le parcours complet)
+- SQLite : "SCAN <table>" sans index dans EXPLAIN QUERY PLAN
+
+Lecture seule, sur la base configurée (config.env / DATABASE_URL) :
+    python migration_index.py && python verifier_index.py
+"""
+
+import argparse
+import json
+import re
+import sys
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import select, text
+
+from database_mysql import engine, Article, Avoir, Devis, Facture, LigneFacture, MouvementStock, Reglement
+from pagination import requetes_curseur
+
+LIMITE_PAGE = 100
+
+
+def _pages_curseur(nom, modele, colonnes):
+    """
+    Requêtes lancées par paginer_par_curseur pour une route en ?after= (tri
+    décroissant) : première page, page suivante, lignes sans date
+    """
+    maintenant = datetime.now() if colonnes[0].type.python_type is datetime else date.today()
+    etapes = {
+        "1re page": None,
+        "page suivante": [maintenant] + [1] * (len(colonnes) - 1),
+        "après les dates": [None] + [1] * (len(colonnes) - 1),
+    }
+    requetes = {}
+    for etape, valeurs in etapes.items():
+        if valeurs is not None and valeurs[0] is None and not colonnes[0].nullable:
+            continue
+        for i, requete in enumerate(requetes_curseur(select(modele), colonnes, valeurs, descendant=True)):
+            requetes[f"{nom} ({etape}{', sans date' if i else ''})"] = requete.limit(LIMITE_PAGE + 1)
+    return requetes
+
+
+def requetes_chaudes():
+    """Nom -> requête, reprenant les filtres des routes (stats, comptoir, listes)"""
+    aujourd_hui = date.today()
+    return {
+        "ventes du jour (comptoir)": select(Facture.id_facture, Facture.total_ttc).where(
+            Facture.date_facture == aujourd_hui,
+            Facture.type_facture.in_(['COMPTOIR', 'RETOUR'])
+        ),
+        "factures récentes non annulées": select(Facture.id_facture).where(
+            Facture.date_facture >= aujourd_hui - timedelta(days=30),
+            Facture.statut != 'Annulée'
+        ),
+        "historique comptoir": select(Facture.id_facture).where(
+            Facture.type_facture.in_(['COMPTOIR', 'RETOUR'])
+        ).order_by(Facture.created_at.desc()).limit(50),
+        "factures d'un client": select(Facture.id_facture).where(
+            Facture.id_client == 1
+        ).order_by(Facture.date_facture.desc()),
+        "factures d'un devis": select(Facture.id_facture).where(Facture.id_devis == 1),
+        "lignes d'une facture": select(LigneFacture.id_ligne_facture).where(LigneFacture.id_facture == 1),
+        "ventes d'un article": select(LigneFacture.id_ligne_facture).where(LigneFacture.id_article == 1),
+        **_pages_curseur("journal des mouvements", MouvementStock,
+                         [MouvementStock.date_mouvement, MouvementStock.id_mouvement]),
+        "mouvements d'un article": select(MouvementStock.id_mouvement).where(MouvementStock.id_article == 1),
+        "règlements d'une facture": select(Reglement.id_reglement).where(
+            Reglement.id_facture == 1
+        ).order_by(Reglement.date_reglement.desc()),
+        "règlements d'une période": select(Reglement.montant).where(
+            Reglement.date_reglement >= aujourd_hui.replace(day=1),
+            Reglement.date_reglement <= aujourd_hui
+        ),
+        **_pages_curseur("liste des devis", Devis, [Devis.created_at, Devis.id_devis]),
+        **_pages_curseur("liste des avoirs", Avoir, [Avoir.created_at, Avoir.id_avoir]),
+        **_pages_curseur("liste des règlements", Reglement, [Reglement.date_reglement, Reglement.id_reglement]),
+        "avoirs d'une facture": select(Avoir.id_avoir).where(Avoir.id_facture == 1),
+        "articles actifs en stock": select(Article.id_article).where(
+            Article.actif == True,
+            Article.stock_actuel > 0
+        ).limit(20),
+    }
+
+
+def _sql(requete):
+    return str(requete.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def parcours_complets(connexion, requete):
+    """Liste des tables parcourues entièrement par la requête (vide si tout passe par un index)"""
+    sql = _sql(requete)
+    dialecte = engine.dialect.name
+
+    if dialecte == "sqlite":
+        lignes = connexion.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        tables = []
+        for ligne in lignes:
+            detail = ligne[-1]
+            correspondance = re.match(r"SCAN (\w+)", detail)
+            if correspondance and "INDEX" not in detail:
+                tables.append(correspondance.group(1))
+        return tables
+
+    if dialecte == "mysql":
+        lignes = connexion.exec_driver_sql(f"EXPLAIN {sql}").mappings().fetchall()
+        return [ligne["table"] for ligne in lignes if ligne["type"] == "ALL" and not ligne["possible_keys"]]
+
+    if dialecte == "postgresql":
+        connexion.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = connexion.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        tables = []
+
+        def parcourir(noeud):
+            if noeud.get("Node Type") == "Seq Scan":
+                tables.append(noeud.get("Relation Name"))
+            for enfant in noeud.get("Plans", []):
+                parcourir(enfant)
+
+        parcourir(plan[0]["Plan"])
+        return tables
+
+    raise RuntimeError(f"Dialecte non supporté: {dialecte}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Échouer si une requête chaude parcourt une table entière")
+    parser.add_argument("-v", "--verbeux", action="store_true", help="Afficher le SQL de chaque requête")
+    args = parser.parse_args()
+
+    echecs = 0
+    print(f"🔎 Plans d'exécution des requêtes chaudes ({engine.dialect.name})")
+    for nom, requete in requetes_chaudes().items():
+        with engine.connect() as connexion:
+            tables = parcours_complets(connexion, requete)
+            connexion.rollback()  # annule SET LOCAL (PostgreSQL)
+        if tables:
+            echecs += 1
+            print(f"  ❌ {nom:<34} parcours complet de: {', '.join(tables)}")
+        else:
+            print(f"  ✅ {nom}")
+        if args.verbeux:
+            print(f"       {' '.join(_sql(requete).split())}")
+
+    if echecs:
+        print(f"❌ {echecs} requête(s) sans index (lancer migration_index.py ?)")
+        return 1
+    print("✅ Toutes les requêtes chaudes utilisent un index")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
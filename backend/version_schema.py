@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - VERSION DU SCHÉMA
+Au démarrage, au lieu d'inspecter toutes les tables (get_table_names,
+get_columns... plusieurs secondes contre une base distante), on compare
+l'empreinte des modèles à celle enregistrée dans schema_version : une seule
+requête quand rien n'a changé.
+
+La réconciliation complète (création des tables, colonnes vérifiées, index
+manquants, agrégats) ne tourne que :
+- au premier démarrage (table schema_version absente ou vide)
+- sur commande explicite : python version_schema.py migrer
+- au démarrage si SCHEMA_MIGRATION_AUTO=1 et que l'empreinte a changé
+
+Sans migration automatique, une empreinte modifiée crée quand même les
+tables entièrement absentes (nouveau modèle, ex. version_table) : sans
+risque pour les données, et les fonctions qui en dépendent ne démarrent pas
+désactivées. Colonnes et index des tables existantes attendent la migration.
+
+    python version_schema.py verifier   # comparer l'empreinte, sans rien modifier
+    python version_schema.py migrer     # réconciliation complète + nouvelle empreinte
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+from datetime import datetime
+
+from sqlalchemy import inspect, select, update, insert
+
+from database_mysql import Base, engine, SessionLocal, SchemaVersion, create_tables, test_connection
+
+SCHEMA_MIGRATION_AUTO = os.getenv('SCHEMA_MIGRATION_AUTO', '0').strip().lower() in ('1', 'true', 'oui', 'yes', 'on')
+
+
+def empreinte_schema():
+    """SHA-256 des tables, colonnes (type, nullable, clé primaire) et index des modèles"""
+    elements = []
+    for table in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        elements.append(f"T {table.name}")
+        for colonne in table.columns:
+            elements.append(f"C {table.name}.{colonne.name} {colonne.type} {colonne.nullable} {colonne.primary_key}")
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            elements.append(f"I {index.name} {','.join(c.name for c in index.columns)}")
+    return hashlib.sha256("\n".join(elements).encode()).hexdigest()
+
+
+def lire_empreinte():
+    """Empreinte enregistrée (None si aucune). Lève une exception si la table n'existe pas."""
+    with engine.connect() as connexion:
+        return connexion.execute(select(SchemaVersion.empreinte).where(SchemaVersion.id == 1)).scalar()
+
+
+def _enregistrer_empreinte(empreinte):
+    with engine.begin() as connexion:
+        resultat = connexion.execute(
+            update(SchemaVersion).where(SchemaVersion.id == 1).values(empreinte=empreinte, appliquee_le=datetime.now())
+        )
+        if resultat.rowcount == 0:
+            connexion.execute(insert(SchemaVersion).values(id=1, empreinte=empreinte, appliquee_le=datetime.now()))
+
+
+def creer_tables_manquantes():
+    """Créer les tables des modèles absentes de la base (tables existantes inchangées), retourne leurs noms"""
+    existantes = set(inspect(engine).get_table_names())
+    manquantes = [table for table in Base.metadata.sorted_tables if table.name not in existantes]
+    if manquantes:
+        Base.metadata.create_all(bind=engine, tables=manquantes, checkfirst=True)
+    return [table.name for table in manquantes]
+
+
+def migrer_schema():
+    """Réconciliation complète du schéma, puis enregistrement de la nouvelle empreinte"""
+    from migration_index import migrer as migrer_index
+    from agregats_ventes import initialiser_agregats_si_vides
+
+    print("\n  🔄 Migration automatique des tables...")
+    if not create_tables():
+        print("  ⚠️  Erreur lors de la migration des tables")
+        return False
+    if not migrer_index():
+        return False
+
+    # Construire les agrégats de ventes s'ils n'ont jamais été calculés
+    db = SessionLocal()
+    try:
+        if initialiser_agregats_si_vides(db):
+            print("  ✅ Agrégats de ventes construits")
+    finally:
+        db.close()
+
+    _enregistrer_empreinte(empreinte_schema())
+    print("  ✅ Migration terminée avec succès !")
+    return True
+
+
+def preparer_base():
+    """
+    Démarrage : une lecture de schema_version si le schéma est à jour,
+    réconciliation complète au premier démarrage. Retourne False si la base
+    est injoignable.
+    """
+    debut = time.perf_counter()
+    attendue = empreinte_schema()
+    try:
+        stockee = lire_empreinte()
+    except Exception:
+        # Table absente (première installation) ou base injoignable
+        if not test_connection():
+            return False
+        stockee = None
+
+    if stockee == attendue:
+        print(f"  ✅ Schéma à jour ({attendue[:12]}), vérifié en {(time.perf_counter() - debut) * 1000:.0f} ms")
+        return True
+
+    if stockee is None:
+        print("  🆕 Aucune version de schéma enregistrée : réconciliation complète")
+    elif SCHEMA_MIGRATION_AUTO:
+        print(f"  🔄 Schéma modifié ({stockee[:12]} -> {attendue[:12]}), SCHEMA_MIGRATION_AUTO actif")
+    else:
+        try:
+            creees = creer_tables_manquantes()
+            if creees:
+                print(f"  ➕ Tables absentes créées: {', '.join(creees)}")
+        except Exception as e:
+            print(f"  ⚠️  Création des tables absentes impossible: {e}")
+        print(f"  ⚠️  Schéma modifié ({stockee[:12]} -> {attendue[:12]}) : lancer 'python version_schema.py migrer' "
+              f"pour les colonnes et index")
+        return True
+
+    ok = migrer_schema()
+    print(f"  ⏱️  Réconciliation du schéma en {(time.perf_counter() - debut) * 1000:.0f} ms")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Version du schéma de la base")
+    parser.add_argument("commande", choices=["verifier", "migrer"])
+    args = parser.parse_args()
+
+    attendue = empreinte_schema()
+    if args.commande == "migrer":
+        debut = time.perf_counter()
+        ok = migrer_schema()
+        print(f"⏱️  {(time.perf_counter() - debut):.2f}s")
+        return 0 if ok else 1
+
+    try:
+        stockee = lire_empreinte()
+    except Exception as e:
+        print(f"❌ Lecture de schema_version impossible: {e}")
+        return 1
+    if stockee == attendue:
+        print(f"✅ Schéma à jour ({attendue[:12]})")
+        return 0
+    print(f"⚠️  Schéma à migrer : enregistré {stockee[:12] if stockee else 'aucun'}, modèles {attendue[:12]}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TECH INFO PLUS - VERSIONS DES TABLES (GET CONDITIONNELS)
+Le frontend recharge /api/articles, /api/clients, /api/fournisseurs et
+/api/entreprise/config à presque chaque page, alors que ces tables changent
+rarement. Chaque table suivie a un compteur dans version_table :
+
+- toute transaction qui écrit dans la table l'incrémente, juste avant son
+  commit et dans la même transaction (écritures ORM, update()/insert()/delete()
+  via session.execute, insertions en masse) : le compteur et les données
+  changent ensemble, y compris entre plusieurs processus
+- les routes lisent le compteur (une requête sur la clé primaire) et
+  répondent 304 Not Modified, sans charger aucune ligne, quand le navigateur
+  renvoie le même ETag (If-None-Match). Le navigateur revalide tout seul :
+  rien à changer côté frontend. Last-Modified est envoyé à titre indicatif,
+  mais If-Modified-Since seul ne donne jamais de 304 : à la seconde près,
+  deux écritures dans la même seconde passeraient inaperçues.
+
+Le stock (article.stock_actuel) change à chaque vente : une écriture qui ne
+touche que ces colonnes (COLONNES_NON_VERSIONNEES) n'incrémente pas le
+compteur, sinon toutes les ventes se sérialiseraient sur la ligne 'article'
+de version_table et le 304 ne servirait presque jamais. Les routes qui
+renvoient le stock ajoutent à leur ETag une fenêtre de VERSIONS_STOCK_TTL
+secondes (défaut: 10) : un stock servi en 304 a au plus ce retard.
+
+Sans la table version_table (schéma pas encore migré : python version_schema.py
+migrer), les routes répondent comme avant, sans ETag.
+"""
+
+import os
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from itertools import chain
+
+from fastapi import Response
+from sqlalchemy import event, inspect, select, update, insert
+
+from database_mysql import SessionLocal, VersionTable
+
+TABLES_VERSIONNEES = ('article', 'client', 'fournisseur', 'entreprise')
+
+# Colonnes dont la modification seule ne change pas la version de la table
+COLONNES_NON_VERSIONNEES = {'article': frozenset({'stock_actuel'})}
+VERSIONS_STOCK_TTL = float(os.getenv('VERSIONS_STOCK_TTL', '10'))
+
+_CLE_INFO = "tables_versionnees_modifiees"
+_actif = False
+_suffixe_etag = ""
+
+
+def initialiser_versions():
+    """
+    Démarrage : vérifier que version_table existe et créer les compteurs
+    manquants. Retourne False (suivi désactivé) si la table est absente.
+    """
+    global _actif, _suffixe_etag
+    from version_schema import empreinte_schema
+
+    db = SessionLocal()
+    try:
+        presentes = set(db.execute(select(VersionTable.nom)).scalars())
+        manquantes = [nom for nom in TABLES_VERSIONNEES if nom not in presentes]
+        if manquantes:
+            db.execute(insert(VersionTable), [{"nom": nom, "version": 1, "modifie_le": datetime.now()} for nom in manquantes])
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        _actif = False
+        print(f"  ⚠️  Versions des tables indisponibles (ETag désactivés): {e}")
+        return False
+    finally:
+        db.close()
+
+    # Une nouvelle colonne change la réponse sans changer le compteur
+    _suffixe_etag = empreinte_schema()[:8]
+    _actif = True
+    return True
+
+
+# ==================== SUIVI DES ÉCRITURES ====================
+
+def _noter(session, noms):
+    noms = [nom for nom in noms if nom in TABLES_VERSIONNEES]
+    if noms:
+        session.info.setdefault(_CLE_INFO, set()).update(noms)
+
+
+def _versionnee(table, colonnes):
+    """Une mise à jour de `colonnes` change-t-elle la version de la table ?"""
+    hors_version = COLONNES_NON_VERSIONNEES.get(table.name)
+    if not hors_version:
+        return True
+    cles = {colonne.key for colonne in table.primary_key}
+    ecrites = set(colonnes) - cles
+    return not ecrites or not ecrites <= hors_version
+
+
+def _modifie(session, objet):
+    if not session.is_modified(objet):
+        return False
+    if objet.__table__.name not in COLONNES_NON_VERSIONNEES:
+        return True
+    etat = inspect(objet)
+    changees = [attribut.key for attribut in etat.attrs if attribut.history.has_changes()]
+    return _versionnee(objet.__table__, changees)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _apres_flush(session, contexte):
+    modifies = chain(session.new, session.deleted, (o for o in session.dirty if _modifie(session, o)))
+    _noter(session, (objet.__table__.name for objet in modifies))
+
+
+def _colonnes_update(etat):
+    """Colonnes écrites par un update() : .values(...) et paramètres par clé primaire (executemany)"""
+    colonnes = [getattr(cle, "key", cle) for cle in (getattr(etat.statement, "_values", None) or {})]
+    parametres = etat.parameters
+    for ligne in (parametres if isinstance(parametres, list) else [parametres or {}]):
+        colonnes.extend(ligne)
+    return colonnes
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _apres_execution(etat):
+    if etat.is_insert or etat.is_update or etat.is_delete:
+        table = getattr(etat.statement, "table", None)
+        if table is None:
+            return
+        if etat.is_update and not _versionnee(table, _colonnes_update(etat)):
+            return
+        _noter(etat.session, [table.name])
+
+
+@event.listens_for(SessionLocal, "before_commit")
+def _avant_commit(session):
+    if not _actif:
+        return
+    session.flush()  # les changements en attente passent par after_flush
+    noms = session.info.pop(_CLE_INFO, None)
+    if noms:
+        # Ordre fixe : deux transactions verrouillent les compteurs dans le même ordre
+        session.execute(
+            update(VersionTable)
+            .where(VersionTable.nom.in_(sorted(noms)))
+            .values(version=VersionTable.version + 1, modifie_le=datetime.now())
+        )
+
+
+@event.listens_for(SessionLocal, "after_transaction_end")
+def _fin_transaction(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_CLE_INFO, None)
+
+
+# ==================== VALIDATEURS HTTP ====================
+
+class Version:
+    __slots__ = ("etag", "derniere_modif")
+
+    def __init__(self, etag, derniere_modif):
+        self.etag = etag
+        self.derniere_modif = derniere_modif  # datetime UTC à la seconde (indicatif)
+
+    def entetes(self):
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.derniere_modif, usegmt=True),
+            # Toujours revalider : le 304 coûte une requête sur la clé primaire
+            "Cache-Control": "private, no-cache",
+        }
+
+
+def lire_version(db, *tables, stock=False):
+    """
+    Version courante des tables lues par une route, None si le suivi est inactif.
+    stock=True : la réponse contient le stock, l'ETag change aussi toutes les
+    VERSIONS_STOCK_TTL secondes.
+    """
+    if not _actif:
+        return None
+    try:
+        lignes = db.execute(
+            select(VersionTable.nom, VersionTable.version, VersionTable.modifie_le)
+            .where(VersionTable.nom.in_(tables))
+            .order_by(VersionTable.nom)
+        ).all()
+    except Exception as e:
+        print(f"[WARNING] Lecture de version_table impossible: {e}")
+        return None
+    if len(lignes) != len(tables):
+        return None
+    etag = "+".join(f"{nom}.{version}" for nom, version, _ in lignes)
+    derniere_modif = max(modifie_le or datetime.now() for _, _, modifie_le in lignes)
+    derniere_modif = derniere_modif.astimezone(timezone.utc).replace(microsecond=0)
+    if stock and VERSIONS_STOCK_TTL > 0:
+        fenetre = int(time.time() // VERSIONS_STOCK_TTL)
+        etag += f"~s{fenetre}"
+        derniere_modif = max(derniere_modif, datetime.fromtimestamp(fenetre * VERSIONS_STOCK_TTL, timezone.utc).replace(microsecond=0))
+    return Version(f'W/"{etag}-{_suffixe_etag}"', derniere_modif)
+
+
+def _sans_faiblesse(etag):
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def non_modifie(request, version):
+    """Le navigateur a-t-il déjà cette version ? (If-None-Match uniquement, voir en tête du module)"""
+    if version is None:
+        return False
+    si_aucun = request.headers.get("if-none-match")
+    if si_aucun is None:
+        return False
+    attendu = _sans_faiblesse(version.etag)
+    return any(etag.strip() == "*" or _sans_faiblesse(etag) == attendu for etag in si_aucun.split(","))
+
+
+def reponse_304(version):
+    return Response(status_code=304, headers=version.entetes())
+
+
+def entetes_version(version):
+    """En-têtes de validation à joindre à la réponse complète ({} si suivi inactif)"""
+    return version.entetes() if version is not None else {}
@@ -0,0 +1,65 @@
+// Précompression du build : écrit <fichier>.br et <fichier>.gz à côté de
+// chaque fichier texte de build/ (JS, CSS, HTML, JSON, SVG...). Le backend
+// (compression.StaticFilesPrecompresses) les sert directement au lieu de
+// compresser les bundles à chaque requête.
+// Lancé automatiquement après `npm run build` (script postbuild).
+
+const fs = require('fs');
+const path = require('path');
+const zlib = require('zlib');
+
+const DOSSIER_BUILD = path.join(__dirname, '..', 'build');
+const EXTENSIONS = new Set(['.js', '.css', '.html', '.json', '.svg', '.txt', '.map', '.ico', '.xml']);
+const SEUIL = 1024; // octets : en dessous, le gain ne vaut pas un fichier de plus
+
+function fichiers(dossier) {
+  return fs.readdirSync(dossier, { withFileTypes: true }).flatMap((entree) => {
+    const chemin = path.join(dossier, entree.name);
+    return entree.isDirectory() ? fichiers(chemin) : [chemin];
+  });
+}
+
+function ecrireSiPlusPetit(chemin, original, compresse) {
+  // Un fichier qui ne gagne rien compressé reste servi tel quel
+  if (compresse.length < original.length) {
+    fs.writeFileSync(chemin, compresse);
+    return compresse.length;
+  }
+  if (fs.existsSync(chemin)) fs.unlinkSync(chemin);
+  return original.length;
+}
+
+function main() {
+  if (!fs.existsSync(DOSSIER_BUILD)) {
+    console.error(`❌ Dossier build introuvable: ${DOSSIER_BUILD}`);
+    process.exit(1);
+  }
+
+  let total = 0;
+  let totalBr = 0;
+  let totalGz = 0;
+  let nombre = 0;
+  for (const chemin of fichiers(DOSSIER_BUILD)) {
+    if (!EXTENSIONS.has(path.extname(chemin))) continue;
+    const original = fs.readFileSync(chemin);
+    if (original.length < SEUIL) continue;
+
+    const br = zlib.brotliCompressSync(original, {
+      params: {
+        [zlib.constants.BROTLI_PARAM_QUALITY]: zlib.constants.BROTLI_MAX_QUALITY,
+        [zlib.constants.BROTLI_PARAM_SIZE_HINT]: original.length,
+      },
+    });
+    const gz = zlib.gzipSync(original, { level: zlib.constants.Z_BEST_COMPRESSION });
+
+    total += original.length;
+    totalBr += ecrireSiPlusPetit(`${chemin}.br`, original, br);
+    totalGz += ecrireSiPlusPetit(`${chemin}.gz`, original, gz);
+    nombre += 1;
+  }
+
+  const ko = (octets) => `${(octets / 1024).toFixed(0)} Ko`;
+  console.log(`🗜️  ${nombre} fichier(s) précompressé(s) : ${ko(total)} -> ${ko(totalBr)} (br), ${ko(totalGz)} (gzip)`);
+}
+
+main();
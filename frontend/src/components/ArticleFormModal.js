@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { FaTimes, FaImage } from 'react-icons/fa';
-import { articleService, fournisseurService } from '../services/api';
+import { articleService, fournisseurService, urlImage } from '../services/api';
 import { toast } from 'react-toastify';
 import { preventNegativeNumbers } from '../utils/numberValidation';
 
@@ -43,7 +43,7 @@ function ArticleFormModal({ article, onClose, onSuccess }) {
       });
       // Charger l'aperçu de l'image existante
       if (article.image_path) {
-        setImagePreview(article.image_path);
+        setImagePreview(urlImage(article.image_path));
       }
     } else {
       generateCodeArticle();
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { toast } from 'react-toastify';
-import { avoirService, clientService, factureService, formatMontant } from '../services/api';
+import { avoirService, clientService, factureService, formatMontant, CHAMPS_CHOIX_CLIENT } from '../services/api';
 import { FaTimes, FaPlus, FaMinus, FaBox } from 'react-icons/fa';
 import '../styles/Modal.css';
 
@@ -59,7 +59,7 @@ function AvoirFormModal({ avoir, onClose, onSuccess }) {
 
     const loadClients = async () => {
         try {
-            const data = await clientService.getAll();
+            const data = await clientService.getAll({ fields: CHAMPS_CHOIX_CLIENT });
             setClients(data || []);
         } catch (error) {
             toast.error('Erreur lors du chargement des clients');
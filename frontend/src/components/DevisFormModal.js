@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { toast } from 'react-toastify';
-import { devisService, clientService, articleService, formatMontant } from '../services/api';
+import { devisService, clientService, articleService, formatMontant, CHAMPS_CHOIX_CLIENT, CHAMPS_CHOIX_ARTICLE } from '../services/api';
 import ClientForm from './ClientForm';
 import '../styles/Modal.css';
 
@@ -64,7 +64,7 @@ function DevisFormModal({ devis, onClose, onSuccess }) {
 
     const loadClients = async () => {
         try {
-            const data = await clientService.getAll();
+            const data = await clientService.getAll({ fields: CHAMPS_CHOIX_CLIENT });
             setClients(data);
         } catch (error) {
             toast.error('Erreur lors du chargement des clients');
@@ -73,7 +73,7 @@ function DevisFormModal({ devis, onClose, onSuccess }) {
 
     const loadArticles = async () => {
         try {
-            const data = await articleService.getAll();
+            const data = await articleService.getAll({ fields: CHAMPS_CHOIX_ARTICLE });
             setArticles(data.filter(a => a.actif !== 0)); // Seulement les articles actifs
         } catch (error) {
             toast.error('Erreur lors du chargement des articles');
@@ -0,0 +1,24 @@
+import React from 'react';
+import { urlImage, urlMiniature } from '../services/api';
+
+/**
+ * Image d'article à la taille affichée : miniature WebP générée par le backend
+ * (128, 256 ou 768 px), JPEG en repli pour les navigateurs sans WebP.
+ * Les anciennes images base64 et les URLs externes sont affichées telles quelles.
+ */
+const ImageArticle = ({ imagePath, taille, ...props }) => {
+  const webp = urlMiniature(imagePath, taille, 'webp');
+
+  if (!webp) {
+    return <img src={urlImage(imagePath)} {...props} />;
+  }
+
+  return (
+    <picture>
+      <source type="image/webp" srcSet={webp} />
+      <img src={urlMiniature(imagePath, taille, 'jpg')} {...props} />
+    </picture>
+  );
+};
+
+export default ImageArticle;
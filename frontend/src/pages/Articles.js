@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { FaPlus, FaSearch, FaSync, FaEdit, FaTrash, FaFileImport, FaFileExport, FaEye } from 'react-icons/fa';
 import { articleService, formatMontant } from '../services/api';
+import ImageArticle from '../components/ImageArticle';
 import { toast } from 'react-toastify';
 import ArticleFormModal from '../components/ArticleFormModal';
 import '../styles/CommonPages.css';
@@ -204,8 +205,9 @@ function Articles() {
                   <td>
                     <div style={{ display: 'flex', alignItems: 'center', gap: '10px' }}>
                       {article.type_article === 'PRODUIT' && article.image_path ? (
-                        <img 
-                          src={article.image_path} 
+                        <ImageArticle 
+                          imagePath={article.image_path} 
+                          taille={128}
                           alt={article.designation}
                           style={{ 
                             width: '50px', 
@@ -286,8 +288,9 @@ function Articles() {
                   <div className="details-section">
                     <h3>🖼️ Image</h3>
                     <div style={{ textAlign: 'center', marginBottom: '20px' }}>
-                      <img 
-                        src={articleDetails.image_url} 
+                      <ImageArticle 
+                        imagePath={articleDetails.image_url} 
+                        taille={768}
                         alt={articleDetails.designation}
                         style={{
                           maxWidth: '300px',
@@ -297,8 +300,9 @@ function Articles() {
                           boxShadow: '0 2px 8px rgba(0,0,0,0.1)'
                         }}
                         onError={(e) => {
-                          e.target.style.display = 'none';
-                          e.target.nextSibling.style.display = 'block';
+                          const image = e.target.closest('picture') || e.target;
+                          image.style.display = 'none';
+                          image.nextSibling.style.display = 'block';
                         }}
                       />
                       <div style={{ display: 'none', fontSize: '48px', color: '#666' }}>
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { FaShoppingCart, FaSearch, FaTrash, FaCheck, FaPrint, FaHistory, FaUndo } from 'react-icons/fa';
 import { toast } from 'react-toastify';
 import { comptoirService, articleService, formatMontant } from '../services/api';
+import ImageArticle from '../components/ImageArticle';
 import { confirmClearCart, confirmAction, confirmDelete } from '../utils/sweetAlertHelper';
 import '../styles/Comptoir.css';
 
@@ -1387,8 +1388,9 @@ function Comptoir() {
                             >
                                 {/* 🔥 Image pour les produits */}
                                 {article.type_article === 'PRODUIT' && article.image_path && (
-                                    <img 
-                                        src={article.image_path} 
+                                    <ImageArticle 
+                                        imagePath={article.image_path} 
+                                        taille={128}
                                         alt={article.designation}
                                         style={{ 
                                             width: '100%', 
@@ -73,6 +73,11 @@ export const authService = {
   },
 };
 
+// Colonnes demandées par les listes de choix des formulaires (?fields=) :
+// les colonnes texte longues (adresse, description, image) ne sont pas transférées
+export const CHAMPS_CHOIX_CLIENT = 'id_client,nom,telephone';
+export const CHAMPS_CHOIX_ARTICLE = 'id_article,designation,prix_vente,type_article,actif';
+
 // ==================== CLIENTS ====================
 
 export const clientService = {
@@ -465,6 +470,31 @@ export const downloadPDF = async (urlOrBlob, filename) => {
   }
 };
 
+/**
+ * URL d'affichage d'une image d'article : les images servies par le backend
+ * (/api/images/...) sont préfixées par l'URL de l'API, les anciennes images
+ * base64 et les URLs complètes sont gardées telles quelles
+ */
+export const urlImage = (imagePath) => {
+  if (!imagePath) return imagePath;
+  if (imagePath.startsWith('/api/')) {
+    return `${API_BASE_URL}${imagePath}`;
+  }
+  return imagePath;
+};
+
+/**
+ * URL d'une miniature d'image d'article (taille: 128, 256 ou 768 px ; format: webp ou jpg),
+ * null si l'image n'est pas servie par le backend (ancienne image base64, URL externe)
+ */
+const MOTIF_IMAGE = /^\/api\/images\/([0-9a-f]{64})\.\w+$/;
+
+export const urlMiniature = (imagePath, taille, format = 'webp') => {
+  const correspondance = imagePath && imagePath.match(MOTIF_IMAGE);
+  if (!correspondance) return null;
+  return `${API_BASE_URL}/api/images/${correspondance[1]}_${taille}.${format}`;
+};
+
 /**
  * Formater un montant en FCFA
  */
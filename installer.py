@@ -968,7 +968,18 @@ python-dotenv==1.0.0
             if not success:
                 self.log("   ⚠️ Installation incomplète mais on continue...")
                 self.log("   💡 Les dépendances seront installées automatiquement au démarrage")
-        
+
+            # Précompiler le backend (.pyc) : le premier démarrage n'a plus à compiler app.py
+            try:
+                subprocess.run(
+                    [python_exe, "-m", "compileall", "-q", backend_dir],
+                    timeout=120,
+                    capture_output=True,
+                    check=False
+                )
+            except:
+                pass  # Le backend sera compilé au premier démarrage
+
         # Node.js dependencies
         frontend_dir = os.path.join(self.project_dir, "frontend")
         package_json = os.path.join(frontend_dir, "package.json")